@@ -49,6 +49,8 @@ hiddenimports = [
     'io',
     'datetime',
     'openpyxl',
+    'diskcache',
+    'multiprocess',
     'werkzeug.security',
     'flask',
     'flask.helpers',
@@ -58,6 +60,16 @@ hiddenimports = [
     'dash.dcc',
     'iso42001.app',
     'iso42001.database',
+    'iso42001.pool',
+    'iso42001.migrations',
+    'iso42001.table_query',
+    'iso42001.cache',
+    'iso42001.backup',
+    'iso42001.workbook',
+    'iso42001.importer',
+    'iso42001.background',
+    'iso42001.uploads',
+    'iso42001.scheduler',
     'iso42001.callbacks',
     'iso42001.cli',
 ]
@@ -11,12 +11,14 @@ import time
 import socket
 import tempfile
 import atexit
+import multiprocess
 import psutil
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from iso42001 import app
+from iso42001.app import start_report_scheduler
 
 def find_free_port(start_port=8050, max_attempts=100):
     """Find a free port starting from start_port"""
@@ -82,6 +84,10 @@ def is_first_instance():
     return count <= 1
 
 if __name__ == '__main__':
+    # Background callbacks run in multiprocess children; in the frozen exe a
+    # spawned child re-runs this entry point and must stop here
+    multiprocess.freeze_support()
+    
     # Find a free port
     try:
         port = find_free_port()
@@ -118,7 +124,8 @@ if __name__ == '__main__':
         else:
             use_reloader = debug_mode
         
-        # Start the application
+        # Keep the regulatory report snapshot current, then start the application
+        start_report_scheduler(use_reloader=use_reloader)
         app.run(debug=debug_mode, host='127.0.0.1', port=port, use_reloader=use_reloader)
         
     except RuntimeError as e:
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark read throughput while writes are running, per database PRAGMA profile
+
+Simulates auditors saving records (writer threads) while other users browse
+tables and the dashboard (reader threads), and reports reads per second,
+write count and lock errors for each profile.
+
+Usage:
+    python scripts/benchmark_concurrency.py [--rows 20000] [--seconds 5]
+                                            [--readers 4] [--writers 1]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001.database import ISO42001Database, PRAGMA_PROFILES
+
+def seed(db: ISO42001Database, rows: int):
+    """Fill the risk register with ``rows`` risks spread over 100 assets"""
+    asset_ids = [db.add_asset(f"Asset {i}", "ML Model") for i in range(100)]
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO risks (asset_id, risk_title, risk_level, status) VALUES (?, ?, ?, ?)",
+            [(asset_ids[i % len(asset_ids)], f"Risk {i}",
+              ("Low", "Medium", "High", "Critical")[i % 4],
+              ("Open", "In Progress", "Closed")[i % 3]) for i in range(rows)]
+        )
+        conn.commit()
+
+def run_profile(profile: str, rows: int, seconds: float, readers: int, writers: int):
+    """Run one benchmark round and return its measurements"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = ISO42001Database(os.path.join(tmp_dir, "bench.db"), profile=profile,
+                              pool_size=readers + writers + 1)
+        seed(db, rows)
+
+        stop = threading.Event()
+        counts = {'reads': 0, 'writes': 0, 'lock_errors': 0}
+        lock = threading.Lock()
+
+        def count(key):
+            with lock:
+                counts[key] += 1
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    db.get_dashboard_stats()
+                    with db.connection() as conn:
+                        conn.execute(
+                            "SELECT * FROM risks ORDER BY created_date DESC LIMIT 10"
+                        ).fetchall()
+                    count('reads')
+                except sqlite3.OperationalError:
+                    count('lock_errors')
+
+        def writer():
+            while not stop.is_set():
+                try:
+                    db.add_risk(None, "Benchmark risk", "Written during the benchmark")
+                    count('writes')
+                except sqlite3.OperationalError:
+                    count('lock_errors')
+
+        threads = ([threading.Thread(target=reader) for _ in range(readers)] +
+                   [threading.Thread(target=writer) for _ in range(writers)])
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        journal_mode = db.get_pragma_settings().get('journal_mode', 'delete')
+        db.close()
+
+    counts['reads_per_second'] = counts['reads'] / seconds
+    counts['journal_mode'] = journal_mode
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000, help="Risks to seed (default: 20000)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per profile (default: 5)")
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads (default: 4)")
+    parser.add_argument("--writers", type=int, default=1, help="Writer threads (default: 1)")
+    args = parser.parse_args()
+
+    print(f"Seeding {args.rows} risks, {args.readers} readers / {args.writers} writers, "
+          f"{args.seconds:g}s per profile\n")
+    print(f"{'profile':<12} {'journal':<8} {'reads/s':>10} {'writes':>8} {'lock errors':>12}")
+    for profile in PRAGMA_PROFILES:
+        result = run_profile(profile, args.rows, args.seconds, args.readers, args.writers)
+        print(f"{profile:<12} {result['journal_mode']:<8} {result['reads_per_second']:>10.1f} "
+              f"{result['writes']:>8} {result['lock_errors']:>12}")
+
+if __name__ == '__main__':
+    main()
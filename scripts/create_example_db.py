@@ -95,17 +95,19 @@ def create_example_database(output_path: str):
         }
     ]
     
-    # Add sample assets to database
-    for asset in sample_assets:
-        asset_id = db.add_asset(
-            name=asset['name'],
-            asset_type=asset['type'],
-            description=asset['description'],
-            criticality=asset['risk_level'],
-            owner=asset['owner'],
-            status=asset['status']
-        )
-        print(f"Created sample asset: {asset['name']} (ID: {asset_id})")
+    # Add sample assets to database (one transaction; ids are 1-5 in this order)
+    counts = db.bulk_add_assets(
+        {
+            'name': asset['name'],
+            'type': asset['type'],
+            'description': asset['description'],
+            'criticality': asset['risk_level'],
+            'owner': asset['owner'],
+            'status': asset['status']
+        }
+        for asset in sample_assets
+    )
+    print(f"Created {counts['inserted']} sample assets")
     
     # Add sample risk assessments
     sample_risks = [
@@ -148,20 +150,22 @@ def create_example_database(output_path: str):
     ]
     
     # Add sample risk assessments to database
-    for risk in sample_risks:
-        risk_id = db.add_risk(
-            asset_id=risk['ai_asset_id'],
-            risk_title=f"{risk['risk_category']} Risk",
-            risk_description=risk['risk_description'],
-            risk_category=risk['risk_category'],
-            likelihood=risk['probability'],
-            impact=risk['impact'],
-            risk_level=risk['impact'],  # Using impact as risk level
-            mitigation_strategy=risk['mitigation_strategy'],
-            owner=risk['responsible_person'],
-            status=risk['status']
-        )
-        print(f"Created sample risk assessment for asset {risk['ai_asset_id']} (ID: {risk_id})")
+    counts = db.bulk_add_risks(
+        {
+            'asset_id': risk['ai_asset_id'],
+            'risk_title': f"{risk['risk_category']} Risk",
+            'risk_description': risk['risk_description'],
+            'risk_category': risk['risk_category'],
+            'likelihood': risk['probability'],
+            'impact': risk['impact'],
+            'risk_level': risk['impact'],  # Using impact as risk level
+            'mitigation_strategy': risk['mitigation_strategy'],
+            'owner': risk['responsible_person'],
+            'status': risk['status']
+        }
+        for risk in sample_risks
+    )
+    print(f"Created {counts['inserted']} sample risk assessments")
     
     # Add sample audit records
     sample_audits = [
@@ -197,19 +201,9 @@ def create_example_database(output_path: str):
         }
     ]
     
-    # Add sample audit records to database
-    for audit in sample_audits:
-        audit_id = db.add_audit(
-            audit_title=audit['audit_title'],
-            audit_type=audit['audit_type'],
-            audit_scope=audit['audit_scope'],
-            auditor=audit['auditor'],
-            findings=audit['findings'],
-            recommendations=audit['recommendations'],
-            compliance_score=audit['compliance_score'],
-            status=audit['status']
-        )
-        print(f"Created sample audit record: {audit['audit_title']} (ID: {audit_id})")
+    # Add sample audit records to database (their keys are the audit columns)
+    counts = db.bulk_add_audits(sample_audits)
+    print(f"Created {counts['inserted']} sample audit records")
     
     print(f"\nExample database created successfully at: {output_path}")
     print(f"Database contains:")
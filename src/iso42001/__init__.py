@@ -10,6 +10,6 @@ __email__ = "info@gressling.de"
 __license__ = "CC BY-NC-ND 4.0"
 
 from .app import app
-from .database import ISO42001Database
+from .database import ISO42001Database, get_database
 
-__all__ = ['app', 'ISO42001Database']
+__all__ = ['app', 'ISO42001Database', 'get_database']
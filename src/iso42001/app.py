@@ -9,7 +9,13 @@ import base64
 import io
 import os
 
-from .database import ISO42001Database
+from flask import jsonify, request
+
+from .background import background_manager
+from .cache import VersionedCache
+from .scheduler import ReportScheduler
+from .uploads import MAX_UPLOAD_BYTES, UploadTooLarge, save_upload
+from .database import LazyDatabase
 from . import __version__
 from .layout import (
     create_app_layout, 
@@ -19,43 +25,120 @@ from .layout import (
     render_incidents_tab, 
     render_compliance_tab, 
     render_regulatory_report_tab,
+    render_regulatory_report,
     render_admin_tab,
     get_version_major_minor
 )
 
-# Initialize the database
-db = ISO42001Database()
+# Database handle; created on first use so importing the app does no DB work
+db = LazyDatabase()
 
-# Initialize Dash app with IBM Carbon theme and custom assets
+# Initialize Dash app with IBM Carbon theme and custom assets; long-running
+# callbacks (export, import, regulatory report) run through the background manager
 app = dash.Dash(__name__, 
                 external_stylesheets=[dbc.themes.BOOTSTRAP], 
                 suppress_callback_exceptions=True,
+                background_callback_manager=background_manager,
                 assets_folder='assets')
 app.title = f"ISO 42001 Bookkeeping System {get_version_major_minor()}"
 
-# Set the app layout
-app.layout = create_app_layout()
+# Set the app layout (a function, so it is rebuilt with fresh stats per page load)
+app.layout = create_app_layout
+
+@app.server.route('/api/stats')
+def stats_endpoint():
+    """Dashboard statistics, versioned by ETag; answers 304 when no write has happened"""
+    known = request.if_none_match
+    version = db.get_data_version()
+    if known and known.contains(str(version)):
+        return '', 304
+    response = jsonify(db.get_dashboard_stats())
+    response.set_etag(str(version))
+    return response
+
+@app.server.route('/api/import/upload', methods=['POST'])
+def upload_endpoint():
+    """Stream an import workbook from the request body into the upload spool directory"""
+    if request.content_length and request.content_length > MAX_UPLOAD_BYTES:
+        return jsonify(error=f"Upload exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"), 413
+    try:
+        upload = save_upload(request.stream, request.args.get('filename', ''))
+    except UploadTooLarge as e:
+        return jsonify(error=str(e)), 413
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(upload), 201
+
+@app.server.route('/api/search')
+def search_endpoint():
+    """Full-text search: ``q``, optional ``table`` (repeatable), ``page`` (from 0) and ``page_size``"""
+    try:
+        page = int(request.args.get('page', 0))
+        page_size = min(max(int(request.args.get('page_size', 20)), 1), 100)
+        hits, total = db.search(request.args.get('q', ''), request.args.getlist('table') or None,
+                                page=page, page_size=page_size)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(total=total, page=page, page_size=page_size, hits=hits)
+
+# Tab renderers and the tables whose data they show; a cached tab is reused
+# until one of these tables is written to
+TAB_RENDERERS = {
+    'assets': (render_assets_tab, ('ai_assets',)),
+    'risks': (render_risks_tab, ('risks', 'ai_assets', 'controls', 'risk_controls')),
+    'controls': (render_controls_tab, ('controls',)),
+    'incidents': (render_incidents_tab, ('incidents', 'ai_assets')),
+    'compliance': (render_compliance_tab, ('audits',)),
+    'regulatory-report': (render_regulatory_report_tab, ()),
+    'admin': (render_admin_tab, ()),
+}
+
+# Rendered tab cache; size and TTL (seconds) come from the environment or configure_tab_cache
+tab_cache = VersionedCache(
+    maxsize=int(os.environ.get('ISO42001_TAB_CACHE_SIZE', '16')),
+    ttl=float(os.environ.get('ISO42001_TAB_CACHE_TTL', '300'))
+)
+
+def configure_tab_cache(size=None, ttl=None):
+    """Change the rendered tab cache size and/or TTL (0 disables the cache / the expiry)"""
+    tab_cache.configure(tab_cache.maxsize if size is None else size,
+                        tab_cache.ttl if ttl is None else ttl)
 
 @callback(Output('tab-content', 'children'),
           Input('main-tabs', 'value'))
 def render_tab_content(active_tab):
-    """Render content based on active tab"""
-    if active_tab == 'assets':
-        return render_assets_tab()
-    elif active_tab == 'risks':
-        return render_risks_tab()
-    elif active_tab == 'controls':
-        return render_controls_tab()
-    elif active_tab == 'incidents':
-        return render_incidents_tab()
-    elif active_tab == 'compliance':
-        return render_compliance_tab()
-    elif active_tab == 'regulatory-report':
-        return render_regulatory_report_tab()
-    elif active_tab == 'admin':
-        return render_admin_tab()
+    """Render content based on active tab, reusing the cached render if its data is unchanged"""
+    if active_tab not in TAB_RENDERERS:
+        return html.Div()
     
-    return html.Div()
+    renderer, tables = TAB_RENDERERS[active_tab]
+    versions = db.get_data_versions() if tables else {}
+    data_version = tuple(versions.get(table, 0) for table in tables)
+    return tab_cache.get_or_compute(active_tab, data_version, renderer)
+
+# Keeps the regulatory report snapshot current; started by the entry points
+report_scheduler = ReportScheduler(
+    db,
+    poll_interval=float(os.environ.get('ISO42001_REPORT_POLL', '5')),
+    refresh_interval=float(os.environ.get('ISO42001_REPORT_INTERVAL', str(24 * 3600)))
+)
+
+def start_report_scheduler(use_reloader=False):
+    """Start refreshing report snapshots; with the reloader only in the serving child process"""
+    if use_reloader and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return
+    report_scheduler.start()
+
+@callback(Output('regulatory-report-content', 'children'),
+          Input('regulatory-report-request', 'data'),
+          background=True,
+          running=[(Output('regulatory-report-loading', 'style'),
+                    {'display': 'block'}, {'display': 'none'})],
+          cancel=[Input('main-tabs', 'value')])
+def render_regulatory_report_content(_):
+    """Render the latest report snapshot, taking a new one first if data has changed"""
+    snapshot = db.create_report_snapshot() or db.get_report_snapshot()
+    return render_regulatory_report(snapshot, db.get_report_history())
 
 # Import callbacks after app is defined
 from . import callbacks
\ No newline at end of file
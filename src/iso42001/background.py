@@ -0,0 +1,61 @@
+"""
+Background callback manager for the long-running admin callbacks
+
+Export, import and the regulatory report run as Dash background callbacks so
+a multi-minute job never holds a request thread. Dash's DiskcacheManager runs
+each job in a separate process and keeps its progress and result in a local
+DiskCache directory; cancelling a job terminates its process.
+"""
+
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import diskcache
+from dash import DiskcacheManager
+
+
+def default_cache_dir() -> str:
+    """DiskCache directory: ``ISO42001_CACHE_DIR`` or a folder in the temp directory"""
+    return os.environ.get('ISO42001_CACHE_DIR',
+                          os.path.join(tempfile.gettempdir(), 'iso42001-background'))
+
+
+def create_background_manager(cache_dir: Optional[str] = None) -> DiskcacheManager:
+    """DiskcacheManager keeping its jobs under ``cache_dir`` (default: default_cache_dir())"""
+    return DiskcacheManager(diskcache.Cache(cache_dir or default_cache_dir()))
+
+
+class LazyBackgroundManager:
+    """Stand-in for the DiskcacheManager that defers creating it until first use.
+
+    DiskCache opens its SQLite file when the manager is created; deferring
+    that to the first background callback (or the first request, which asks
+    the manager for the app's signing secret) keeps importing the app free of
+    database work, like LazyDatabase.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self._cache_dir = cache_dir
+        self._manager: Optional[DiskcacheManager] = None
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> DiskcacheManager:
+        if self._manager is None:
+            with self._lock:
+                if self._manager is None:
+                    self._manager = create_background_manager(self._cache_dir)
+        return self._manager
+
+    @property
+    def initialized(self) -> bool:
+        """Whether the underlying manager has been created yet"""
+        return self._manager is not None
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+
+# Manager of the Dash app (see app.py)
+background_manager = LazyBackgroundManager()
@@ -0,0 +1,323 @@
+"""
+Fast backup formats for the ISO 42001 database
+
+Alongside the Excel workbook of ``ISO42001Database.export_database`` these
+formats are meant for backing up and restoring large registers:
+
+- ``csv``: a directory with one gzip-compressed CSV file per table
+- ``parquet``: a directory with one Parquet file per table (requires pyarrow)
+- ``sqlite``: a consistent copy of the whole database file made with the
+  SQLite online backup API
+
+All of them stream rows in chunks and keep ids and timestamps, so a restore
+gives back exactly what was exported.
+"""
+
+import csv
+import gzip
+import os
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional
+
+BACKUP_FORMATS = ('excel', 'csv', 'parquet', 'sqlite')
+
+# Tables in dependency order: parents are restored before the rows referencing them
+BACKUP_TABLES = ['ai_assets', 'risks', 'controls', 'incidents', 'audits', 'risk_controls',
+                 'incident_assets']
+
+# How NULL is written in CSV files, so it round-trips distinct from empty strings
+CSV_NULL = r'\N'
+
+CHUNK_SIZE = 5000
+
+ProgressCallback = Optional[Callable[[int, int, str], None]]
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency for Parquet is installed"""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _require_pyarrow():
+    if not parquet_available():
+        raise ImportError("The parquet format requires pyarrow (pip install pyarrow)")
+    import pyarrow
+    import pyarrow.parquet
+    return pyarrow, pyarrow.parquet
+
+
+def detect_format(path: str) -> str:
+    """Guess the backup format of ``path`` from its suffix or directory contents"""
+    lower = path.lower().rstrip('/\\')
+    if lower.endswith(('.xlsx', '.xls')):
+        return 'excel'
+    if lower.endswith(('.db', '.sqlite', '.sqlite3')):
+        return 'sqlite'
+    if lower.endswith('.parquet'):
+        return 'parquet'
+    if lower.endswith(('.csv', '.csv.gz')):
+        return 'csv'
+    if os.path.isdir(path):
+        names = os.listdir(path)
+        if any(name.endswith('.parquet') for name in names):
+            return 'parquet'
+        if any(name.endswith('.csv.gz') for name in names):
+            return 'csv'
+    raise ValueError(f"Cannot tell the backup format of '{path}'; "
+                     f"choose one of {', '.join(BACKUP_FORMATS)}")
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[Dict[str, Any]]:
+    return [{'name': row[1], 'type': (row[2] or '').upper()}
+            for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _count_rows(conn: sqlite3.Connection) -> int:
+    return sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+               for table in BACKUP_TABLES)
+
+
+def _read_chunks(conn: sqlite3.Connection, table: str, chunk_size: int):
+    cursor = conn.execute(f"SELECT * FROM {table} ORDER BY id")
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _replace_tables(db, load_table: Callable[[sqlite3.Connection, str, List[str]], int],
+                    count_table: Callable[[str], int],
+                    progress: ProgressCallback = None) -> int:
+    """Empty all backup tables and refill them with ``load_table`` in one transaction
+
+    ``count_table`` gives the number of rows the backup holds for a table; it
+    is only called, before the restore starts, to report progress totals.
+    """
+    rows_total = sum(count_table(table) for table in BACKUP_TABLES) if progress else 0
+    with db.connection() as conn:
+        with db.triggers_suspended(conn):
+            for table in reversed(BACKUP_TABLES):
+                conn.execute(f"DELETE FROM {table}")
+            rows_done = 0
+            for table in BACKUP_TABLES:
+                columns = [column['name'] for column in _table_columns(conn, table)]
+                rows_done += load_table(conn, table, columns)
+                if progress:
+                    progress(rows_done, rows_total, table)
+        conn.commit()
+    return rows_done
+
+
+def _insert_chunks(conn: sqlite3.Connection, table: str, header: List[str],
+                   columns: List[str], chunks) -> int:
+    """Insert row chunks whose values follow ``header``, keeping the table's columns only"""
+    keep = [i for i, name in enumerate(header) if name in columns]
+    names = [header[i] for i in keep]
+    sql = (f"INSERT INTO {table} ({', '.join(names)}) "
+           f"VALUES ({', '.join('?' for _ in names)})")
+    count = 0
+    for rows in chunks:
+        conn.executemany(sql, [[row[i] for i in keep] for row in rows])
+        count += len(rows)
+    return count
+
+
+# gzip CSV
+def export_csv(db, directory: str, chunk_size: int = CHUNK_SIZE,
+               progress: ProgressCallback = None) -> int:
+    """Write every table to ``directory/<table>.csv.gz``; returns the rows written"""
+    os.makedirs(directory, exist_ok=True)
+    with db.connection() as conn:
+        rows_total = _count_rows(conn)
+        rows_done = 0
+        for table in BACKUP_TABLES:
+            header = [column['name'] for column in _table_columns(conn, table)]
+            with gzip.open(os.path.join(directory, f"{table}.csv.gz"), 'wt',
+                           newline='', encoding='utf-8', compresslevel=6) as handle:
+                writer = csv.writer(handle)
+                writer.writerow(header)
+                for rows in _read_chunks(conn, table, chunk_size):
+                    writer.writerows([CSV_NULL if value is None else value for value in row]
+                                     for row in rows)
+                    rows_done += len(rows)
+                    if progress:
+                        progress(rows_done, rows_total, table)
+    return rows_done
+
+
+def import_csv(db, directory: str, chunk_size: int = CHUNK_SIZE,
+               progress: ProgressCallback = None) -> int:
+    """Replace all data with the tables found in a CSV backup directory"""
+    def count_table(table):
+        path = os.path.join(directory, f"{table}.csv.gz")
+        if not os.path.exists(path):
+            return 0
+        # Count records, not lines: quoted values may contain newlines
+        with gzip.open(path, 'rt', newline='', encoding='utf-8') as handle:
+            return max(sum(1 for _ in csv.reader(handle)) - 1, 0)
+
+    def load_table(conn, table, columns):
+        path = os.path.join(directory, f"{table}.csv.gz")
+        if not os.path.exists(path):
+            return 0
+        with gzip.open(path, 'rt', newline='', encoding='utf-8') as handle:
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return 0
+
+            def chunks():
+                batch = []
+                for row in reader:
+                    batch.append([None if value == CSV_NULL else value for value in row])
+                    if len(batch) >= chunk_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+
+            return _insert_chunks(conn, table, header, columns, chunks())
+
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"No CSV backup directory at '{directory}'")
+    return _replace_tables(db, load_table, count_table, progress)
+
+
+# Parquet
+def export_parquet(db, directory: str, chunk_size: int = CHUNK_SIZE,
+                   progress: ProgressCallback = None) -> int:
+    """Write every table to ``directory/<table>.parquet``; returns the rows written"""
+    pa, pq = _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    with db.connection() as conn:
+        rows_total = _count_rows(conn)
+        rows_done = 0
+        for table in BACKUP_TABLES:
+            columns = _table_columns(conn, table)
+            # Declared types give a stable schema even when a chunk is all NULL
+            schema = pa.schema([
+                (column['name'], pa.int64() if 'INT' in column['type'] else pa.string())
+                for column in columns
+            ])
+            with pq.ParquetWriter(os.path.join(directory, f"{table}.parquet"), schema) as writer:
+                for rows in _read_chunks(conn, table, chunk_size):
+                    arrays = []
+                    for i, field in enumerate(schema):
+                        values = [row[i] for row in rows]
+                        if field.type == pa.string():
+                            values = [None if value is None else str(value) for value in values]
+                        arrays.append(pa.array(values, type=field.type))
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                    rows_done += len(rows)
+                    if progress:
+                        progress(rows_done, rows_total, table)
+    return rows_done
+
+
+def import_parquet(db, directory: str, chunk_size: int = CHUNK_SIZE,
+                   progress: ProgressCallback = None) -> int:
+    """Replace all data with the tables found in a Parquet backup directory"""
+    pa, pq = _require_pyarrow()
+
+    def count_table(table):
+        path = os.path.join(directory, f"{table}.parquet")
+        if not os.path.exists(path):
+            return 0
+        return pq.ParquetFile(path).metadata.num_rows
+
+    def load_table(conn, table, columns):
+        path = os.path.join(directory, f"{table}.parquet")
+        if not os.path.exists(path):
+            return 0
+        parquet_file = pq.ParquetFile(path)
+        header = parquet_file.schema_arrow.names
+        chunks = (list(zip(*(column.to_pylist() for column in batch.columns)))
+                  for batch in parquet_file.iter_batches(batch_size=chunk_size))
+        return _insert_chunks(conn, table, header, columns, chunks)
+
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"No Parquet backup directory at '{directory}'")
+    return _replace_tables(db, load_table, count_table, progress)
+
+
+# SQLite online backup
+def _page_progress(progress: ProgressCallback):
+    if progress is None:
+        return None
+
+    def report(status, remaining, total):
+        progress(total - remaining, total, "pages")
+    return report
+
+
+def export_sqlite(db, snapshot_path: str, pages: int = 1024,
+                  progress: ProgressCallback = None) -> int:
+    """Copy the live database to ``snapshot_path``; returns the rows it contains"""
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+    target = sqlite3.connect(snapshot_path)
+    try:
+        with db.connection() as conn:
+            conn.backup(target, pages=pages, progress=_page_progress(progress))
+            rows = _count_rows(conn)
+    finally:
+        target.close()
+    return rows
+
+
+def import_sqlite(db, snapshot_path: str, pages: int = 1024,
+                  progress: ProgressCallback = None) -> int:
+    """Replace the live database with a snapshot made by export_sqlite"""
+    if not os.path.isfile(snapshot_path):
+        raise FileNotFoundError(f"No SQLite snapshot at '{snapshot_path}'")
+    source = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    try:
+        tables = {row[0] for row in source.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        # Mapping tables may be missing; init_database below migrates the snapshot
+        missing = set(BACKUP_TABLES[:-2]) - tables
+        if missing:
+            raise ValueError(f"'{snapshot_path}' is not an ISO 42001 database "
+                             f"(missing {', '.join(sorted(missing))})")
+
+        versions_before = db.get_data_versions()
+        with db.connection() as conn:
+            source.backup(conn, pages=pages, progress=_page_progress(progress))
+    finally:
+        source.close()
+
+    # Bring an older snapshot's schema (indexes, triggers, counters) up to date
+    db.init_database()
+    with db.connection() as conn:
+        # Restored version numbers may repeat ones seen before the restore;
+        # move every table past both so version-keyed caches are invalidated
+        for table, version in versions_before.items():
+            conn.execute(
+                "INSERT INTO data_versions (table_name, version) VALUES (?, ?) "
+                "ON CONFLICT(table_name) DO UPDATE SET version = MAX(version, excluded.version)",
+                (table, version + 1)
+            )
+        conn.commit()
+        return _count_rows(conn)
+
+
+EXPORTERS = {
+    'csv': export_csv,
+    'parquet': export_parquet,
+    'sqlite': export_sqlite,
+}
+
+IMPORTERS = {
+    'csv': import_csv,
+    'parquet': import_parquet,
+    'sqlite': import_sqlite,
+}
@@ -0,0 +1,79 @@
+"""
+In-process caches keyed on database data versions
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class VersionedCache:
+    """Thread-safe LRU cache whose entries are valid for one data version.
+
+    Each key holds a single entry tagged with the data version it was computed
+    for; a lookup with a different version is a miss and the entry is
+    replaced. Entries also expire after ``ttl`` seconds (``None`` or ``0``
+    means never) and the least recently used keys are evicted beyond
+    ``maxsize`` (``0`` disables caching).
+    """
+
+    def __init__(self, maxsize: int = 16, ttl: Optional[float] = 300.0):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.configure(maxsize, ttl)
+
+    def configure(self, maxsize: int, ttl: Optional[float] = None):
+        """Change size and TTL; existing entries are kept if they still fit"""
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl if ttl and ttl > 0 else None
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, version: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` at ``version``, or ``default``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, stored_at, value = entry
+                expired = self.ttl is not None and time.monotonic() - stored_at > self.ttl
+                if entry_version == version and not expired:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, version: Hashable, value: Any):
+        """Store ``value`` for ``key`` at ``version``"""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value or compute, store and return it"""
+        missing = object()
+        value = self.get(key, version, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, version, value)
+        return value
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
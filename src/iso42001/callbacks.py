@@ -1,21 +1,133 @@
-from dash import callback, Input, Output, State, html, ctx
+from dash import callback, clientside_callback, Input, Output, State, ALL, html, ctx, no_update, Patch
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 from datetime import datetime
-import base64
 import io
+import math
 import pandas as pd
 
-from .database import ISO42001Database
+from .database import LazyDatabase
+from .importer import import_workbook, merge_workbook, ImportValidationError
+from .uploads import discard, upload_path
 
-# Initialize database connection
-db = ISO42001Database()
+# Database handle; created on first use so importing the callbacks does no DB work
+db = LazyDatabase()
 
 def create_data_table(df, table_id):
     """Create a standard data table with Carbon styling"""
     from .layout import create_data_table as layout_create_data_table
     return layout_create_data_table(df, table_id)
 
+def table_records(df, table_id):
+    """Convert a DataFrame to DataTable records"""
+    from .layout import table_records as layout_table_records
+    return layout_table_records(df, table_id)
+
+def patch_table_row(row, table_id, row_ids, page_size, edit_id=None,
+                    page_current=0, sort_by=None, filter_query=None):
+    """Update a paged table after one row was saved; returns ``(data, page_count)``
+    
+    On the unsorted, unfiltered table the row is patched in place (edit) or
+    prepended to the first page (add), so only the changed row crosses the
+    wire; ``row_ids`` are the ids of the rows currently shown (the table's
+    ``derived_virtual_row_ids``). Otherwise the saved row may belong on
+    another page or not match the filter, and the current page is reloaded.
+    """
+    from .layout import table_record
+    if row is None:
+        return no_update, no_update
+    
+    if sort_by or filter_query or (not edit_id and page_current):
+        records, page_count, _ = load_table_page(table_id, page_current, page_size,
+                                                 sort_by, filter_query)
+        return records, page_count
+    
+    record = table_record(row, table_id)
+    row_ids = row_ids or []
+    patch = Patch()
+    if edit_id:
+        if edit_id not in row_ids:
+            return no_update, no_update
+        patch[row_ids.index(edit_id)] = record
+        return patch, no_update
+    
+    patch.prepend(record)
+    # Keep the page at its size by dropping the row pushed off the end
+    page_size = page_size or 10
+    if len(row_ids) >= page_size:
+        del patch[len(row_ids)]
+    total_rows = db.count_rows(PAGED_TABLES[table_id])
+    return patch, max(math.ceil(total_rows / page_size), 1)
+
+# Dashboard statistics refresh
+@callback(
+    [Output("stats-cards", "children"),
+     Output("stats-version", "data")],
+    Input("interval-component", "n_intervals"),
+    State("stats-version", "data"),
+    prevent_initial_call=True
+)
+def refresh_stats_cards(n_intervals, known_version):
+    """Re-render the stats cards only if a write happened since the last render"""
+    from .layout import create_stats_cards
+    version, stats = db.get_versioned_dashboard_stats(known_version)
+    if stats is None:
+        # Not modified - send nothing back to the browser
+        raise PreventUpdate
+    return create_stats_cards(stats), version
+
+# Server-side paging, sorting and filtering (DataTable id -> database table)
+PAGED_TABLES = {
+    "assets-table": "ai_assets",
+    "risks-table": "risks",
+    "controls-table": "controls",
+    "incidents-table": "incidents",
+    "audits-table": "audits",
+}
+
+def load_table_page(table_id, page_current, page_size, sort_by, filter_query):
+    """Records of the requested page of a paged table, with its page count and page number
+    
+    A page past the end (the filter shrank the result set) is replaced by the
+    last page; an invalid filter gives an empty table.
+    """
+    table = PAGED_TABLES[table_id]
+    page_size = page_size or 10
+    try:
+        df, total_rows = db.query_page(table, page_current or 0, page_size,
+                                       sort_by, filter_query)
+    except ValueError as e:
+        print(f"Invalid filter for {table_id}: {e}")
+        return [], 1, 0
+    
+    page_count = max(math.ceil(total_rows / page_size), 1)
+    if (page_current or 0) >= page_count:
+        # The filter shrank the result set - jump to the last available page
+        page_current = page_count - 1
+        df, total_rows = db.query_page(table, page_current, page_size,
+                                       sort_by, filter_query)
+    return table_records(df, table_id), page_count, page_current or 0
+
+def register_paging_callback(table_id, table):
+    """Serve the visible page of a custom-paged DataTable from the database"""
+    @callback(
+        [Output(table_id, "data", allow_duplicate=True),
+         Output(table_id, "page_count", allow_duplicate=True),
+         Output(table_id, "page_current")],
+        [Input(table_id, "page_current"),
+         Input(table_id, "page_size"),
+         Input(table_id, "sort_by"),
+         Input(table_id, "filter_query")],
+        prevent_initial_call=True
+    )
+    def update_table_page(page_current, page_size, sort_by, filter_query):
+        return load_table_page(table_id, page_current, page_size, sort_by, filter_query)
+    
+    return update_table_page
+
+for _table_id, _table in PAGED_TABLES.items():
+    register_paging_callback(_table_id, _table)
+
 # Asset callbacks
 @callback(
     [Output("asset-modal", "is_open", allow_duplicate=True),
@@ -65,7 +177,8 @@ def handle_asset_modal(add_clicks, active_cell, cancel_clicks, is_open, table_da
     return is_open, "Add New AI Asset", None, "", "", "", "Medium", "", "Active"
 
 @callback(
-    [Output("assets-table-container", "children", allow_duplicate=True),
+    [Output("assets-table", "data", allow_duplicate=True),
+     Output("assets-table", "page_count", allow_duplicate=True),
      Output("asset-name", "value", allow_duplicate=True),
      Output("asset-type", "value", allow_duplicate=True),
      Output("asset-description", "value", allow_duplicate=True),
@@ -81,16 +194,22 @@ def handle_asset_modal(add_clicks, active_cell, cancel_clicks, is_open, table_da
      State("asset-criticality", "value"),
      State("asset-owner", "value"),
      State("asset-status", "value"),
-     State("edit-asset-id", "data")],
+     State("edit-asset-id", "data"),
+     State("assets-table", "derived_virtual_row_ids"),
+     State("assets-table", "page_size"),
+     State("assets-table", "page_current"),
+     State("assets-table", "sort_by"),
+     State("assets-table", "filter_query")],
     prevent_initial_call=True
 )
-def save_asset(n_clicks, name, asset_type, description, criticality, owner, status, edit_asset_id):
-    """Add new asset or update existing asset and refresh table"""
+def save_asset(n_clicks, name, asset_type, description, criticality, owner, status, edit_asset_id,
+               row_ids, page_size, page_current, sort_by, filter_query):
+    """Add new asset or update existing asset and patch the changed row into the table"""
     if n_clicks and name and asset_type:
         try:
             if edit_asset_id:
                 # Update existing asset
-                db.update_asset(
+                row = db.update_asset(
                     edit_asset_id,
                     name=name,
                     type=asset_type,
@@ -101,25 +220,20 @@ def save_asset(n_clicks, name, asset_type, description, criticality, owner, stat
                 )
             else:
                 # Add new asset
-                db.add_asset(name, asset_type, description or "", criticality or "Medium", 
-                            owner or "", status or "Active")
+                row = db.add_asset(name, asset_type, description or "", criticality or "Medium", 
+                                  owner or "", status or "Active", return_row=True)
             
-            # Refresh table
-            assets_df = db.get_assets()
-            table = create_data_table(assets_df, "assets-table")
+            # Send only the changed row, or the reloaded page when sorted/filtered/paged
+            data, page_count = patch_table_row(row, "assets-table", row_ids, page_size, edit_asset_id,
+                                               page_current, sort_by, filter_query)
             
             # Clear form and close modal
-            return table, "", "", "", "Medium", "", "Active", False, None
+            return data, page_count, "", "", "", "Medium", "", "Active", False, None
         except Exception as e:
             print(f"Error saving asset: {e}")
     
-    # Return current state without changes
-    try:
-        assets_df = db.get_assets()
-        table = create_data_table(assets_df, "assets-table")
-        return table, "", "", "", "Medium", "", "Active", False, None
-    except:
-        return html.Div("Error loading assets"), "", "", "", "Medium", "", "Active", False, None
+    # Leave the table as it is
+    return no_update, no_update, "", "", "", "Medium", "", "Active", False, None
 
 # Risk callbacks
 @callback(
@@ -134,6 +248,7 @@ def save_asset(n_clicks, name, asset_type, description, criticality, owner, stat
      Output("risk-impact", "value", allow_duplicate=True),
      Output("risk-level", "value", allow_duplicate=True),
      Output("risk-mitigation", "value", allow_duplicate=True),
+     Output("risk-controls", "value", allow_duplicate=True),
      Output("risk-owner", "value", allow_duplicate=True),
      Output("risk-status", "value", allow_duplicate=True)],
     [Input("add-risk-btn", "n_clicks"),
@@ -150,7 +265,7 @@ def handle_risk_modal(add_clicks, active_cell, cancel_clicks, is_open, table_dat
     if triggered_id == "add-risk-btn":
         # Open modal for adding new risk
         return (True, "Add New Risk", None, "", "", "", "", "Medium", "Medium", 
-                "Medium", "", "", "Open")
+                "Medium", "", [], "", "Open")
     
     elif triggered_id == "risks-table" and active_cell:
         # Check if Edit button was clicked
@@ -173,20 +288,22 @@ def handle_risk_modal(add_clicks, active_cell, cancel_clicks, is_open, table_dat
                    row_data.get('impact', 'Medium'),
                    row_data.get('risk_level', 'Medium'),
                    row_data.get('mitigation_strategy', ''),
+                   db.get_risk_control_ids(risk_id),
                    row_data.get('owner', ''),
                    row_data.get('status', 'Open'))
     
     elif triggered_id == "cancel-risk":
         # Close modal and clear form
         return (False, "Add New Risk", None, "", "", "", "", "Medium", "Medium", 
-                "Medium", "", "", "Open")
+                "Medium", "", [], "", "Open")
     
     # Default: return current state
     return (is_open, "Add New Risk", None, "", "", "", "", "Medium", "Medium", 
-            "Medium", "", "", "Open")
+            "Medium", "", [], "", "Open")
 
 @callback(
-    [Output("risks-table-container", "children", allow_duplicate=True),
+    [Output("risks-table", "data", allow_duplicate=True),
+     Output("risks-table", "page_count", allow_duplicate=True),
      Output("risk-asset", "value", allow_duplicate=True),
      Output("risk-title", "value", allow_duplicate=True),
      Output("risk-description", "value", allow_duplicate=True),
@@ -195,6 +312,7 @@ def handle_risk_modal(add_clicks, active_cell, cancel_clicks, is_open, table_dat
      Output("risk-impact", "value", allow_duplicate=True),
      Output("risk-level", "value", allow_duplicate=True),
      Output("risk-mitigation", "value", allow_duplicate=True),
+     Output("risk-controls", "value", allow_duplicate=True),
      Output("risk-owner", "value", allow_duplicate=True),
      Output("risk-status", "value", allow_duplicate=True),
      Output("risk-modal", "is_open", allow_duplicate=True),
@@ -208,14 +326,21 @@ def handle_risk_modal(add_clicks, active_cell, cancel_clicks, is_open, table_dat
      State("risk-impact", "value"),
      State("risk-level", "value"),
      State("risk-mitigation", "value"),
+     State("risk-controls", "value"),
      State("risk-owner", "value"),
      State("risk-status", "value"),
-     State("edit-risk-id", "data")],
+     State("edit-risk-id", "data"),
+     State("risks-table", "derived_virtual_row_ids"),
+     State("risks-table", "page_size"),
+     State("risks-table", "page_current"),
+     State("risks-table", "sort_by"),
+     State("risks-table", "filter_query")],
     prevent_initial_call=True
 )
 def save_risk(n_clicks, asset, title, description, category, likelihood, impact, 
-            risk_level, mitigation, owner, status, edit_risk_id):
-    """Add new risk or update existing risk and refresh table"""
+            risk_level, mitigation, controls, owner, status, edit_risk_id, row_ids, page_size,
+            page_current, sort_by, filter_query):
+    """Add new risk or update existing risk and patch the changed row into the table"""
     if n_clicks and title:
         try:
             # Extract asset ID from dropdown value (format: "1 - Asset Name")
@@ -225,7 +350,7 @@ def save_risk(n_clicks, asset, title, description, category, likelihood, impact,
             
             if edit_risk_id:
                 # Update existing risk
-                db.update_risk(
+                row = db.update_risk(
                     edit_risk_id,
                     asset_id=asset_id,
                     risk_title=title,
@@ -236,30 +361,37 @@ def save_risk(n_clicks, asset, title, description, category, likelihood, impact,
                     risk_level=risk_level or "Medium",
                     mitigation_strategy=mitigation or "",
                     owner=owner or "",
-                    status=status or "Open"
+                    status=status or "Open",
+                    control_ids=controls or []
                 )
             else:
                 # Add new risk
-                db.add_risk(asset_id, title, description or "", category or "", 
-                           likelihood or "Medium", impact or "Medium", risk_level or "Medium",
-                           mitigation or "", owner or "", status or "Open")
+                row = db.add_risk(asset_id, title, description or "", category or "", 
+                                 likelihood or "Medium", impact or "Medium", risk_level or "Medium",
+                                 mitigation or "", owner or "", status or "Open",
+                                 control_ids=controls or [], return_row=True)
             
-            # Refresh table
-            risks_df = db.get_risks()
-            table = create_data_table(risks_df, "risks-table")
+            # Send only the changed row, or the reloaded page when sorted/filtered/paged
+            data, page_count = patch_table_row(row, "risks-table", row_ids, page_size, edit_risk_id,
+                                               page_current, sort_by, filter_query)
             
             # Clear form and close modal
-            return table, "", "", "", "", "Medium", "Medium", "Medium", "", "", "Open", False, None
+            return data, page_count, "", "", "", "", "Medium", "Medium", "Medium", "", [], "", "Open", False, None
         except Exception as e:
             print(f"Error saving risk: {e}")
     
-    # Return current state
-    try:
-        risks_df = db.get_risks()
-        table = create_data_table(risks_df, "risks-table")
-        return table, "", "", "", "", "Medium", "Medium", "Medium", "", "", "Open", False, None
-    except:
-        return html.Div("Error loading risks"), "", "", "", "", "Medium", "Medium", "Medium", "", "", "Open", False, None
+    # Leave the table as it is
+    return no_update, no_update, "", "", "", "", "Medium", "Medium", "Medium", "", [], "", "Open", False, None
+
+@callback(
+    Output("risk-coverage", "children"),
+    [Input("risks-table", "data")],
+    prevent_initial_call=True
+)
+def refresh_risk_coverage(table_data):
+    """Re-render the coverage summary after risk writes; cached until the data version changes"""
+    from .layout import render_risk_coverage
+    return render_risk_coverage(db.get_risk_coverage(), limit=5)
 
 # Control callbacks
 @callback(
@@ -315,7 +447,8 @@ def handle_control_modal(add_clicks, active_cell, cancel_clicks, is_open, table_
             "Not Started", "Not Assessed", "")
 
 @callback(
-    [Output("controls-table-container", "children", allow_duplicate=True),
+    [Output("controls-table", "data", allow_duplicate=True),
+     Output("controls-table", "page_count", allow_duplicate=True),
      Output("control-id", "value", allow_duplicate=True),
      Output("control-name", "value", allow_duplicate=True),
      Output("control-description", "value", allow_duplicate=True),
@@ -333,17 +466,23 @@ def handle_control_modal(add_clicks, active_cell, cancel_clicks, is_open, table_
      State("control-implementation", "value"),
      State("control-effectiveness", "value"),
      State("control-owner", "value"),
-     State("edit-control-id", "data")],
+     State("edit-control-id", "data"),
+     State("controls-table", "derived_virtual_row_ids"),
+     State("controls-table", "page_size"),
+     State("controls-table", "page_current"),
+     State("controls-table", "sort_by"),
+     State("controls-table", "filter_query")],
     prevent_initial_call=True
 )
 def save_control(n_clicks, control_id, name, description, control_type, 
-               implementation, effectiveness, owner, edit_control_id):
-    """Add new control or update existing control and refresh table"""
+               implementation, effectiveness, owner, edit_control_id, row_ids, page_size,
+               page_current, sort_by, filter_query):
+    """Add new control or update existing control and patch the changed row into the table"""
     if n_clicks and control_id and name:
         try:
             if edit_control_id:
                 # Update existing control
-                db.update_control(
+                row = db.update_control(
                     edit_control_id,
                     control_id=control_id,
                     control_name=name,
@@ -355,26 +494,21 @@ def save_control(n_clicks, control_id, name, description, control_type,
                 )
             else:
                 # Add new control
-                db.add_control(control_id, name, description or "", control_type or "Preventive",
-                              implementation or "Not Started", effectiveness or "Not Assessed", 
-                              owner or "")
+                row = db.add_control(control_id, name, description or "", control_type or "Preventive",
+                                    implementation or "Not Started", effectiveness or "Not Assessed", 
+                                    owner or "", return_row=True)
             
-            # Refresh table
-            controls_df = db.get_controls()
-            table = create_data_table(controls_df, "controls-table")
+            # Send only the changed row, or the reloaded page when sorted/filtered/paged
+            data, page_count = patch_table_row(row, "controls-table", row_ids, page_size, edit_control_id,
+                                               page_current, sort_by, filter_query)
             
             # Clear form and close modal
-            return table, "", "", "", "Preventive", "Not Started", "Not Assessed", "", False, None
+            return data, page_count, "", "", "", "Preventive", "Not Started", "Not Assessed", "", False, None
         except Exception as e:
             print(f"Error saving control: {e}")
     
-    # Return current state
-    try:
-        controls_df = db.get_controls()
-        table = create_data_table(controls_df, "controls-table")
-        return table, "", "", "", "Preventive", "Not Started", "Not Assessed", "", False, None
-    except:
-        return html.Div("Error loading controls"), "", "", "", "Preventive", "Not Started", "Not Assessed", "", False, None
+    # Leave the table as it is
+    return no_update, no_update, "", "", "", "Preventive", "Not Started", "Not Assessed", "", False, None
 
 # Incident callbacks
 @callback(
@@ -403,7 +537,7 @@ def handle_incident_modal(add_clicks, active_cell, cancel_clicks, is_open, table
     
     if triggered_id == "add-incident-btn":
         # Open modal for adding new incident
-        return (True, "Add New Incident", None, "", "", "Medium", "", "", "", "Open", "", "")
+        return (True, "Add New Incident", None, "", "", "Medium", [], "", "", "Open", "", "")
     
     elif triggered_id == "incidents-table" and active_cell:
         # Check if Edit button was clicked
@@ -416,7 +550,7 @@ def handle_incident_modal(add_clicks, active_cell, cancel_clicks, is_open, table
                    row_data.get('incident_title', ''),
                    row_data.get('incident_description', ''),
                    row_data.get('severity', 'Medium'),
-                   row_data.get('affected_assets', ''),
+                   db.get_incident_asset_ids(incident_id),
                    row_data.get('root_cause', ''),
                    row_data.get('corrective_actions', ''),
                    row_data.get('status', 'Open'),
@@ -425,13 +559,14 @@ def handle_incident_modal(add_clicks, active_cell, cancel_clicks, is_open, table
     
     elif triggered_id == "cancel-incident":
         # Close modal and clear form
-        return (False, "Add New Incident", None, "", "", "Medium", "", "", "", "Open", "", "")
+        return (False, "Add New Incident", None, "", "", "Medium", [], "", "", "Open", "", "")
     
     # Default: return current state
-    return (is_open, "Add New Incident", None, "", "", "Medium", "", "", "", "Open", "", "")
+    return (is_open, "Add New Incident", None, "", "", "Medium", [], "", "", "Open", "", "")
 
 @callback(
-    [Output("incidents-table-container", "children", allow_duplicate=True),
+    [Output("incidents-table", "data", allow_duplicate=True),
+     Output("incidents-table", "page_count", allow_duplicate=True),
      Output("incident-title", "value", allow_duplicate=True),
      Output("incident-description", "value", allow_duplicate=True),
      Output("incident-severity", "value", allow_duplicate=True),
@@ -453,22 +588,28 @@ def handle_incident_modal(add_clicks, active_cell, cancel_clicks, is_open, table
      State("incident-status", "value"),
      State("incident-reported-by", "value"),
      State("incident-assigned-to", "value"),
-     State("edit-incident-id", "data")],
+     State("edit-incident-id", "data"),
+     State("incidents-table", "derived_virtual_row_ids"),
+     State("incidents-table", "page_size"),
+     State("incidents-table", "page_current"),
+     State("incidents-table", "sort_by"),
+     State("incidents-table", "filter_query")],
     prevent_initial_call=True
 )
 def save_incident(n_clicks, title, description, severity, assets, root_cause, 
-                actions, status, reported_by, assigned_to, edit_incident_id):
-    """Add new incident or update existing incident and refresh table"""
+                actions, status, reported_by, assigned_to, edit_incident_id, row_ids, page_size,
+                page_current, sort_by, filter_query):
+    """Add new incident or update existing incident and patch the changed row into the table"""
     if n_clicks and title:
         try:
             if edit_incident_id:
                 # Update existing incident
-                db.update_incident(
+                row = db.update_incident(
                     edit_incident_id,
                     incident_title=title,
                     incident_description=description or "",
                     severity=severity or "Medium",
-                    affected_assets=assets or "",
+                    asset_ids=assets or [],
                     root_cause=root_cause or "",
                     corrective_actions=actions or "",
                     status=status or "Open",
@@ -477,26 +618,22 @@ def save_incident(n_clicks, title, description, severity, assets, root_cause,
                 )
             else:
                 # Add new incident
-                db.add_incident(title, description or "", severity or "Medium", assets or "",
-                               root_cause or "", actions or "", status or "Open", 
-                               reported_by or "", assigned_to or "")
+                row = db.add_incident(title, description or "", severity or "Medium", "",
+                                     root_cause or "", actions or "", status or "Open", 
+                                     reported_by or "", assigned_to or "",
+                                     asset_ids=assets or [], return_row=True)
             
-            # Refresh table
-            incidents_df = db.get_incidents()
-            table = create_data_table(incidents_df, "incidents-table")
+            # Send only the changed row, or the reloaded page when sorted/filtered/paged
+            data, page_count = patch_table_row(row, "incidents-table", row_ids, page_size, edit_incident_id,
+                                               page_current, sort_by, filter_query)
             
             # Clear form and close modal
-            return table, "", "", "Medium", "", "", "", "Open", "", "", False, None
+            return data, page_count, "", "", "Medium", [], "", "", "Open", "", "", False, None
         except Exception as e:
             print(f"Error saving incident: {e}")
     
-    # Return current state
-    try:
-        incidents_df = db.get_incidents()
-        table = create_data_table(incidents_df, "incidents-table")
-        return table, "", "", "Medium", "", "", "", "Open", "", "", False, None
-    except:
-        return html.Div("Error loading incidents"), "", "", "Medium", "", "", "", "Open", "", "", False, None
+    # Leave the table as it is
+    return no_update, no_update, "", "", "Medium", [], "", "", "Open", "", "", False, None
 
 # Audit callbacks
 @callback(
@@ -552,6 +689,7 @@ def handle_audit_modal(add_clicks, active_cell, cancel_clicks, is_open, table_da
 
 @callback(
     [Output("audits-table", "data", allow_duplicate=True),
+     Output("audits-table", "page_count", allow_duplicate=True),
      Output("audit-modal", "is_open", allow_duplicate=True)],
     Input("submit-audit", "n_clicks"),
     [State("audit-title", "value"),
@@ -562,19 +700,23 @@ def handle_audit_modal(add_clicks, active_cell, cancel_clicks, is_open, table_da
      State("audit-recommendations", "value"),
      State("audit-score", "value"),
      State("audit-status", "value"),
-     State("edit-audit-id", "data")],
+     State("edit-audit-id", "data"),
+     State("audits-table", "derived_virtual_row_ids"),
+     State("audits-table", "page_size"),
+     State("audits-table", "page_current"),
+     State("audits-table", "sort_by"),
+     State("audits-table", "filter_query")],
     prevent_initial_call=True
 )
-def save_audit(n_clicks, title, audit_type, scope, auditor, findings, recommendations, score, status, edit_id):
+def save_audit(n_clicks, title, audit_type, scope, auditor, findings, recommendations, score, status, edit_id,
+               row_ids, page_size, page_current, sort_by, filter_query):
     """Handle audit form submission for add or edit"""
     if n_clicks is None:
         raise PreventUpdate
     
-    db = ISO42001Database()
-    
     if edit_id:
         # Update existing audit
-        db.update_audit(
+        row = db.update_audit(
             edit_id,
             audit_title=title,
             audit_type=audit_type,
@@ -587,80 +729,185 @@ def save_audit(n_clicks, title, audit_type, scope, auditor, findings, recommenda
         )
     else:
         # Add new audit
-        db.add_audit(title, audit_type, scope, auditor, findings, recommendations, score, status)
-    
-    # Refresh table data
-    audits_df = db.get_audits()
-    table_data = []
-    for _, audit in audits_df.iterrows():
-        table_data.append({
-            'id': audit['id'],
-            'audit_title': audit['audit_title'],
-            'audit_type': audit['audit_type'],
-            'audit_scope': audit['audit_scope'],
-            'auditor': audit['auditor'],
-            'findings': audit['findings'],
-            'recommendations': audit['recommendations'],
-            'compliance_score': audit['compliance_score'],
-            'status': audit['status'],
-            'created_at': audit['created_at'],
-            'edit': 'Edit'
-        })
-    
-    return table_data, False
+        row = db.add_audit(title, audit_type, scope, auditor, findings, recommendations, score, status,
+                           return_row=True)
+    
+    # Send only the changed row, or the reloaded page when sorted/filtered/paged
+    data, page_count = patch_table_row(row, "audits-table", row_ids, page_size, edit_id,
+                                       page_current, sort_by, filter_query)
+    return data, page_count, False
+
+# Global search
+@callback(
+    [Output("search-results", "children"),
+     Output("search-pagination", "max_value"),
+     Output("search-pagination", "active_page"),
+     Output("search-pagination", "style")],
+    [Input("global-search", "value"),
+     Input("search-pagination", "active_page")],
+    prevent_initial_call=True
+)
+def run_search(query, active_page):
+    """Show one page of full-text search hits; a new query starts at the first page"""
+    from .layout import SEARCH_PAGE_SIZE, render_search_results
+    if not query or not query.strip():
+        return [], 1, 1, {'display': 'none'}
+    
+    page = 1 if ctx.triggered_id == "global-search" else (active_page or 1)
+    hits, total = db.search(query, page=page - 1, page_size=SEARCH_PAGE_SIZE)
+    pages = max(1, math.ceil(total / SEARCH_PAGE_SIZE))
+    return (render_search_results(hits, total, page - 1), pages, page,
+            {} if pages > 1 else {'display': 'none'})
+
+@callback(
+    Output("main-tabs", "value"),
+    Input({'type': 'search-hit', 'table': ALL, 'index': ALL}, "n_clicks"),
+    prevent_initial_call=True
+)
+def open_search_hit(n_clicks):
+    """Switch to the tab of the clicked search hit"""
+    from .layout import SEARCH_TARGETS
+    # Rendering a new page of hits also triggers this, with no clicks
+    if not ctx.triggered_id or not ctx.triggered[0]['value']:
+        raise PreventUpdate
+    return SEARCH_TARGETS[ctx.triggered_id['table']][1]
 
 # Admin callbacks
+# Export and import are background callbacks (see background.py): they run off
+# the request thread, report progress and can be cancelled from the Admin tab
+def progress_reporter(set_progress):
+    """Adapt a ``progress(done, total, step)`` callback to the progress bar outputs"""
+    def report(done, total, step=""):
+        percent = int(100 * done / total) if total else 0
+        set_progress((percent, f"{percent}% {step}".strip()))
+    return report
+
 @callback(
-    Output("export-status", "children", allow_duplicate=True),
+    Output("export-status", "children"),
     [Input("export-btn", "n_clicks")],
+    background=True,
+    running=[
+        (Output("export-btn", "disabled"), True, False),
+        (Output("cancel-export-btn", "disabled"), False, True),
+        (Output("export-progress", "style"), {'display': 'flex'}, {'display': 'none'}),
+    ],
+    cancel=[Input("cancel-export-btn", "n_clicks")],
+    progress=[Output("export-progress", "value"), Output("export-progress", "label")],
+    progress_default=[0, ""],
     prevent_initial_call=True
 )
-def export_database(n_clicks):
-    """Export database to Excel"""
+def export_database(set_progress, n_clicks):
+    """Export the database to Excel in the background, reporting progress per chunk"""
     if n_clicks:
         try:
             export_path = f"iso42001_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            if db.export_database(export_path):
+            if db.export_database(export_path, progress=progress_reporter(set_progress)):
                 return dbc.Alert(f"Database exported successfully to {export_path}", 
-                               color="success", dismissable=True)
-            else:
-                return dbc.Alert("Export failed. Please try again.", 
-                               color="danger", dismissable=True)
+                                 color="success", dismissable=True)
+            return dbc.Alert("Export failed. Please try again.", color="danger", dismissable=True)
         except Exception as e:
-            return dbc.Alert(f"Export error: {str(e)}", 
-                           color="danger", dismissable=True)
-    return ""
+            return dbc.Alert(f"Export error: {str(e)}", color="danger", dismissable=True)
+    raise PreventUpdate
+
+# The browser streams the chosen workbook to the upload endpoint (app.py) and
+# passes on only the upload id, so the file never travels through a callback.
+# A failed upload passes on the endpoint's error message instead, which
+# import_database shows in the import panel.
+clientside_callback(
+    """
+    async function(contents, filename) {
+        if (!contents) {
+            return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+        }
+        const upload = await fetch(contents)
+            .then(data => data.blob())
+            .then(body => fetch(
+                "/api/import/upload?filename=" + encodeURIComponent(filename),
+                {method: "POST", body: body, headers: {"Content-Type": "application/octet-stream"}}
+            ))
+            .then(async response => {
+                // Error responses carry {"error": ...}, unless a proxy answered instead
+                const result = await response.json().catch(() => ({}));
+                if (!response.ok) {
+                    return {error: result.error || `${response.status} ${response.statusText}`};
+                }
+                return result;
+            })
+            .catch(error => ({error: error.message || String(error)}));
+        upload.filename = upload.filename || filename;
+        return [upload, null];
+    }
+    """,
+    [Output("import-upload", "data"),
+     Output("upload-data", "contents")],
+    Input("upload-data", "contents"),
+    State("upload-data", "filename"),
+    prevent_initial_call=True
+)
 
 @callback(
-    Output("import-status", "children", allow_duplicate=True),
-    [Input("upload-data", "contents")],
-    [State("upload-data", "filename")],
+    Output("import-status", "children"),
+    [Input("import-upload", "data")],
+    [State("import-mode", "value")],
+    background=True,
+    running=[
+        (Output("upload-data", "disabled"), True, False),
+        (Output("cancel-import-btn", "disabled"), False, True),
+        (Output("import-progress", "style"), {'display': 'flex'}, {'display': 'none'}),
+    ],
+    cancel=[Input("cancel-import-btn", "n_clicks")],
+    progress=[Output("import-progress", "value"), Output("import-progress", "label")],
+    progress_default=[0, ""],
     prevent_initial_call=True
 )
-def import_database(contents, filename):
-    """Import database from Excel"""
-    if contents is not None:
-        try:
-            # Decode file contents
-            content_type, content_string = contents.split(',')
-            decoded = base64.b64decode(content_string)
-            
-            # Save temporary file
-            temp_path = f"temp_import_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            with open(temp_path, 'wb') as f:
-                f.write(decoded)
-            
-            # Import data
-            if db.import_database(temp_path):
-                # Clean up temp file
-                import os
-                os.remove(temp_path)
-                return dbc.Alert(f"Database imported successfully from {filename}", 
-                               color="success", dismissable=True)
-            else:
-                return dbc.Alert("Import failed. Please check file format.", 
-                               color="danger", dismissable=True)
-        except Exception as e:
-            return dbc.Alert(f"Import error: {str(e)}", 
-                           color="danger", dismissable=True)
-    return ""
\ No newline at end of file
+def import_database(set_progress, upload, mode="replace"):
+    """Import an uploaded workbook, replacing all data or merging the changed rows"""
+    if not upload:
+        return ""
+    filename = upload.get('filename', "the upload")
+    if upload.get('error'):
+        return dbc.Alert(f"Upload of {filename} failed: {upload['error']}", 
+                         color="danger", dismissable=True)
+    
+    progress = progress_reporter(set_progress)
+    try:
+        path = upload_path(upload.get('upload_id'))
+        if mode == "merge":
+            # Apply only the differences; nothing changes if a row is invalid
+            counts = merge_workbook(db, path, progress=progress)
+            totals = {change: sum(c[change] for c in counts.values())
+                      for change in ('inserted', 'updated', 'unchanged')}
+            return dbc.Alert(f"Merged {filename}: {totals['inserted']} inserted, "
+                             f"{totals['updated']} updated, {totals['unchanged']} unchanged", 
+                           color="success", dismissable=True)
+        
+        # Validate, stage and swap in the data; nothing changes if a row is invalid
+        loaded = import_workbook(db, path, progress=progress)
+        return dbc.Alert(f"Database imported successfully from {filename} "
+                         f"({sum(loaded.values())} rows)", 
+                       color="success", dismissable=True)
+    except ImportValidationError as e:
+        return dbc.Alert(import_error_report(e.errors, filename), 
+                       color="danger", dismissable=True)
+    except Exception as e:
+        return dbc.Alert(f"Import error: {str(e)}", 
+                       color="danger", dismissable=True)
+    finally:
+        discard(upload.get('upload_id'))
+
+def import_error_report(errors, filename, limit=20):
+    """Render the row-level validation errors of a rejected import"""
+    items = [
+        html.Li(f"{error['sheet']}"
+                f"{' row ' + str(error['row']) if error['row'] else ''}, "
+                f"{error['column']}: {error['error']}"
+                f"{' (got ' + repr(error['value']) + ')' if error['value'] is not None else ''}")
+        for error in errors[:limit]
+    ]
+    if len(errors) > limit:
+        items.append(html.Li(f"... and {len(errors) - limit} more"))
+    return [
+        html.P(f"Import of {filename} rejected: {len(errors)} invalid value(s). "
+               f"No data was changed."),
+        html.Ul(items, className="mb-0")
+    ]
@@ -9,6 +9,11 @@ import os
 
 def main():
     """Main CLI entry point"""
+    # Background callbacks run in multiprocess children; in a frozen build a
+    # spawned child re-runs the entry point and must stop here
+    import multiprocess
+    multiprocess.freeze_support()
+    
     parser = argparse.ArgumentParser(
         description="ISO 42001 AI Management System Bookkeeping Application"
     )
@@ -32,22 +37,191 @@ def main():
         help="Run in debug mode"
     )
     
+    parser.add_argument(
+        "--db-profile",
+        choices=["default", "performance"],
+        default=None,
+        help="SQLite PRAGMA profile: 'default' (rollback journal) or "
+             "'performance' (WAL, synchronous=NORMAL, mmap, large cache)"
+    )
+    
+    parser.add_argument(
+        "--tab-cache-size",
+        type=int,
+        default=None,
+        help="Number of rendered tabs to cache (default: 16, 0 disables the cache)"
+    )
+    
+    parser.add_argument(
+        "--tab-cache-ttl",
+        type=float,
+        default=None,
+        help="Seconds a rendered tab stays cached (default: 300, 0 means no expiry)"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
         version=f"%(prog)s {get_version()}"
     )
     
+    # Maintenance commands; without one the web server is started
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    for name, help_text in (("export", "Back up the database to a file or directory"),
+                            ("import", "Restore a backup (replaces existing data)")):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument(
+            "path",
+            help="Excel file (.xlsx), SQLite snapshot (.db) or CSV/Parquet directory"
+        )
+        command.add_argument(
+            "--format",
+            choices=["excel", "csv", "parquet", "sqlite"],
+            default=None,
+            help="Backup format (default: guessed from the path)"
+        )
+        command.add_argument(
+            "--db",
+            default=None,
+            help="Database file to use (default: the application database)"
+        )
+        if name == "import":
+            command.add_argument(
+                "--merge",
+                action="store_true",
+                help="Apply only inserted/changed rows of an Excel workbook instead of "
+                     "replacing all data"
+            )
+            command.add_argument(
+                "--delete-missing",
+                action="store_true",
+                help="With --merge, also delete rows that are missing from a sheet"
+            )
+    
+    migrate_command = subparsers.add_parser(
+        "migrate", help="Apply pending schema migrations to the database")
+    migrate_command.add_argument(
+        "--db",
+        default=None,
+        help="Database file to migrate (default: the application database)"
+    )
+    migrate_command.add_argument(
+        "--to",
+        type=int,
+        default=None,
+        metavar="VERSION",
+        help="Schema version to migrate to (default: the latest)"
+    )
+    migrate_command.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list the pending migrations without changing the database"
+    )
+    
     args = parser.parse_args()
     
+    # Database handles are created on first use, so the profile only has to be
+    # in the environment before the first request
+    if args.db_profile:
+        os.environ['ISO42001_DB_PROFILE'] = args.db_profile
+        print(f"Using database profile: {args.db_profile}")
+    
+    if args.command in ("export", "import"):
+        sys.exit(run_backup_command(args))
+    if args.command == "migrate":
+        sys.exit(run_migrate_command(args))
+    
     # Import and run the app
     from . import app
+    from .app import configure_tab_cache, start_report_scheduler
+    
+    # Also export the cache settings so a debug reloader child picks them up
+    if args.tab_cache_size is not None:
+        os.environ['ISO42001_TAB_CACHE_SIZE'] = str(args.tab_cache_size)
+    if args.tab_cache_ttl is not None:
+        os.environ['ISO42001_TAB_CACHE_TTL'] = str(args.tab_cache_ttl)
+    configure_tab_cache(args.tab_cache_size, args.tab_cache_ttl)
     
     print(f"Starting ISO 42001 Bookkeeping Application...")
     print(f"Navigate to http://{args.host}:{args.port} to access the application")
     
+    start_report_scheduler(use_reloader=args.debug)
     app.run(debug=args.debug, host=args.host, port=args.port)
 
+def run_backup_command(args) -> int:
+    """Run ``iso42001 export`` / ``iso42001 import``; returns the exit status"""
+    import time
+    from . import backup
+    from .database import ISO42001Database
+    
+    try:
+        backup_format = args.format or backup.detect_format(args.path)
+    except ValueError as e:
+        if args.command == "import":
+            print(f"Error: {e}")
+            return 2
+        backup_format = "excel"
+    if backup_format == "parquet" and not backup.parquet_available():
+        print("Error: the parquet format requires pyarrow (pip install pyarrow)")
+        return 2
+    
+    started = time.perf_counter()
+    with ISO42001Database(args.db) as db:
+        if args.command == "export":
+            ok = db.export_database(args.path, format=backup_format)
+        else:
+            ok = db.import_database(args.path, format=backup_format,
+                                    mode="merge" if args.merge else "replace",
+                                    delete_missing=args.delete_missing)
+    elapsed = time.perf_counter() - started
+    
+    action = "Exported to" if args.command == "export" else "Imported from"
+    if ok is False:
+        print(f"{args.command.capitalize()} failed")
+        return 1
+    if isinstance(ok, dict):
+        # A merge returns what it changed per table
+        for table, changes in ok.items():
+            print(f"  {table}: {changes['inserted']} inserted, {changes['updated']} updated, "
+                  f"{changes['deleted']} deleted, {changes['unchanged']} unchanged")
+    print(f"{action} {args.path} ({backup_format}) in {elapsed:.1f}s")
+    return 0
+
+def run_migrate_command(args) -> int:
+    """Run ``iso42001 migrate``; returns the exit status"""
+    import time
+    from . import migrations
+    from .database import ISO42001Database
+    
+    started = time.perf_counter()
+    with ISO42001Database(args.db, migrate=False) as db:
+        with db.connection() as conn:
+            current = migrations.schema_version(conn)
+        print(f"Database: {db.db_path}")
+        print(f"Schema version: {current} (latest: {migrations.latest_version()})")
+        try:
+            results = migrations.migrate(db, target=args.to, dry_run=args.dry_run)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 2
+        except Exception as e:
+            print(f"Migration failed: {e}")
+            return 1
+    elapsed = time.perf_counter() - started
+    
+    for migration, seconds in results:
+        if args.dry_run:
+            print(f"  would apply {migration.version}: {migration.description}")
+        else:
+            print(f"  applied {migration.version}: {migration.description} ({seconds:.2f}s)")
+    if args.dry_run:
+        print(f"Dry run: {len(results)} pending migration(s), nothing changed")
+    elif results:
+        print(f"Migrated to version {results[-1][0].version} in {elapsed:.2f}s")
+    else:
+        print("Schema is up to date")
+    return 0
+
 def get_version():
     """Get version from package"""
     try:
@@ -1,19 +1,287 @@
+import os
 import sqlite3
+import threading
 import pandas as pd
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
+from itertools import islice
+import copy
 import json
-from typing import List, Dict, Optional, Any, Union
+import re
+from typing import List, Dict, Optional, Any, Tuple, Union, Iterable, Iterator, Sequence, Callable
+
+from . import migrations
+from .pool import ConnectionPool
+from .table_query import build_match_clause, build_order_by, build_where_clause, quote_identifier
+
+# PRAGMA profiles selectable via ISO42001Database(profile=...), init_database(profile=...)
+# or the ISO42001_DB_PROFILE environment variable / ``iso42001 --db-profile``
+PRAGMA_PROFILES = {
+    # SQLite defaults (rollback journal), only waiting on locks instead of failing
+    'default': {
+        'busy_timeout': 5000,
+    },
+    # WAL journal so readers never block writers and vice versa
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,   # 256 MiB
+        'cache_size': -65536,     # 64 MiB (negative = KiB)
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+
+# PRAGMAs stored in the database file itself; applied once in init_database
+DATABASE_PRAGMAS = ('journal_mode',)
+
+# Secondary indexes covering the ORDER BY, JOIN and WHERE columns of the hot
+# queries. Bump INDEX_SET_VERSION whenever this list changes; indexes that are
+# removed from it go into OBSOLETE_INDEXES so existing databases drop them.
+INDEX_SET_VERSION = 2
+INDEXES = [
+    ('idx_ai_assets_created_date', 'ai_assets', 'created_date'),
+    ('idx_ai_assets_status', 'ai_assets', 'status'),
+    ('idx_risks_created_date', 'risks', 'created_date'),
+    ('idx_risks_asset_id', 'risks', 'asset_id'),
+    ('idx_risks_status', 'risks', 'status'),
+    ('idx_controls_created_date', 'controls', 'created_date'),
+    ('idx_controls_implementation_status', 'controls', 'implementation_status'),
+    ('idx_incidents_created_date', 'incidents', 'created_date'),
+    ('idx_incidents_status', 'incidents', 'status'),
+    ('idx_audits_created_date', 'audits', 'created_date'),
+    ('idx_audits_status', 'audits', 'status'),
+    ('idx_risk_controls_risk_control', 'risk_controls', 'risk_id, control_id'),
+    ('idx_risk_controls_control', 'risk_controls', 'control_id'),
+    ('idx_incident_assets_asset', 'incident_assets', 'asset_id, incident_id'),
+]
+OBSOLETE_INDEXES: List[str] = []
+
+# Tables whose writes bump their row in data_versions (via triggers), so caches
+# can be validated with one primary-key lookup
+VERSIONED_TABLES = ['ai_assets', 'risks', 'controls', 'incidents', 'audits', 'risk_controls',
+                    'incident_assets']
+
+# Columns whose value distribution is kept in summary_counters by triggers.
+# Bump COUNTERS_VERSION whenever this mapping changes; the counter triggers are
+# then recreated and the counters rebuilt from the tables.
+COUNTERS_VERSION = 1
+SUMMARY_DIMENSIONS = {
+    'ai_assets': ['status', 'criticality', 'type'],
+    'risks': ['status', 'risk_level'],
+    'controls': ['implementation_status', 'effectiveness', 'control_type'],
+    'incidents': ['status', 'severity'],
+    'audits': ['status', 'audit_type'],
+}
+
+# Scalar report metrics returned by get_report_history for trend charts
+REPORT_TREND_METRICS = ['total_assets', 'total_risks', 'high_risks', 'total_controls',
+                        'effective_controls', 'open_incidents', 'completed_audits',
+                        'avg_compliance_score']
+
+# Report history kept by create_report_snapshot: one snapshot per clock-aligned
+# interval (a later snapshot in the same hour replaces it), and at most this
+# many snapshots (about 90 days of hourly points)
+REPORT_SNAPSHOT_INTERVAL = 3600
+REPORT_SNAPSHOT_RETENTION = 24 * 90
+
+# Risk-control coverage (see get_risk_coverage): the share of a risk that a
+# mapped, implemented control covers, by the control's effectiveness. A risk is
+# as covered as its best control; risks with an exempt status need no cover.
+CONTROL_COVERAGE = {'Effective': 1.0, 'Partially Effective': 0.5}
+COVERAGE_EXEMPT_STATUSES = ('Accepted', 'Closed')
+# Levels whose insufficiently covered risks get_risk_coverage lists, worst first
+COVERAGE_ALERT_LEVELS = ('Critical', 'High')
+COVERAGE_LIST_LIMIT = 20
+
+# Full-text search (see search): per table its code, title columns and free-text
+# columns, indexed in the FTS5 table search_index by triggers. A row is stored
+# under rowid ``id * SEARCH_ROWID_SPAN + code``, so the triggers touch it with
+# one rowid lookup and a hit maps back to its row. Changing this mapping needs
+# a migration that recreates the search triggers and rebuilds the index.
+SEARCH_ROWID_SPAN = 8
+SEARCH_SOURCES = {
+    'ai_assets': (1, ['name'], ['description']),
+    'risks': (2, ['risk_title'], ['risk_description', 'mitigation_strategy']),
+    'controls': (3, ['control_id', 'control_name'], ['control_description']),
+    'incidents': (4, ['incident_title'], ['incident_description', 'root_cause', 'corrective_actions']),
+    'audits': (5, ['audit_title'], ['findings', 'recommendations']),
+}
+
+# Markers around the matched terms in search titles and snippets
+SEARCH_HIGHLIGHT = ('<mark>', '</mark>')
+
+# Searches matching more rows than this list them newest first instead of by
+# relevance: ranking costs time per matching row, and such broad hit lists
+# carry little ranking signal anyway
+SEARCH_RANK_LIMIT = 2000
+
+# Row sources for server-side paged DataTables (see query_page)
+PAGE_SOURCES = {
+    'ai_assets': "SELECT * FROM ai_assets",
+    'risks': ("SELECT r.*, a.name AS asset_name FROM risks r "
+              "LEFT JOIN ai_assets a ON r.asset_id = a.id"),
+    'controls': "SELECT * FROM controls",
+    'incidents': "SELECT * FROM incidents",
+    'audits': "SELECT * FROM audits",
+}
+
+# Label expression of the (id, label) tuples returned by get_options
+OPTION_LABELS = {
+    'ai_assets': "name",
+    'risks': "risk_title",
+    'controls': "control_id || ' ' || control_name",
+    'incidents': "incident_title",
+    'audits': "audit_title",
+}
+
+# Workbook sheets written by export_database (and read back by import_database)
+EXPORT_SHEETS = [
+    ('Assets', 'ai_assets'),
+    ('Risks', 'risks'),
+    ('Controls', 'controls'),
+    ('Incidents', 'incidents'),
+    ('Audits', 'audits'),
+    ('Risk Controls', 'risk_controls'),
+]
+EXPORT_CHUNK_SIZE = 1000
+
+# Columns accepted by the bulk_add_* methods, with the defaults the matching
+# add_* method uses for values that are left out
+BULK_COLUMNS = {
+    'ai_assets': {'name': None, 'type': None, 'description': "", 'criticality': "Medium",
+                  'owner': "", 'status': "Active", 'last_reviewed': None},
+    'risks': {'asset_id': None, 'risk_title': None, 'risk_description': "", 'risk_category': "",
+              'likelihood': "Medium", 'impact': "Medium", 'risk_level': "Medium",
+              'mitigation_strategy': "", 'owner': "", 'status': "Open", 'review_date': None},
+    'controls': {'control_id': None, 'control_name': None, 'control_description': "",
+                 'control_type': "Preventive", 'implementation_status': "Not Started",
+                 'effectiveness': "Not Assessed", 'owner': "", 'next_review': None},
+    'incidents': {'incident_title': None, 'incident_description': "", 'severity': "Medium",
+                  'affected_assets': "", 'root_cause': "", 'corrective_actions': "",
+                  'status': "Open", 'reported_by': "", 'assigned_to': "", 'incident_date': None},
+    'audits': {'audit_title': None, 'audit_type': "Internal", 'audit_scope': "", 'auditor': "",
+               'findings': "", 'recommendations': "", 'compliance_score': 0, 'status': "Planned",
+               'audit_date': None},
+}
+# Date columns that add_* fill with the current date
+BULK_TODAY_COLUMNS = {'last_reviewed', 'review_date', 'next_review', 'incident_date', 'audit_date'}
+
+# add_* parameter names accepted in bulk rows in place of the column name
+BULK_ALIASES = {
+    'ai_assets': {'asset_type': 'type'},
+}
+
+# Natural keys identifying an existing row in upsert mode
+NATURAL_KEYS = {
+    'ai_assets': ('name',),
+    'risks': ('asset_id', 'risk_title'),
+    'controls': ('control_id',),
+    'incidents': ('incident_title',),
+    'audits': ('audit_title',),
+    'risk_controls': ('risk_id', 'control_id'),
+}
+
+BULK_CHUNK_SIZE = 500
+
+# Bulk writes of at least this many rows suspend the per-row triggers (see
+# triggers_suspended) and rebuild the counters and search index once instead
+BULK_SUSPEND_TRIGGERS_ROWS = 5000
+
+def _bulk_chunks(rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                 chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of at most ``chunk_size`` row dicts from a DataFrame or iterable"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if isinstance(rows, pd.DataFrame):
+        for start in range(0, len(rows), chunk_size):
+            yield rows.iloc[start:start + chunk_size].to_dict('records')
+        return
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _search_text(columns: List[str], prefix: str = "") -> str:
+    """SQL expression joining ``columns`` (NULLs as empty) into one searchable text"""
+    return " || ' ' || ".join(f"coalesce({prefix}{column}, '')" for column in columns)
+
+def _fts_query(text: str) -> str:
+    """FTS5 query matching every word of ``text`` as a prefix; operators are taken literally"""
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text or ""))
+
+def _asset_references(text: Optional[str], lookup: Dict[str, int]) -> List[int]:
+    """Ids of the assets named in a free-text affected_assets value.
+    
+    Entries are separated by commas, semicolons or newlines and name an asset
+    by id, as "<id> - <name>" or by name (case-insensitive; ``lookup`` maps
+    lowercase names and id strings to ids). Other entries are skipped.
+    """
+    found: List[int] = []
+    for entry in re.split(r"[,;\n]", text or ""):
+        entry = entry.strip().lower()
+        match = re.match(r"#?(\d+)\s*(?:[-:]|$)", entry)
+        asset_id = lookup.get(match.group(1)) if match else None
+        if asset_id is None:
+            asset_id = lookup.get(entry)
+        if asset_id is not None and asset_id not in found:
+            found.append(asset_id)
+    return found
+
+def _incident_assets_label(incident_id: str) -> str:
+    """SQL expression listing the names of the assets linked to ``incident_id``"""
+    return ("coalesce((SELECT group_concat(name, ', ') FROM (SELECT a.name FROM incident_assets l "
+            f"JOIN ai_assets a ON a.id = l.asset_id WHERE l.incident_id = {incident_id} "
+            "ORDER BY a.name)), '')")
+
+def resolve_pragma_profile(profile: Union[str, Dict[str, Any], None] = None) -> Dict[str, Any]:
+    """Return the PRAGMA settings for a profile name or custom mapping"""
+    if profile is None:
+        profile = os.environ.get('ISO42001_DB_PROFILE', 'default')
+    if isinstance(profile, dict):
+        return dict(profile)
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. "
+                         f"Available profiles: {', '.join(PRAGMA_PROFILES)}")
+    return dict(PRAGMA_PROFILES[profile])
 
 class ISO42001Database:
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 8,
+                 health_check_interval: float = 30.0,
+                 profile: Union[str, Dict[str, Any], None] = None,
+                 migrate: bool = True):
         if db_path is None:
             db_path = self._get_default_db_path()
         self.db_path = db_path
-        self.init_database()
+        self.pragmas = resolve_pragma_profile(profile)
+        self._stats_cache = None
+        self._coverage_cache = None
+        self._page_columns: Dict[str, List[str]] = {}
+        self.pool = ConnectionPool(db_path, max_size=pool_size,
+                                   health_check_interval=health_check_interval,
+                                   on_connect=self._apply_connection_pragmas)
+        self.init_database(migrate=migrate)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
     
-    def _get_default_db_path(self) -> str:
+    @property
+    def closed(self) -> bool:
+        return self.pool.closed
+    
+    @staticmethod
+    def _get_default_db_path() -> str:
         """Get the default database path, handling PyInstaller bundles"""
-        import os
         import sys
         
         # Check if running in PyInstaller bundle
@@ -34,16 +302,54 @@ class ISO42001Database:
         return db_path
     
     def get_connection(self):
-        """Get database connection with foreign key support"""
+        """Get a standalone (unpooled) database connection with foreign key support.
+
+        The caller owns the returned connection and must close it.
+        """
         conn = sqlite3.connect(self.db_path)
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
     
-    def init_database(self):
-        """Initialize the database with all required tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def connection(self):
+        """Context manager yielding the calling thread's pooled connection"""
+        return self.pool.connection()
+    
+    def _apply_connection_pragmas(self, conn: sqlite3.Connection):
+        """Apply the per-connection PRAGMAs of the active profile"""
+        for name, value in self.pragmas.items():
+            if name not in DATABASE_PRAGMAS:
+                conn.execute(f"PRAGMA {name} = {value}")
+    
+    def get_pragma_settings(self) -> Dict[str, Any]:
+        """Read back the effective values of the profile's PRAGMAs"""
+        with self.connection() as conn:
+            return {name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                    for name in self.pragmas}
+    
+    def init_database(self, profile: Union[str, Dict[str, Any], None] = None,
+                      migrate: bool = True):
+        """Apply the PRAGMA profile and bring the schema up to date.
+        
+        If ``profile`` is given it replaces the PRAGMA profile chosen at
+        construction time; connections opened later pick it up automatically.
+        Pending migrations (see migrations.py) are applied unless ``migrate``
+        is False; a file whose schema is current is left as it is.
+        """
+        if profile is not None:
+            self.pragmas = resolve_pragma_profile(profile)
         
+        with self.connection() as conn:
+            self._apply_connection_pragmas(conn)
+            for name in DATABASE_PRAGMAS:
+                if name in self.pragmas:
+                    conn.execute(f"PRAGMA {name} = {self.pragmas[name]}")
+            current = self._schema_is_current(conn)
+        
+        if migrate and not current:
+            migrations.migrate(self)
+    
+    def _create_tables(self, cursor: sqlite3.Cursor):
+        """Base schema of migration 1; later table changes are new migrations"""
         # AI Assets table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS ai_assets (
@@ -59,7 +365,7 @@ class ISO42001Database:
                 updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
+    
         # Risk Management table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS risks (
@@ -80,7 +386,7 @@ class ISO42001Database:
                 FOREIGN KEY (asset_id) REFERENCES ai_assets (id)
             )
         ''')
-        
+    
         # Controls table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS controls (
@@ -98,7 +404,7 @@ class ISO42001Database:
                 updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
+    
         # Risk-Control mapping table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS risk_controls (
@@ -110,7 +416,7 @@ class ISO42001Database:
                 FOREIGN KEY (control_id) REFERENCES controls (id)
             )
         ''')
-        
+    
         # Incidents table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS incidents (
@@ -130,7 +436,7 @@ class ISO42001Database:
                 updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        
+    
         # Compliance Audits table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS audits (
@@ -150,364 +456,1517 @@ class ISO42001Database:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Schema metadata (index set version etc.)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        
+        # Per-table write counters maintained by triggers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        
+        # Row counts per table and per value of the SUMMARY_DIMENSIONS columns.
+        # The row count of a table is stored under dimension '*' and value ''.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS summary_counters (
+                table_name TEXT NOT NULL,
+                dimension TEXT NOT NULL,
+                value TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (table_name, dimension, value)
+            )
+        ''')
+        
+        # Materialized regulatory report summaries (see create_report_snapshot)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS report_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data_version INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+    def _ensure_schema_objects(self, cursor: sqlite3.Cursor):
+        """Bring the indexes, version triggers and summary counters up to date (caller commits)"""
+        self._ensure_indexes(cursor)
+        self._ensure_version_triggers(cursor)
+        self._ensure_counters(cursor)
+        self._ensure_search_triggers(cursor)
+        self._ensure_incident_asset_triggers(cursor)
+    
+    def _schema_is_current(self, conn: sqlite3.Connection) -> bool:
+        """Whether every migration is applied and the index and counter versions are current"""
+        if migrations.schema_version(conn) < migrations.latest_version():
+            return False
+        stored = dict(conn.execute(
+            "SELECT key, value FROM schema_meta WHERE key IN ('index_version', 'counters_version')"
+        ).fetchall())
+        required = {'index_version': INDEX_SET_VERSION, 'counters_version': COUNTERS_VERSION}
+        return all(key in stored and int(stored[key]) >= version
+                   for key, version in required.items())
+    
+    def _ensure_counters(self, cursor: sqlite3.Cursor):
+        """(Re)create the summary counter triggers and rebuild the counters if outdated"""
+        row = cursor.execute(
+            "SELECT value FROM schema_meta WHERE key = 'counters_version'"
+        ).fetchone()
+        if row is not None and int(row[0]) >= COUNTERS_VERSION:
+            return
+        
+        existing = [name for (name,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_counters_%'"
+        )]
+        for name in existing:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        
+        for table, dimensions in SUMMARY_DIMENSIONS.items():
+            increment = ("INSERT INTO summary_counters (table_name, dimension, value, count) "
+                         "SELECT '{table}', '{dim}', {val}, 1 WHERE {val} IS NOT NULL "
+                         "ON CONFLICT (table_name, dimension, value) DO UPDATE SET count = count + 1;")
+            decrement = ("UPDATE summary_counters SET count = count - 1 "
+                         "WHERE table_name = '{table}' AND dimension = '{dim}' AND value = {val};")
+            
+            on_insert = [increment.format(table=table, dim='*', val="''")]
+            on_delete = [decrement.format(table=table, dim='*', val="''")]
+            for dim in dimensions:
+                on_insert.append(increment.format(table=table, dim=dim, val=f"NEW.{dim}"))
+                on_delete.append(decrement.format(table=table, dim=dim, val=f"OLD.{dim}"))
+                cursor.execute(f'''
+                    CREATE TRIGGER trg_{table}_counters_update_{dim}
+                    AFTER UPDATE OF {dim} ON {table}
+                    WHEN OLD.{dim} IS NOT NEW.{dim}
+                    BEGIN
+                        {decrement.format(table=table, dim=dim, val=f"OLD.{dim}")}
+                        {increment.format(table=table, dim=dim, val=f"NEW.{dim}")}
+                    END
+                ''')
+            
+            cursor.execute(f'''
+                CREATE TRIGGER trg_{table}_counters_insert AFTER INSERT ON {table}
+                BEGIN
+                    {' '.join(on_insert)}
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER trg_{table}_counters_delete AFTER DELETE ON {table}
+                BEGIN
+                    {' '.join(on_delete)}
+                END
+            ''')
+        
+        self._rebuild_counters(cursor)
+        cursor.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('counters_version', ?)",
+            (str(COUNTERS_VERSION),)
+        )
+    
+    def _rebuild_counters(self, cursor: sqlite3.Cursor):
+        """Recompute summary_counters from the tables (caller commits)"""
+        cursor.execute("DELETE FROM summary_counters")
+        for table, dimensions in SUMMARY_DIMENSIONS.items():
+            cursor.execute(
+                f"INSERT INTO summary_counters (table_name, dimension, value, count) "
+                f"SELECT '{table}', '*', '', COUNT(*) FROM {table}"
+            )
+            for dim in dimensions:
+                cursor.execute(
+                    f"INSERT INTO summary_counters (table_name, dimension, value, count) "
+                    f"SELECT '{table}', '{dim}', {dim}, COUNT(*) FROM {table} "
+                    f"WHERE {dim} IS NOT NULL GROUP BY {dim}"
+                )
+    
+    def _ensure_version_triggers(self, cursor: sqlite3.Cursor):
+        """Create the triggers that bump data_versions on every write"""
+        for table in VERSIONED_TABLES:
+            cursor.execute(
+                "INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)",
+                (table,)
+            )
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE data_versions SET version = version + 1
+                        WHERE table_name = '{table}';
+                    END
+                ''')
+    
+    def _ensure_search_triggers(self, cursor: sqlite3.Cursor):
+        """Create the triggers that keep search_index in sync with the SEARCH_SOURCES tables"""
+        for table, (code, title, body) in SEARCH_SOURCES.items():
+            upsert = (f"INSERT OR REPLACE INTO search_index (rowid, title, body) VALUES "
+                      f"(NEW.id * {SEARCH_ROWID_SPAN} + {code}, "
+                      f"{_search_text(title, 'NEW.')}, {_search_text(body, 'NEW.')});")
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table}
+                BEGIN
+                    {upsert}
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update
+                AFTER UPDATE OF {', '.join(title + body)} ON {table}
+                BEGIN
+                    {upsert}
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table}
+                BEGIN
+                    DELETE FROM search_index WHERE rowid = OLD.id * {SEARCH_ROWID_SPAN} + {code};
+                END
+            ''')
+    
+    def _index_search_rows(self, conn: sqlite3.Connection, table: str,
+                           first_id: Optional[int] = None, last_id: Optional[int] = None):
+        """(Re)index the rows of ``table``, or those with ids from ``first_id`` to ``last_id``"""
+        code, title, body = SEARCH_SOURCES[table]
+        where, params = "", ()
+        if first_id is not None:
+            where, params = "WHERE id BETWEEN ? AND ?", (first_id, last_id)
+        conn.execute(
+            f"INSERT OR REPLACE INTO search_index (rowid, title, body) "
+            f"SELECT id * {SEARCH_ROWID_SPAN} + {code}, {_search_text(title)}, {_search_text(body)} "
+            f"FROM {table} {where}", params
+        )
+    
+    def _ensure_incident_asset_triggers(self, cursor: sqlite3.Cursor):
+        """Create the triggers that keep incidents.affected_assets listing the linked asset names.
+    
+        Created after the incident_assets backfill, so entries of the original
+        text that name no asset are kept until the links of an incident change.
+        """
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_incident_assets_label_insert
+            AFTER INSERT ON incident_assets
+            BEGIN
+                UPDATE incidents SET affected_assets = {_incident_assets_label('NEW.incident_id')}
+                WHERE id = NEW.incident_id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_incident_assets_label_delete
+            AFTER DELETE ON incident_assets
+            BEGIN
+                UPDATE incidents SET affected_assets = {_incident_assets_label('OLD.incident_id')}
+                WHERE id = OLD.incident_id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_ai_assets_label_rename
+            AFTER UPDATE OF name ON ai_assets
+            WHEN OLD.name IS NOT NEW.name
+            BEGIN
+                UPDATE incidents SET affected_assets = {_incident_assets_label('incidents.id')}
+                WHERE id IN (SELECT incident_id FROM incident_assets WHERE asset_id = NEW.id);
+            END
+        ''')
+    
+    def _asset_reference_lookup(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """Map of lowercase asset names (unless shared by several assets) and id strings to ids"""
+        rows = conn.execute("SELECT id, name FROM ai_assets").fetchall()
+        names: Dict[str, List[int]] = {}
+        for asset_id, name in rows:
+            if name and name.strip():
+                names.setdefault(name.strip().lower(), []).append(asset_id)
+        lookup = {name: ids[0] for name, ids in names.items() if len(ids) == 1}
+        lookup.update((str(asset_id), asset_id) for asset_id, _ in rows)
+        return lookup
+    
+    def _link_incident_assets(self, conn: sqlite3.Connection, lookup: Dict[str, int],
+                              first_id: Optional[int] = None, last_id: Optional[int] = None):
+        """Link incidents (those with ids from ``first_id`` to ``last_id``) to the assets their
+        affected_assets text names, see _asset_references"""
+        where, params = "", ()
+        if first_id is not None:
+            where, params = "AND id BETWEEN ? AND ?", (first_id, last_id)
+        rows = conn.execute(
+            f"SELECT id, affected_assets FROM incidents WHERE affected_assets <> '' {where}", params
+        ).fetchall()
+        conn.executemany(
+            "INSERT OR IGNORE INTO incident_assets (incident_id, asset_id) VALUES (?, ?)",
+            [(incident_id, asset_id) for incident_id, text in rows
+             for asset_id in _asset_references(text, lookup)]
+        )
+    
+    def _set_incident_assets(self, cursor: sqlite3.Cursor, incident_id: int, asset_ids: Iterable[int]):
+        """Make ``asset_ids`` the linked assets of an incident (caller commits)"""
+        asset_ids = list(dict.fromkeys(int(asset_id) for asset_id in asset_ids))
+        placeholders = ", ".join("?" * len(asset_ids))
+        cursor.execute(
+            f"DELETE FROM incident_assets WHERE incident_id = ? AND asset_id NOT IN ({placeholders})",
+            [incident_id, *asset_ids]
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO incident_assets (incident_id, asset_id) VALUES (?, ?)",
+            [(incident_id, asset_id) for asset_id in asset_ids]
+        )
+    
+    def _relink_incident_assets(self, conn: sqlite3.Connection,
+                                incident_ids: Optional[Iterable[int]] = None,
+                                after_id: Optional[int] = None):
+        """Replace the asset links of incidents with the assets their affected_assets text names.
+    
+        Applies to the incidents in ``incident_ids`` and those with an id above
+        ``after_id`` (all incidents if both are None). The text is written by
+        an import or bulk load and is kept as it is, so the label triggers are
+        dropped while linking (caller commits).
+        """
+        if incident_ids is None and after_id is None:
+            where, params = "", ()
+        else:
+            where = "WHERE id > ? OR id IN (SELECT value FROM json_each(?))"
+            params = (-1 if after_id is None else after_id,
+                      json.dumps([int(incident_id) for incident_id in incident_ids or []]))
+        cursor = conn.cursor()
+        for event in ('insert', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_incident_assets_label_{event}")
+        cursor.execute(
+            f"DELETE FROM incident_assets WHERE incident_id IN (SELECT id FROM incidents {where})",
+            params
+        )
+        lookup = self._asset_reference_lookup(conn)
+        rows = cursor.execute(f"SELECT id, affected_assets FROM incidents {where}", params).fetchall()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO incident_assets (incident_id, asset_id) VALUES (?, ?)",
+            [(incident_id, asset_id) for incident_id, text in rows
+             for asset_id in _asset_references(text, lookup)]
+        )
+        self._ensure_incident_asset_triggers(cursor)
+    
+    @contextmanager
+    def triggers_suspended(self, conn: sqlite3.Connection):
+        """Drop the data version, summary counter and search triggers for a bulk load on ``conn``.
+    
+        Per-row trigger work dominates loads of many rows. On exit the triggers
+        are recreated, the counters and the search index rebuilt in one pass
+        and every versioned table's version bumped, all inside the caller's
+        transaction (which the caller commits; rolling back restores the
+        triggers).
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        cursor = conn.cursor()
+        triggers = [name for (name,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND (name LIKE 'trg_%_counters_%' OR name LIKE 'trg_%_version_%' "
+            "OR name LIKE 'trg_%_search_%')"
+        )]
+        for name in triggers:
+            cursor.execute(f"DROP TRIGGER {name}")
+    
+        yield
+    
+        cursor.execute("DELETE FROM schema_meta WHERE key = 'counters_version'")
+        self._ensure_counters(cursor)
+        self._ensure_version_triggers(cursor)
+        cursor.execute("DELETE FROM search_index")
+        for table in SEARCH_SOURCES:
+            self._index_search_rows(conn, table)
+        self._ensure_search_triggers(cursor)
+        cursor.execute("UPDATE data_versions SET version = version + 1")
+    
+    def _ensure_indexes(self, cursor: sqlite3.Cursor):
+        """Create the secondary index set if the stored index version is outdated"""
+        row = cursor.execute(
+            "SELECT value FROM schema_meta WHERE key = 'index_version'"
+        ).fetchone()
+        if row is not None and int(row[0]) >= INDEX_SET_VERSION:
+            return
+        
+        for name in OBSOLETE_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        for name, table, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+        cursor.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('index_version', ?)",
+            (str(INDEX_SET_VERSION),)
+        )
     
     # Assets CRUD operations
     def add_asset(self, name: str, asset_type: str, description: str = "", 
-                  criticality: str = "Medium", owner: str = "", status: str = "Active") -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO ai_assets (name, type, description, criticality, owner, status, last_reviewed)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (name, asset_type, description, criticality, owner, status, datetime.now().date()))
-        asset_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+                  criticality: str = "Medium", owner: str = "", status: str = "Active",
+                  return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO ai_assets (name, type, description, criticality, owner, status, last_reviewed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (name, asset_type, description, criticality, owner, status, datetime.now().date()))
+            asset_id = cursor.lastrowid
+            conn.commit()
+        if return_row:
+            return self.get_row('ai_assets', asset_id)
         return asset_id
     
-    def get_assets(self) -> pd.DataFrame:
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM ai_assets ORDER BY created_date DESC", conn)
-        conn.close()
-        return df
+    def get_assets(self, columns: Optional[Sequence[str]] = None,
+                         where: Optional[Dict[str, Any]] = None,
+                         limit: Optional[int] = None) -> pd.DataFrame:
+        """Assets, newest first; see select_rows for the arguments"""
+        return self.select_rows('ai_assets', columns, where, limit)
     
-    def update_asset(self, asset_id: int, **kwargs) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def update_asset(self, asset_id: int, **kwargs) -> Optional[Dict[str, Any]]:
+        """Update the given fields and return the updated row (None if it does not exist)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['name', 'type', 'description', 'criticality', 'owner', 'status']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        if fields:
-            fields.append("updated_date = ?")
-            values.append(datetime.now())
-            values.append(asset_id)
+            # Build dynamic update query
+            fields = []
+            values = []
+            for key, value in kwargs.items():
+                if key in ['name', 'type', 'description', 'criticality', 'owner', 'status']:
+                    fields.append(f"{key} = ?")
+                    values.append(value)
+        
+            if fields:
+                fields.append("updated_date = ?")
+                values.append(datetime.now())
+                values.append(asset_id)
             
-            query = f"UPDATE ai_assets SET {', '.join(fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            conn.commit()
+                query = f"UPDATE ai_assets SET {', '.join(fields)} WHERE id = ?"
+                cursor.execute(query, values)
+                conn.commit()
         
-        conn.close()
-        return True
+        return self.get_row('ai_assets', asset_id)
     
     def delete_asset(self, asset_id: int) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM ai_assets WHERE id = ?", (asset_id,))
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM incident_assets WHERE asset_id = ?", (asset_id,))
+            cursor.execute("DELETE FROM ai_assets WHERE id = ?", (asset_id,))
+            conn.commit()
         return True
     
     # Risk CRUD operations
     def add_risk(self, asset_id: Optional[int], risk_title: str, risk_description: str = "",
                  risk_category: str = "", likelihood: str = "Medium", impact: str = "Medium",
                  risk_level: str = "Medium", mitigation_strategy: str = "", owner: str = "", 
-                 status: str = "Open") -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO risks (asset_id, risk_title, risk_description, risk_category, 
-                             likelihood, impact, risk_level, mitigation_strategy, owner, status, review_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (asset_id, risk_title, risk_description, risk_category, likelihood, impact, 
-              risk_level, mitigation_strategy, owner, status, datetime.now().date()))
-        risk_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+                 status: str = "Open", control_ids: Optional[Iterable[int]] = None,
+                 return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        """Add a risk; ``control_ids`` maps it to the controls that mitigate it"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO risks (asset_id, risk_title, risk_description, risk_category, 
+                                 likelihood, impact, risk_level, mitigation_strategy, owner, status, review_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (asset_id, risk_title, risk_description, risk_category, likelihood, impact, 
+                  risk_level, mitigation_strategy, owner, status, datetime.now().date()))
+            risk_id = cursor.lastrowid
+            if control_ids:
+                self._set_risk_controls(cursor, risk_id, control_ids)
+            conn.commit()
+        if return_row:
+            return self.get_row('risks', risk_id)
         return risk_id
     
-    def get_risks(self) -> pd.DataFrame:
-        conn = self.get_connection()
-        query = '''
-            SELECT r.*, a.name as asset_name 
-            FROM risks r 
-            LEFT JOIN ai_assets a ON r.asset_id = a.id 
-            ORDER BY r.created_date DESC
-        '''
-        df = pd.read_sql_query(query, conn)
-        conn.close()
-        return df
+    def get_risks(self, columns: Optional[Sequence[str]] = None,
+                        where: Optional[Dict[str, Any]] = None,
+                        limit: Optional[int] = None) -> pd.DataFrame:
+        """Risks (with the joined asset_name), newest first; see select_rows for the arguments"""
+        return self.select_rows('risks', columns, where, limit)
     
-    def update_risk(self, risk_id: int, **kwargs) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def update_risk(self, risk_id: int, control_ids: Optional[Iterable[int]] = None,
+                    **kwargs) -> Optional[Dict[str, Any]]:
+        """Update the given fields and return the updated row (None if it does not exist).
         
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['asset_id', 'risk_title', 'risk_description', 'risk_category', 
-                      'likelihood', 'impact', 'risk_level', 'mitigation_strategy', 'owner', 'status']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        if fields:
-            fields.append("updated_date = ?")
-            values.append(datetime.now())
-            values.append(risk_id)
+        ``control_ids`` replaces the mapped controls (see get_risk_control_ids).
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+        
+            # Build dynamic update query
+            fields = []
+            values = []
+            for key, value in kwargs.items():
+                if key in ['asset_id', 'risk_title', 'risk_description', 'risk_category', 
+                          'likelihood', 'impact', 'risk_level', 'mitigation_strategy', 'owner', 'status']:
+                    fields.append(f"{key} = ?")
+                    values.append(value)
+        
+            if fields or control_ids is not None:
+                fields.append("updated_date = ?")
+                values.append(datetime.now())
+                values.append(risk_id)
             
-            query = f"UPDATE risks SET {', '.join(fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            conn.commit()
+                query = f"UPDATE risks SET {', '.join(fields)} WHERE id = ?"
+                cursor.execute(query, values)
+                if control_ids is not None and cursor.rowcount:
+                    self._set_risk_controls(cursor, risk_id, control_ids)
+                conn.commit()
         
-        conn.close()
-        return True
+        return self.get_row('risks', risk_id)
     
     def delete_risk(self, risk_id: int) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM risks WHERE id = ?", (risk_id,))
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM risk_controls WHERE risk_id = ?", (risk_id,))
+            cursor.execute("DELETE FROM risks WHERE id = ?", (risk_id,))
+            conn.commit()
         return True
     
     # Control CRUD operations
     def add_control(self, control_id: str, control_name: str, control_description: str = "",
                    control_type: str = "Preventive", implementation_status: str = "Not Started",
-                   effectiveness: str = "Not Assessed", owner: str = "") -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO controls (control_id, control_name, control_description, control_type,
-                                implementation_status, effectiveness, owner, next_review)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (control_id, control_name, control_description, control_type, 
-              implementation_status, effectiveness, owner, datetime.now().date()))
-        db_control_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+                   effectiveness: str = "Not Assessed", owner: str = "",
+                   return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO controls (control_id, control_name, control_description, control_type,
+                                    implementation_status, effectiveness, owner, next_review)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (control_id, control_name, control_description, control_type, 
+                  implementation_status, effectiveness, owner, datetime.now().date()))
+            db_control_id = cursor.lastrowid
+            conn.commit()
+        if return_row:
+            return self.get_row('controls', db_control_id)
         return db_control_id
     
-    def get_controls(self) -> pd.DataFrame:
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM controls ORDER BY created_date DESC", conn)
-        conn.close()
-        return df
+    def get_controls(self, columns: Optional[Sequence[str]] = None,
+                           where: Optional[Dict[str, Any]] = None,
+                           limit: Optional[int] = None) -> pd.DataFrame:
+        """Controls, newest first; see select_rows for the arguments"""
+        return self.select_rows('controls', columns, where, limit)
     
-    def update_control(self, control_db_id: int, **kwargs) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def update_control(self, control_db_id: int, **kwargs) -> Optional[Dict[str, Any]]:
+        """Update the given fields and return the updated row (None if it does not exist)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+        
+            # Build dynamic update query
+            fields = []
+            values = []
+            for key, value in kwargs.items():
+                if key in ['control_id', 'control_name', 'control_description', 'control_type', 
+                          'implementation_status', 'effectiveness', 'owner']:
+                    fields.append(f"{key} = ?")
+                    values.append(value)
         
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['control_id', 'control_name', 'control_description', 'control_type', 
-                      'implementation_status', 'effectiveness', 'owner']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        if fields:
-            fields.append("updated_date = ?")
-            values.append(datetime.now())
-            values.append(control_db_id)
+            if fields:
+                fields.append("updated_date = ?")
+                values.append(datetime.now())
+                values.append(control_db_id)
             
-            query = f"UPDATE controls SET {', '.join(fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            conn.commit()
+                query = f"UPDATE controls SET {', '.join(fields)} WHERE id = ?"
+                cursor.execute(query, values)
+                conn.commit()
         
-        conn.close()
-        return True
+        return self.get_row('controls', control_db_id)
     
     def delete_control(self, control_db_id: int) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM controls WHERE id = ?", (control_db_id,))
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM risk_controls WHERE control_id = ?", (control_db_id,))
+            cursor.execute("DELETE FROM controls WHERE id = ?", (control_db_id,))
+            conn.commit()
         return True
     
     # Incident CRUD operations
     def add_incident(self, incident_title: str, incident_description: str = "", 
                     severity: str = "Medium", affected_assets: str = "", root_cause: str = "",
                     corrective_actions: str = "", status: str = "Open", reported_by: str = "",
-                    assigned_to: str = "") -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO incidents (incident_title, incident_description, severity, 
-                                 affected_assets, root_cause, corrective_actions, status,
-                                 reported_by, assigned_to, incident_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (incident_title, incident_description, severity, affected_assets, root_cause,
-              corrective_actions, status, reported_by, assigned_to, datetime.now().date()))
-        incident_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+                    assigned_to: str = "", asset_ids: Optional[Iterable[int]] = None,
+                    return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        """Add an incident; ``asset_ids`` links it to assets, whose names then make up affected_assets"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO incidents (incident_title, incident_description, severity, 
+                                     affected_assets, root_cause, corrective_actions, status,
+                                     reported_by, assigned_to, incident_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (incident_title, incident_description, severity, affected_assets, root_cause,
+                  corrective_actions, status, reported_by, assigned_to, datetime.now().date()))
+            incident_id = cursor.lastrowid
+            if asset_ids:
+                self._set_incident_assets(cursor, incident_id, asset_ids)
+            conn.commit()
+        if return_row:
+            return self.get_row('incidents', incident_id)
         return incident_id
     
-    def get_incidents(self) -> pd.DataFrame:
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM incidents ORDER BY created_date DESC", conn)
-        conn.close()
-        return df
+    def get_incidents(self, columns: Optional[Sequence[str]] = None,
+                            where: Optional[Dict[str, Any]] = None,
+                            limit: Optional[int] = None) -> pd.DataFrame:
+        """Incidents, newest first; see select_rows for the arguments"""
+        return self.select_rows('incidents', columns, where, limit)
     
-    def update_incident(self, incident_id: int, **kwargs) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def update_incident(self, incident_id: int, asset_ids: Optional[Iterable[int]] = None,
+                        **kwargs) -> Optional[Dict[str, Any]]:
+        """Update the given fields and return the updated row (None if it does not exist).
         
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['incident_title', 'incident_description', 'severity', 'affected_assets', 
-                      'root_cause', 'corrective_actions', 'status', 'reported_by', 'assigned_to']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        if fields:
-            fields.append("updated_date = ?")
-            values.append(datetime.now())
-            values.append(incident_id)
+        ``asset_ids`` replaces the linked assets (see get_incident_asset_ids).
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+        
+            # Build dynamic update query
+            fields = []
+            values = []
+            for key, value in kwargs.items():
+                if key in ['incident_title', 'incident_description', 'severity', 'affected_assets', 
+                          'root_cause', 'corrective_actions', 'status', 'reported_by', 'assigned_to']:
+                    fields.append(f"{key} = ?")
+                    values.append(value)
+        
+            if fields or asset_ids is not None:
+                fields.append("updated_date = ?")
+                values.append(datetime.now())
+                values.append(incident_id)
             
-            query = f"UPDATE incidents SET {', '.join(fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            conn.commit()
+                query = f"UPDATE incidents SET {', '.join(fields)} WHERE id = ?"
+                cursor.execute(query, values)
+                if asset_ids is not None and cursor.rowcount:
+                    self._set_incident_assets(cursor, incident_id, asset_ids)
+                conn.commit()
         
-        conn.close()
-        return True
+        return self.get_row('incidents', incident_id)
     
     def delete_incident(self, incident_id: int) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM incidents WHERE id = ?", (incident_id,))
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM incident_assets WHERE incident_id = ?", (incident_id,))
+            cursor.execute("DELETE FROM incidents WHERE id = ?", (incident_id,))
+            conn.commit()
         return True
     
+    # Risk-control mappings
+    def _set_risk_controls(self, cursor: sqlite3.Cursor, risk_id: int, control_ids: Iterable[int]):
+        """Make ``control_ids`` the mapped controls of a risk (caller commits)"""
+        control_ids = list(dict.fromkeys(int(control_id) for control_id in control_ids))
+        placeholders = ", ".join("?" * len(control_ids))
+        cursor.execute(
+            f"DELETE FROM risk_controls WHERE risk_id = ? AND control_id NOT IN ({placeholders})",
+            [risk_id, *control_ids]
+        )
+        cursor.executemany(
+            "INSERT INTO risk_controls (risk_id, control_id) SELECT ?1, ?2 "
+            "WHERE NOT EXISTS (SELECT 1 FROM risk_controls WHERE risk_id = ?1 AND control_id = ?2)",
+            [(risk_id, control_id) for control_id in control_ids]
+        )
+    
+    def link_risk_controls(self, pairs: Iterable[Tuple[int, int]],
+                           chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Map ``(risk_id, control_id)`` pairs in one transaction; returns the number of new mappings.
+        
+        Pairs that are already mapped are skipped. An unknown id raises
+        sqlite3.IntegrityError and nothing is committed.
+        """
+        added = 0
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for chunk in _bulk_chunks(pairs, chunk_size):
+                    cursor.executemany(
+                        "INSERT INTO risk_controls (risk_id, control_id) SELECT ?1, ?2 "
+                        "WHERE NOT EXISTS (SELECT 1 FROM risk_controls "
+                        "WHERE risk_id = ?1 AND control_id = ?2)",
+                        [(int(risk_id), int(control_id)) for risk_id, control_id in chunk]
+                    )
+                    added += cursor.rowcount
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        return added
+    
+    def unlink_risk_controls(self, pairs: Iterable[Tuple[int, int]],
+                             chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """Remove the mappings of ``(risk_id, control_id)`` pairs; returns the number removed"""
+        removed = 0
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _bulk_chunks(pairs, chunk_size):
+                cursor.executemany(
+                    "DELETE FROM risk_controls WHERE risk_id = ? AND control_id = ?",
+                    [(int(risk_id), int(control_id)) for risk_id, control_id in chunk]
+                )
+                removed += cursor.rowcount
+            conn.commit()
+        return removed
+    
+    def get_risk_control_ids(self, risk_id: int) -> List[int]:
+        """Ids of the controls mapped to a risk"""
+        with self.connection() as conn:
+            return [control_id for (control_id,) in conn.execute(
+                "SELECT DISTINCT control_id FROM risk_controls WHERE risk_id = ? ORDER BY control_id",
+                (risk_id,)
+            )]
+    
+    def get_control_risk_ids(self, control_id: int) -> List[int]:
+        """Ids of the risks a control is mapped to"""
+        with self.connection() as conn:
+            return [risk_id for (risk_id,) in conn.execute(
+                "SELECT DISTINCT risk_id FROM risk_controls WHERE control_id = ? ORDER BY risk_id",
+                (control_id,)
+            )]
+    
+    # Risk coverage
+    def _risk_coverage_source(self, levels: Optional[Sequence[str]] = None) -> Tuple[str, List[Any]]:
+        """SQL with one row per risk and its control coverage (see CONTROL_COVERAGE)"""
+        weights = " ".join("WHEN ? THEN ?" for _ in CONTROL_COVERAGE)
+        params: List[Any] = [value for item in CONTROL_COVERAGE.items() for value in item]
+        where = ""
+        if levels is not None:
+            where = f"WHERE r.risk_level IN ({', '.join('?' * len(levels))})"
+            params += list(levels)
+        query = f'''
+            SELECT r.id AS risk_id, r.risk_title, r.risk_level, r.status, r.owner, r.created_date,
+                   COUNT(DISTINCT m.control_id) AS controls,
+                   COUNT(DISTINCT CASE WHEN c.implementation_status = 'Implemented'
+                                        AND c.effectiveness = 'Effective' THEN c.id END) AS effective_controls,
+                   COALESCE(MAX(CASE WHEN c.implementation_status = 'Implemented'
+                                     THEN CASE c.effectiveness {weights} END END), 0.0) AS coverage
+            FROM risks r
+            LEFT JOIN risk_controls m ON m.risk_id = r.id
+            LEFT JOIN controls c ON c.id = m.control_id
+            {where}
+            GROUP BY r.id
+        '''
+        return query, params
+    
+    def query_risk_coverage(self, levels: Optional[Sequence[str]] = None,
+                            uncovered_only: bool = False,
+                            limit: Optional[int] = None) -> pd.DataFrame:
+        """Control coverage per risk, highest level and least covered first.
+        
+        Columns: risk_id, risk_title, risk_level, status, owner, controls
+        (mapped), effective_controls (implemented and effective), coverage
+        (0 to 1, see CONTROL_COVERAGE) and residual (1 - coverage).
+        ``levels`` keeps risks of these levels and ``uncovered_only`` the
+        risks needing cover (status not exempt) that are not fully covered.
+        The whole result is one grouped join over the mapping index.
+        """
+        source, params = self._risk_coverage_source(levels)
+        where = ""
+        if uncovered_only:
+            where = (f"WHERE coverage < 1 AND status NOT IN "
+                     f"({', '.join('?' * len(COVERAGE_EXEMPT_STATUSES))})")
+            params += list(COVERAGE_EXEMPT_STATUSES)
+        query = f'''
+            SELECT risk_id, risk_title, risk_level, status, owner, controls, effective_controls,
+                   coverage, 1.0 - coverage AS residual
+            FROM ({source}) {where}
+            ORDER BY CASE risk_level WHEN 'Critical' THEN 0 WHEN 'High' THEN 1
+                                     WHEN 'Medium' THEN 2 ELSE 3 END,
+                     coverage, created_date DESC, risk_id DESC
+        '''
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self.connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def get_risk_coverage(self, limit: int = COVERAGE_LIST_LIMIT) -> Dict[str, Any]:
+        """How well the risks that need cover are covered by controls, cached by data version.
+        
+        Returns the counts of covered, partially covered and uncovered risks
+        (in total and per ``by_level``), their average coverage in percent,
+        and ``uncovered_risks``: the ``limit`` worst covered Critical and High
+        risks out of ``uncovered_total``. The result is recomputed only after
+        a write to risks, controls or risk_controls.
+        """
+        versions = self.get_data_versions()
+        version = tuple(versions.get(table, 0) for table in ('risks', 'controls', 'risk_controls'))
+        cached = self._coverage_cache
+        if cached is not None and cached[0] == (version, limit):
+            return copy.deepcopy(cached[1])
+        
+        source, params = self._risk_coverage_source()
+        exempt = ", ".join("?" * len(COVERAGE_EXEMPT_STATUSES))
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT risk_level, COUNT(*), SUM(coverage >= 1), SUM(coverage > 0 AND coverage < 1), "
+                f"SUM(coverage = 0), SUM(coverage) FROM ({source}) "
+                f"WHERE status NOT IN ({exempt}) GROUP BY risk_level",
+                params + list(COVERAGE_EXEMPT_STATUSES)
+            ).fetchall()
+        by_level = {}
+        for level, risks, covered, partial, uncovered, _ in rows:
+            by_level[level or 'Unrated'] = {'risks': risks, 'covered': covered,
+                                            'partially_covered': partial, 'uncovered': uncovered}
+        total = sum(row[1] for row in rows)
+        alerts = self.query_risk_coverage(COVERAGE_ALERT_LEVELS, uncovered_only=True, limit=limit)
+        coverage = {
+            'risks': total,
+            'covered': sum(row[2] for row in rows),
+            'partially_covered': sum(row[3] for row in rows),
+            'uncovered': sum(row[4] for row in rows),
+            'avg_coverage': round(100 * sum(row[5] for row in rows) / total, 1) if total else 0,
+            'by_level': by_level,
+            'uncovered_total': sum(by_level.get(level, {}).get('risks', 0)
+                                   - by_level.get(level, {}).get('covered', 0)
+                                   for level in COVERAGE_ALERT_LEVELS),
+            'uncovered_risks': alerts.to_dict('records'),
+        }
+        self._coverage_cache = ((version, limit), coverage)
+        return copy.deepcopy(coverage)
+    
+    # Incident-asset links
+    def get_incident_asset_ids(self, incident_id: int) -> List[int]:
+        """Ids of the assets linked to an incident"""
+        with self.connection() as conn:
+            return [asset_id for (asset_id,) in conn.execute(
+                "SELECT asset_id FROM incident_assets WHERE incident_id = ? ORDER BY asset_id",
+                (incident_id,)
+            )]
+    
+    def get_asset_incidents(self, asset_id: int, limit: Optional[int] = None) -> pd.DataFrame:
+        """Incidents linked to an asset, newest first"""
+        query = ("SELECT i.* FROM incident_assets l JOIN incidents i ON i.id = l.incident_id "
+                 "WHERE l.asset_id = ? ORDER BY i.created_date DESC, i.id DESC")
+        params: List[Any] = [asset_id]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self.connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def get_asset_incident_summary(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """Incident counts per linked asset, most affected first.
+        
+        Columns: asset_id, asset_name, incidents, open_incidents and
+        last_incident_date. The links are grouped on their asset index, so
+        the cost follows the number of links rather than of incidents.
+        """
+        query = '''
+            SELECT l.asset_id, a.name AS asset_name, COUNT(*) AS incidents,
+                   SUM(i.status = 'Open') AS open_incidents,
+                   MAX(i.incident_date) AS last_incident_date
+            FROM incident_assets l
+            JOIN incidents i ON i.id = l.incident_id
+            JOIN ai_assets a ON a.id = l.asset_id
+            GROUP BY l.asset_id
+            ORDER BY incidents DESC, asset_name
+        '''
+        params: List[Any] = []
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self.connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
     # Audit CRUD operations
     def add_audit(self, audit_title: str, audit_type: str = "Internal", audit_scope: str = "",
                  auditor: str = "", findings: str = "", recommendations: str = "",
-                 compliance_score: int = 0, status: str = "Planned") -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO audits (audit_title, audit_type, audit_scope, auditor, 
-                              findings, recommendations, compliance_score, status, audit_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (audit_title, audit_type, audit_scope, auditor, findings, recommendations,
-              compliance_score, status, datetime.now().date()))
-        audit_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+                 compliance_score: int = 0, status: str = "Planned",
+                 return_row: bool = False) -> Union[int, Dict[str, Any]]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO audits (audit_title, audit_type, audit_scope, auditor, 
+                                  findings, recommendations, compliance_score, status, audit_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (audit_title, audit_type, audit_scope, auditor, findings, recommendations,
+                  compliance_score, status, datetime.now().date()))
+            audit_id = cursor.lastrowid
+            conn.commit()
+        if return_row:
+            return self.get_row('audits', audit_id)
         return audit_id
     
-    def get_audits(self) -> pd.DataFrame:
-        conn = self.get_connection()
-        df = pd.read_sql_query("SELECT * FROM audits ORDER BY created_date DESC", conn)
-        conn.close()
-        return df
+    def get_audits(self, columns: Optional[Sequence[str]] = None,
+                         where: Optional[Dict[str, Any]] = None,
+                         limit: Optional[int] = None) -> pd.DataFrame:
+        """Audits, newest first; see select_rows for the arguments"""
+        return self.select_rows('audits', columns, where, limit)
     
-    def update_audit(self, audit_id: int, **kwargs) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def update_audit(self, audit_id: int, **kwargs) -> Optional[Dict[str, Any]]:
+        """Update the given fields and return the updated row (None if it does not exist)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+        
+            # Build dynamic update query
+            fields = []
+            values = []
+            for key, value in kwargs.items():
+                if key in ['audit_title', 'audit_type', 'audit_scope', 'auditor', 
+                          'findings', 'recommendations', 'compliance_score', 'status']:
+                    fields.append(f"{key} = ?")
+                    values.append(value)
         
-        # Build dynamic update query
-        fields = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['audit_title', 'audit_type', 'audit_scope', 'auditor', 
-                      'findings', 'recommendations', 'compliance_score', 'status']:
-                fields.append(f"{key} = ?")
-                values.append(value)
-        
-        if fields:
-            fields.append("updated_date = ?")
-            values.append(datetime.now())
-            values.append(audit_id)
+            if fields:
+                fields.append("updated_date = ?")
+                values.append(datetime.now())
+                values.append(audit_id)
             
-            query = f"UPDATE audits SET {', '.join(fields)} WHERE id = ?"
-            cursor.execute(query, values)
-            conn.commit()
+                query = f"UPDATE audits SET {', '.join(fields)} WHERE id = ?"
+                cursor.execute(query, values)
+                conn.commit()
         
-        conn.close()
-        return True
+        return self.get_row('audits', audit_id)
     
     def delete_audit(self, audit_id: int) -> bool:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM audits WHERE id = ?", (audit_id,))
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM audits WHERE id = ?", (audit_id,))
+            conn.commit()
         return True
     
+    # Bulk operations
+    def _normalize_bulk_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the known columns of ``row`` (resolving aliases), dropping empty (None/NaN) values"""
+        columns = BULK_COLUMNS[table]
+        aliases = BULK_ALIASES.get(table, {})
+        normalized = {}
+        for key, value in row.items():
+            column = aliases.get(key, key)
+            if column not in columns:
+                continue
+            if pd.api.types.is_scalar(value) and pd.isna(value):
+                continue
+            normalized[column] = value
+        return normalized
+    
+    def _bulk_write(self, table: str, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                    upsert: bool = False, key: Optional[Sequence[str]] = None,
+                    chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+        """Write many rows to ``table`` with executemany in a single transaction.
+        
+        ``rows`` is a DataFrame or an iterable of dicts keyed by column name;
+        unknown keys are ignored and missing or empty (None/NaN) values get
+        the add_* defaults on insert and leave the stored value on update.
+        With ``upsert`` rows whose natural ``key`` (default NATURAL_KEYS)
+        matches an existing row update the columns they provide instead of
+        inserting; within the input the last row for a key wins. Rows are
+        processed ``chunk_size`` at a time and nothing is committed unless
+        every chunk succeeds. Once BULK_SUSPEND_TRIGGERS_ROWS rows are seen the
+        per-row triggers are suspended for the rest of the write. Written
+        incidents are linked to the assets their affected_assets text names.
+        Returns the number of inserted and updated rows.
+        """
+        columns = list(BULK_COLUMNS[table])
+        key = tuple(key or NATURAL_KEYS[table])
+        unknown = [column for column in key if column not in columns]
+        if unknown:
+            raise ValueError(f"Unknown key column(s) for {table}: {', '.join(unknown)}")
+        
+        today = datetime.now().date()
+        defaults = {column: today if column in BULK_TODAY_COLUMNS else default
+                    for column, default in BULK_COLUMNS[table].items()}
+        insert_sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                      f"VALUES ({', '.join('?' for _ in columns)})")
+        counts = {'inserted': 0, 'updated': 0}
+        # A DataFrame's size is known up front; other inputs are counted as they come
+        rows_seen = len(rows) if isinstance(rows, pd.DataFrame) else 0
+        
+        with self.connection() as conn, ExitStack() as suspended:
+            cursor = conn.cursor()
+            existing: Dict[tuple, int] = {}
+            last_id = 0
+            # Ids above this one are inserted below (AUTOINCREMENT never reuses ids)
+            first_new_after = cursor.execute(f"SELECT coalesce(max(id), 0) FROM {table}").fetchone()[0]
+            relink: List[int] = []
+            triggers_off = False
+            if upsert:
+                for row_id, *values in cursor.execute(f"SELECT id, {', '.join(key)} FROM {table}"):
+                    existing[tuple(values)] = row_id
+                    last_id = max(last_id, row_id)
+            
+            for chunk in _bulk_chunks(rows, chunk_size):
+                if rows_seen >= BULK_SUSPEND_TRIGGERS_ROWS and not triggers_off:
+                    suspended.enter_context(self.triggers_suspended(conn))
+                    triggers_off = True
+                if not isinstance(rows, pd.DataFrame):
+                    rows_seen += len(chunk)
+                inserts: Dict[Any, List[Any]] = {}
+                updates: Dict[Tuple[str, ...], Dict[int, List[Any]]] = {}
+                for position, raw in enumerate(chunk):
+                    row = self._normalize_bulk_row(table, raw)
+                    natural_key = tuple(row.get(column) for column in key)
+                    row_id = existing.get(natural_key) if upsert else None
+                    if row_id is None:
+                        values = [row[column] if column in row else defaults[column]
+                                  for column in columns]
+                        inserts[natural_key if upsert else position] = values
+                    else:
+                        fields = tuple(column for column in columns
+                                       if column in row and column not in key)
+                        if fields:
+                            updates.setdefault(fields, {})[row_id] = [row[f] for f in fields]
+                
+                if inserts:
+                    cursor.executemany(insert_sql, list(inserts.values()))
+                    counts['inserted'] += len(inserts)
+                now = datetime.now()
+                for fields, by_id in updates.items():
+                    assignments = ", ".join(f"{field} = ?" for field in fields)
+                    cursor.executemany(
+                        f"UPDATE {table} SET {assignments}, updated_date = ? WHERE id = ?",
+                        [values + [now, row_id] for row_id, values in by_id.items()]
+                    )
+                    counts['updated'] += len(by_id)
+                    if 'affected_assets' in fields:
+                        relink.extend(by_id)
+                
+                if upsert and inserts:
+                    # Later chunks must update, not duplicate, the rows just inserted
+                    for row_id, *values in cursor.execute(
+                            f"SELECT id, {', '.join(key)} FROM {table} WHERE id > ?", (last_id,)):
+                        existing[tuple(values)] = row_id
+                        last_id = max(last_id, row_id)
+            if table == 'incidents' and (counts['inserted'] or relink):
+                self._relink_incident_assets(conn, relink, after_id=first_new_after)
+            # Restore the triggers and rebuild what they maintain before committing
+            suspended.close()
+            conn.commit()
+        return counts
+    
+    def bulk_add_assets(self, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                        upsert: bool = False, key: Optional[Sequence[str]] = None,
+                        chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+        """Insert (or upsert on ``name``) many assets in one transaction"""
+        return self._bulk_write('ai_assets', rows, upsert, key, chunk_size)
+    
+    def bulk_add_risks(self, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                       upsert: bool = False, key: Optional[Sequence[str]] = None,
+                       chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+        """Insert (or upsert on ``asset_id`` + ``risk_title``) many risks in one transaction"""
+        return self._bulk_write('risks', rows, upsert, key, chunk_size)
+    
+    def bulk_add_controls(self, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                          upsert: bool = False, key: Optional[Sequence[str]] = None,
+                          chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+        """Insert (or upsert on ``control_id``) many controls in one transaction"""
+        return self._bulk_write('controls', rows, upsert, key, chunk_size)
+    
+    def bulk_add_incidents(self, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                           upsert: bool = False, key: Optional[Sequence[str]] = None,
+                           chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+        """Insert (or upsert on ``incident_title``) many incidents in one transaction"""
+        return self._bulk_write('incidents', rows, upsert, key, chunk_size)
+    
+    def bulk_add_audits(self, rows: Union[pd.DataFrame, Iterable[Dict[str, Any]]],
+                        upsert: bool = False, key: Optional[Sequence[str]] = None,
+                        chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+        """Insert (or upsert on ``audit_title``) many audits in one transaction"""
+        return self._bulk_write('audits', rows, upsert, key, chunk_size)
+    
     # Database export/import functions
-    def export_database(self, export_path: str) -> bool:
-        """Export all database tables to Excel file"""
+    def export_database(self, export_path: str, chunk_size: int = EXPORT_CHUNK_SIZE,
+                        progress: Optional[Callable[[int, int, str], None]] = None,
+                        format: Optional[str] = None) -> bool:
+        """Export all database tables to Excel file
+        
+        Rows are streamed from a cursor ``chunk_size`` at a time into a
+        write-only openpyxl workbook, so memory use stays flat however large
+        the tables are. ``progress(rows_done, rows_total, sheet)`` is called
+        after every chunk.
+        
+        ``format`` selects one of the faster backup formats in ``backup``
+        instead ('csv', 'parquet' or 'sqlite'); by default it is guessed from
+        ``export_path`` and falls back to Excel.
+        """
+        from openpyxl import Workbook
+        from . import backup
+        
         try:
-            with pd.ExcelWriter(export_path, engine='openpyxl') as writer:
-                # Export each table to a separate sheet
-                self.get_assets().to_excel(writer, sheet_name='Assets', index=False)
-                self.get_risks().to_excel(writer, sheet_name='Risks', index=False)
-                self.get_controls().to_excel(writer, sheet_name='Controls', index=False)
-                self.get_incidents().to_excel(writer, sheet_name='Incidents', index=False)
-                self.get_audits().to_excel(writer, sheet_name='Audits', index=False)
+            if format is None:
+                try:
+                    format = backup.detect_format(export_path)
+                except ValueError:
+                    format = 'excel'
+            if format != 'excel':
+                exporter = backup.EXPORTERS[format]
+                if format == 'sqlite':
+                    exporter(self, export_path, progress=progress)
+                else:
+                    exporter(self, export_path, chunk_size=chunk_size, progress=progress)
+                return True
+            
+            with self.connection() as conn:
+                rows_total = sum(
+                    conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for _, table in EXPORT_SHEETS
+                )
+                rows_done = 0
+                if progress:
+                    progress(rows_done, rows_total, "")
+                
+                workbook = Workbook(write_only=True)
+                for sheet_name, table in EXPORT_SHEETS:
+                    # One sheet per table, newest rows first like the getters
+                    sheet = workbook.create_sheet(sheet_name)
+                    source = PAGE_SOURCES.get(table, f"SELECT * FROM {table}")
+                    cursor = conn.execute(f"SELECT * FROM ({source}) ORDER BY created_date DESC")
+                    sheet.append([column[0] for column in cursor.description])
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            sheet.append(row)
+                        rows_done += len(rows)
+                        if progress:
+                            progress(rows_done, rows_total, sheet_name)
+                    cursor.close()
+            workbook.save(export_path)
             return True
         except Exception as e:
             print(f"Export error: {e}")
             return False
     
-    def import_database(self, import_path: str) -> bool:
-        """Import data from Excel file - WARNING: This will replace existing data"""
+    def import_database(self, import_path: str, format: Optional[str] = None,
+                        mode: str = 'replace', delete_missing: bool = False
+                        ) -> Union[bool, Dict[str, Dict[str, int]]]:
+        """Import data from Excel file - WARNING: This will replace existing data
+        
+        The workbook is validated and staged first (see ``importer``); if any
+        row is invalid nothing is changed. With ``mode='merge'`` only the rows
+        that differ from the database are inserted or updated (and, with
+        ``delete_missing``, rows missing from a sheet deleted) instead.
+        Backups written in another format (see ``backup``) are restored with
+        the matching importer; ``format`` is guessed from the path if omitted.
+        
+        Returns False if the import failed. Otherwise a merge returns the
+        inserted/updated/deleted/unchanged counts per table (see
+        ``importer.merge_workbook``) and any other import True.
+        """
+        from . import backup, importer
+        
         try:
-            conn = self.get_connection()
-            
-            # Clear existing data
-            cursor = conn.cursor()
-            tables = ['ai_assets', 'risks', 'controls', 'incidents', 'audits']
-            for table in tables:
-                cursor.execute(f"DELETE FROM {table}")
-            
-            # Import data from Excel
-            excel_file = pd.ExcelFile(import_path)
-            
-            if 'Assets' in excel_file.sheet_names:
-                assets_df = pd.read_excel(import_path, sheet_name='Assets')
-                assets_df.to_sql('ai_assets', conn, if_exists='append', index=False)
-            
-            if 'Risks' in excel_file.sheet_names:
-                risks_df = pd.read_excel(import_path, sheet_name='Risks')
-                # Remove asset_name column if it exists (it's a joined column)
-                if 'asset_name' in risks_df.columns:
-                    risks_df = risks_df.drop('asset_name', axis=1)
-                risks_df.to_sql('risks', conn, if_exists='append', index=False)
-            
-            if 'Controls' in excel_file.sheet_names:
-                controls_df = pd.read_excel(import_path, sheet_name='Controls')
-                controls_df.to_sql('controls', conn, if_exists='append', index=False)
-            
-            if 'Incidents' in excel_file.sheet_names:
-                incidents_df = pd.read_excel(import_path, sheet_name='Incidents')
-                incidents_df.to_sql('incidents', conn, if_exists='append', index=False)
-            
-            if 'Audits' in excel_file.sheet_names:
-                audits_df = pd.read_excel(import_path, sheet_name='Audits')
-                audits_df.to_sql('audits', conn, if_exists='append', index=False)
-            
-            conn.commit()
-            conn.close()
+            format = format or backup.detect_format(import_path)
+            if mode not in ('replace', 'merge'):
+                raise ValueError(f"Unknown import mode '{mode}'")
+            if mode == 'merge':
+                if format != 'excel':
+                    raise ValueError("Merge imports are only supported for Excel workbooks")
+                return importer.merge_workbook(self, import_path, delete_missing=delete_missing)
+            if format != 'excel':
+                backup.IMPORTERS[format](self, import_path)
+            else:
+                importer.import_workbook(self, import_path)
             return True
+        except importer.ImportValidationError as e:
+            print(f"Import error: {e}")
+            for error in e.errors[:20]:
+                print(f"  {error['sheet']} row {error['row']}, {error['column']}: {error['error']}")
+            return False
         except Exception as e:
             print(f"Import error: {e}")
             return False
     
+    def get_row(self, table: str, row_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch one row of ``table`` as a dict, shaped like a query_page record"""
+        if table not in PAGE_SOURCES:
+            raise ValueError(f"Unknown table '{table}'")
+        with self.connection() as conn:
+            cursor = conn.execute(f"SELECT * FROM ({PAGE_SOURCES[table]}) WHERE id = ?", (row_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+    
+    def select_rows(self, table: str, columns: Optional[Sequence[str]] = None,
+                    where: Optional[Dict[str, Any]] = None,
+                    limit: Optional[int] = None) -> pd.DataFrame:
+        """Rows of ``table`` shaped like query_page records, newest first.
+        
+        ``columns`` limits the columns that are read, ``where`` keeps rows
+        matching ``{column: value}`` (a list of values matches any of them,
+        None matches NULL) and ``limit`` caps the number of rows.
+        """
+        if table not in PAGE_SOURCES:
+            raise ValueError(f"Unknown table '{table}'")
+        available = self.get_page_columns(table) if columns is not None or where else []
+        if columns is None:
+            selected = "*"
+        else:
+            unknown = [column for column in columns if column not in available]
+            if unknown:
+                raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+            selected = ", ".join(quote_identifier(column) for column in columns)
+        clause, params = build_match_clause(where, available)
+        query = f"SELECT {selected} FROM ({PAGE_SOURCES[table]}) {clause} ORDER BY created_date DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self.connection() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+    
+    def get_options(self, table: str) -> List[Tuple[int, str]]:
+        """``(id, label)`` tuples of ``table`` for dropdowns, newest first, without a DataFrame"""
+        if table not in OPTION_LABELS:
+            raise ValueError(f"Unknown table '{table}'")
+        with self.connection() as conn:
+            return conn.execute(
+                f"SELECT id, {OPTION_LABELS[table]} FROM {table} ORDER BY created_date DESC"
+            ).fetchall()
+    
+    def get_asset_options(self) -> List[Tuple[int, str]]:
+        """``(id, name)`` of every asset"""
+        return self.get_options('ai_assets')
+    
+    def get_risk_options(self) -> List[Tuple[int, str]]:
+        """``(id, risk_title)`` of every risk"""
+        return self.get_options('risks')
+    
+    def get_control_options(self) -> List[Tuple[int, str]]:
+        """``(id, "<control_id> <control_name>")`` of every control"""
+        return self.get_options('controls')
+    
+    # Server-side paging for DataTables
+    def get_page_columns(self, table: str) -> List[str]:
+        """Column names returned by query_page for ``table``"""
+        if table not in PAGE_SOURCES:
+            raise ValueError(f"Unknown table '{table}'")
+        # The schema is fixed after init_database, so the names are read once per table
+        if table not in self._page_columns:
+            with self.connection() as conn:
+                cursor = conn.execute(f"SELECT * FROM ({PAGE_SOURCES[table]}) LIMIT 0")
+                self._page_columns[table] = [column[0] for column in cursor.description]
+        return list(self._page_columns[table])
+    
+    def count_rows(self, table: str, filter_query: Optional[str] = None) -> int:
+        """Number of rows in ``table`` matching a DataTable filter query"""
+        where, params = build_where_clause(filter_query, self.get_page_columns(table))
+        with self.connection() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM ({PAGE_SOURCES[table]}) {where}", params
+            ).fetchone()[0]
+    
+    def query_page(self, table: str, page_current: int = 0, page_size: int = 10,
+                   sort_by: Optional[List[Dict[str, str]]] = None,
+                   filter_query: Optional[str] = None) -> Tuple[pd.DataFrame, int]:
+        """Fetch one page of ``table`` for a DataTable in custom paging mode.
+        
+        ``sort_by`` and ``filter_query`` are the DataTable properties of the
+        same name; they are translated into a parameterized WHERE/ORDER BY.
+        Returns the page as a DataFrame together with the total number of
+        matching rows.
+        """
+        columns = self.get_page_columns(table)
+        where, params = build_where_clause(filter_query, columns)
+        order_by = build_order_by(sort_by, columns)
+        page_current = max(int(page_current or 0), 0)
+        page_size = max(int(page_size or 10), 1)
+        
+        with self.connection() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM ({PAGE_SOURCES[table]}) {where}", params
+            ).fetchone()[0]
+            df = pd.read_sql_query(
+                f"SELECT * FROM ({PAGE_SOURCES[table]}) {where} {order_by} LIMIT ? OFFSET ?",
+                conn, params=params + [page_size, page_current * page_size]
+            )
+        return df, total
+    
+    # Data versions
+    def get_data_versions(self) -> Dict[str, int]:
+        """Write counters per table; any insert, update or delete bumps its table's counter"""
+        with self.connection() as conn:
+            return dict(conn.execute("SELECT table_name, version FROM data_versions").fetchall())
+    
+    def get_data_version(self, table: Optional[str] = None) -> int:
+        """Write counter of one table, or the sum over all tables if ``table`` is None"""
+        with self.connection() as conn:
+            if table is None:
+                row = conn.execute("SELECT COALESCE(SUM(version), 0) FROM data_versions").fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT version FROM data_versions WHERE table_name = ?", (table,)
+                ).fetchone()
+        return row[0] if row else 0
+    
+    # Summary counters
+    def get_counters(self) -> Dict[str, Dict[str, Any]]:
+        """Trigger-maintained row counts, independent of table size.
+        
+        Returns ``{table: {'total': n, dimension: {value: count}}}`` for every
+        table and column in SUMMARY_DIMENSIONS. NULL values are not counted.
+        """
+        counters: Dict[str, Dict[str, Any]] = {
+            table: {'total': 0, **{dim: {} for dim in dimensions}}
+            for table, dimensions in SUMMARY_DIMENSIONS.items()
+        }
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT table_name, dimension, value, count FROM summary_counters WHERE count > 0"
+            ).fetchall()
+        for table, dimension, value, count in rows:
+            if table not in counters:
+                continue
+            if dimension == '*':
+                counters[table]['total'] = count
+            elif dimension in counters[table]:
+                counters[table][dimension][value] = count
+        return counters
+    
+    def rebuild_counters(self) -> Dict[str, Dict[str, Any]]:
+        """Recompute summary_counters from the tables, e.g. after manual edits to the database file"""
+        with self.connection() as conn:
+            self._rebuild_counters(conn.cursor())
+            conn.commit()
+        self._stats_cache = None
+        return self.get_counters()
+    
+    def get_versioned_dashboard_stats(self, known_version: Optional[int] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Return ``(data_version, stats)``, with ``stats`` None if nothing changed since ``known_version``"""
+        version = self.get_data_version()
+        if known_version is not None and known_version == version:
+            return version, None
+        return version, self.get_dashboard_stats()
+    
     def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Get summary statistics for dashboard"""
-        conn = self.get_connection()
-        
-        stats = {}
-        stats['total_assets'] = pd.read_sql_query("SELECT COUNT(*) as count FROM ai_assets", conn).iloc[0]['count']
-        stats['active_risks'] = pd.read_sql_query("SELECT COUNT(*) as count FROM risks WHERE status != 'Closed'", conn).iloc[0]['count']
-        stats['implemented_controls'] = pd.read_sql_query("SELECT COUNT(*) as count FROM controls WHERE implementation_status = 'Implemented'", conn).iloc[0]['count']
-        stats['open_incidents'] = pd.read_sql_query("SELECT COUNT(*) as count FROM incidents WHERE status IN ('Open', 'Investigating')", conn).iloc[0]['count']
-        stats['completed_audits'] = pd.read_sql_query("SELECT COUNT(*) as count FROM audits WHERE status = 'Complete'", conn).iloc[0]['count']
-        
-        conn.close()
-        return stats
\ No newline at end of file
+        """Get summary statistics for dashboard
+        
+        The KPIs are derived from the trigger-maintained summary counters and
+        cached until the data version changes, so repeated calls cost a single
+        primary-key lookup.
+        """
+        version = self.get_data_version()
+        cached = self._stats_cache
+        if cached is not None and cached[0] == version:
+            return dict(cached[1])
+        
+        counters = self.get_counters()
+        risk_status = counters['risks']['status']
+        incident_status = counters['incidents']['status']
+        stats = {
+            'total_assets': counters['ai_assets']['total'],
+            'active_risks': sum(n for status, n in risk_status.items() if status != 'Closed'),
+            'implemented_controls': counters['controls']['implementation_status'].get('Implemented', 0),
+            'open_incidents': incident_status.get('Open', 0) + incident_status.get('Investigating', 0),
+            'completed_audits': counters['audits']['status'].get('Complete', 0),
+        }
+        self._stats_cache = (version, stats)
+        return dict(stats)
+
+    def get_report_summary(self, recent_audits: int = 5, top_assets: int = 5) -> Dict[str, Any]:
+        """Metrics and distributions of the regulatory report, computed without loading any table
+
+        Counts and distributions come from the summary counters; the average
+        score of completed audits is an aggregate query on the status index and
+        only the ``recent_audits`` newest audits are fetched. The ``top_assets``
+        assets with the most incidents come from get_asset_incident_summary
+        and the control coverage of the risks from get_risk_coverage.
+        """
+        counters = self.get_counters()
+        with self.connection() as conn:
+            completed, avg_score = conn.execute(
+                "SELECT COUNT(*), AVG(compliance_score) FROM audits WHERE status = 'Complete'"
+            ).fetchone()
+            audits = pd.read_sql_query(
+                "SELECT * FROM audits ORDER BY created_date DESC LIMIT ?", conn,
+                params=(recent_audits,)
+            )
+        return {
+            'total_assets': counters['ai_assets']['total'],
+            'critical_assets': counters['ai_assets']['criticality'].get('High', 0),
+            'total_risks': counters['risks']['total'],
+            'high_risks': counters['risks']['risk_level'].get('High', 0),
+            'risk_distribution': counters['risks']['risk_level'],
+            'total_controls': counters['controls']['total'],
+            'effective_controls': counters['controls']['effectiveness'].get('Effective', 0),
+            'control_effectiveness': counters['controls']['effectiveness'],
+            'total_incidents': counters['incidents']['total'],
+            'open_incidents': counters['incidents']['status'].get('Open', 0),
+            'total_audits': counters['audits']['total'],
+            'completed_audits': completed,
+            'avg_compliance_score': round(avg_score, 1) if avg_score is not None else 0,
+            'recent_audits': audits,
+            'incidents_by_asset': self.get_asset_incident_summary(top_assets).to_dict('records'),
+            'risk_coverage': self.get_risk_coverage(),
+        }
+
+    # Report snapshots
+    def create_report_snapshot(self, force: bool = False, max_age: Optional[float] = None,
+                               interval: Optional[float] = REPORT_SNAPSHOT_INTERVAL,
+                               keep: Optional[int] = REPORT_SNAPSHOT_RETENTION
+                               ) -> Optional[Dict[str, Any]]:
+        """Store the current report summary as a snapshot and return it.
+        
+        Nothing is stored (None is returned) when the latest snapshot was taken
+        at the current data version, unless ``force`` is set or that snapshot
+        is older than ``max_age`` seconds. Older snapshots are kept as history,
+        downsampled to one per ``interval`` seconds: a snapshot taken in the
+        same interval as the latest one replaces it. Only the ``keep`` most
+        recent snapshots are kept. None disables either limit.
+        
+        The decision is taken again under the write lock before storing, so
+        callers racing for the same interval (the scheduler thread and a
+        background report process) store one snapshot between them.
+        """
+        def latest_snapshot(conn):
+            return conn.execute(
+                "SELECT id, data_version, (julianday('now') - julianday(created_date)) * 86400, "
+                "CAST(strftime('%s', created_date) / ? AS INTEGER) = "
+                "CAST(strftime('%s', 'now') / ? AS INTEGER) "
+                "FROM report_snapshots ORDER BY id DESC LIMIT 1",
+                (interval or 1, interval or 1)
+            ).fetchone()
+        
+        def up_to_date(latest):
+            return (not force and latest is not None and latest[1] == version
+                    and (max_age is None or latest[2] < max_age))
+        
+        version = self.get_data_version()
+        with self.connection() as conn:
+            if up_to_date(latest_snapshot(conn)):
+                return None
+        
+        summary = self.get_report_summary()
+        audits = summary['recent_audits']
+        stored = json.dumps(dict(summary, recent_audits=audits.astype(object)
+                                 .where(audits.notna(), None).to_dict('records')), default=str)
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            latest = latest_snapshot(conn)
+            if up_to_date(latest):
+                # Another caller stored this version while the summary was computed
+                conn.rollback()
+                return None
+            if interval and latest is not None and latest[3]:
+                snapshot_id = latest[0]
+                conn.execute(
+                    "UPDATE report_snapshots SET data_version = ?, summary = ?, "
+                    "created_date = CURRENT_TIMESTAMP WHERE id = ?",
+                    (version, stored, snapshot_id)
+                )
+            else:
+                cursor = conn.execute(
+                    "INSERT INTO report_snapshots (data_version, summary) VALUES (?, ?)",
+                    (version, stored)
+                )
+                snapshot_id = cursor.lastrowid
+                if keep:
+                    conn.execute(
+                        "DELETE FROM report_snapshots WHERE id <= "
+                        "(SELECT id FROM report_snapshots ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (keep,)
+                    )
+            conn.commit()
+        return self.get_report_snapshot(snapshot_id)
+    
+    def get_report_snapshot(self, snapshot_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """A stored snapshot (the latest if ``snapshot_id`` is None) with its summary decoded"""
+        with self.connection() as conn:
+            if snapshot_id is None:
+                row = conn.execute(
+                    "SELECT id, data_version, summary, created_date FROM report_snapshots "
+                    "ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT id, data_version, summary, created_date FROM report_snapshots WHERE id = ?",
+                    (snapshot_id,)
+                ).fetchone()
+        if row is None:
+            return None
+        summary = json.loads(row[2])
+        summary['recent_audits'] = pd.DataFrame(summary['recent_audits'])
+        return {'id': row[0], 'data_version': row[1], 'summary': summary, 'created_date': row[3]}
+    
+    # Full-text search
+    def search(self, query: str, tables: Optional[Sequence[str]] = None,
+               page: int = 0, page_size: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """Search titles and free-text columns of the SEARCH_SOURCES tables, best matches first.
+    
+        Every word of ``query`` has to match, as a word prefix ("risk" also
+        finds "risks"); title matches rank above text matches. ``tables``
+        restricts the search to some of the tables. Returns one page of hits
+        (``table``, ``id``, ``title`` and ``snippet``, with the matched terms
+        between the SEARCH_HIGHLIGHT markers) and the total number of hits.
+        More than SEARCH_RANK_LIMIT hits are listed newest first.
+        """
+        codes = {code: table for table, (code, _, _) in SEARCH_SOURCES.items()}
+        if tables is not None:
+            unknown = [table for table in tables if table not in SEARCH_SOURCES]
+            if unknown:
+                raise ValueError(f"Unknown table(s): {', '.join(unknown)}")
+            codes = {SEARCH_SOURCES[table][0]: table for table in tables}
+        match = _fts_query(query)
+        if not match or not codes:
+            return [], 0
+    
+        where = "search_index MATCH ?"
+        if len(codes) < len(SEARCH_SOURCES):
+            where += f" AND rowid % {SEARCH_ROWID_SPAN} IN ({', '.join(str(code) for code in codes)})"
+        start, end = SEARCH_HIGHLIGHT
+        with self.connection() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM search_index WHERE {where}", (match,)).fetchone()[0]
+            if total == 0:
+                return [], 0
+            order = "rank" if total <= SEARCH_RANK_LIMIT else "rowid DESC"
+            rows = conn.execute(
+                f"SELECT rowid, highlight(search_index, 0, ?, ?), "
+                f"snippet(search_index, 1, ?, ?, '…', 24) "
+                f"FROM search_index WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                (start, end, start, end, match, page_size, max(page, 0) * page_size)
+            ).fetchall()
+        hits = [{'table': codes[rowid % SEARCH_ROWID_SPAN], 'id': rowid // SEARCH_ROWID_SPAN,
+                 'title': title, 'snippet': snippet}
+                for rowid, title, snippet in rows]
+        return hits, total
+    
+    def get_report_history(self, limit: int = 100) -> pd.DataFrame:
+        """The REPORT_TREND_METRICS of the ``limit`` most recent snapshots, oldest first"""
+        metrics = ", ".join(f"json_extract(summary, '$.{metric}') AS {metric}"
+                            for metric in REPORT_TREND_METRICS)
+        with self.connection() as conn:
+            return pd.read_sql_query(
+                f"SELECT * FROM (SELECT id, created_date, data_version, {metrics} "
+                f"FROM report_snapshots ORDER BY id DESC LIMIT ?) ORDER BY id",
+                conn, params=(limit,)
+            )
+
+# Shared handles returned by get_database, keyed by absolute file path
+_databases: Dict[str, ISO42001Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path: Optional[str] = None, **kwargs) -> ISO42001Database:
+    """Process-wide ISO42001Database for ``db_path`` (default: the application database).
+    
+    The first call for a file creates the handle, which initializes the
+    schema; later calls return the same handle and its connection pool.
+    ``kwargs`` (pool_size, profile, ...) only apply when the handle is
+    created. A handle that has been closed is replaced by a new one.
+    """
+    key = os.path.abspath(db_path or ISO42001Database._get_default_db_path())
+    with _databases_lock:
+        database = _databases.get(key)
+        if database is None or database.closed:
+            database = _databases[key] = ISO42001Database(key, **kwargs)
+        return database
+
+
+class LazyDatabase:
+    """Stand-in for ISO42001Database that defers construction until first use.
+    
+    Module-level handles use this so importing the application performs no
+    database work; the first real query resolves it to the shared handle of
+    get_database, so every module uses the same pool and schema setup.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self._args = args
+        self._kwargs = kwargs
+        self._db: Optional[ISO42001Database] = None
+        self._lock = threading.Lock()
+    
+    def _resolve(self) -> ISO42001Database:
+        if self._db is None or self._db.closed:
+            with self._lock:
+                if self._db is None or self._db.closed:
+                    self._db = get_database(*self._args, **self._kwargs)
+        return self._db
+    
+    @property
+    def initialized(self) -> bool:
+        """Whether the underlying database has been created yet"""
+        return self._db is not None
+    
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
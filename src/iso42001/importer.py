@@ -0,0 +1,465 @@
+"""
+Validated, transactional import of Excel workbooks written by export_database
+
+The workbook is read and checked as a whole before anything is written:
+every sheet is validated against the table's NOT NULL, CHECK (IN / BETWEEN),
+integer, uniqueness and foreign-key rules with vectorized pandas operations,
+producing a row-level error report. Only a clean workbook is loaded into
+temporary staging tables, which are then swapped into place in a single
+transaction, so a failed import never leaves the database half replaced.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .workbook import WorkbookReader
+
+# Workbook sheet -> table, in the order parents must be loaded
+SHEET_TABLES = [
+    ('Assets', 'ai_assets'),
+    ('Risks', 'risks'),
+    ('Controls', 'controls'),
+    ('Incidents', 'incidents'),
+    ('Audits', 'audits'),
+    ('Risk Controls', 'risk_controls'),
+]
+
+# Columns whose values must be unique within a sheet (besides id)
+UNIQUE_COLUMNS = {
+    'controls': ['control_id'],
+}
+
+# Column -> (parent table, sheet) whose ids it references
+FOREIGN_KEYS = {
+    'risks': {'asset_id': ('ai_assets', 'Assets')},
+    'risk_controls': {'risk_id': ('risks', 'Risks'), 'control_id': ('controls', 'Controls')},
+}
+
+CHUNK_SIZE = 5000
+
+ProgressCallback = Optional[Callable[[int, int, str], None]]
+
+_ENUM_RE = re.compile(r"(\w+)\s+IN\s*\(([^)]*)\)", re.IGNORECASE)
+_RANGE_RE = re.compile(r"(\w+)\s+BETWEEN\s+(-?\d+)\s+AND\s+(-?\d+)", re.IGNORECASE)
+
+
+class ImportValidationError(ValueError):
+    """Raised when a workbook fails validation; ``errors`` lists every problem"""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} validation error(s) in the workbook")
+
+
+def table_rules(conn: sqlite3.Connection, table: str) -> Dict[str, Any]:
+    """Read the validation rules of ``table`` from its schema"""
+    columns = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    enums = {
+        column: [value.strip().strip("'") for value in values.split(',')]
+        for column, values in _ENUM_RE.findall(sql)
+    }
+    ranges = {column: (int(low), int(high)) for column, low, high in _RANGE_RE.findall(sql)}
+    return {
+        'columns': [column[1] for column in columns],
+        'types': {column[1]: (column[2] or '').upper() for column in columns},
+        'required': [column[1] for column in columns if column[3] and not column[5]],
+        'enums': enums,
+        'ranges': ranges,
+    }
+
+
+def _errors_for(sheet: str, frame: pd.DataFrame, mask: pd.Series, column: str,
+                message: str) -> List[Dict[str, Any]]:
+    """Turn the rows selected by ``mask`` into error report entries"""
+    return [
+        {'sheet': sheet, 'row': int(index) + 2, 'column': column,
+         'value': None if pd.isna(value) else value, 'error': message}
+        for index, value in frame.loc[mask, column].items()
+    ] if column in frame else []
+
+
+def validate_sheet(sheet: str, table: str, frame: pd.DataFrame, rules: Dict[str, Any],
+                   parent_ids: Optional[Dict[str, set]] = None,
+                   partial: bool = False) -> List[Dict[str, Any]]:
+    """Check a sheet against ``rules``; rows are reported by their Excel row number
+
+    With ``partial`` (merge imports) a sheet may leave out required columns.
+    """
+    errors: List[Dict[str, Any]] = []
+
+    for column in rules['required']:
+        if column not in frame:
+            if not partial:
+                errors.append({'sheet': sheet, 'row': None, 'column': column, 'value': None,
+                               'error': "required column is missing"})
+        else:
+            errors += _errors_for(sheet, frame, frame[column].isna(), column, "value is required")
+
+    for column, allowed in rules['enums'].items():
+        if column in frame:
+            mask = frame[column].notna() & ~frame[column].isin(allowed)
+            errors += _errors_for(sheet, frame, mask, column,
+                                  f"must be one of: {', '.join(allowed)}")
+
+    for column, declared in rules['types'].items():
+        if column not in frame or 'INT' not in declared:
+            continue
+        numbers = pd.to_numeric(frame[column], errors='coerce')
+        present = frame[column].notna()
+        not_integer = present & (numbers.isna() | (numbers % 1 != 0))
+        errors += _errors_for(sheet, frame, not_integer, column, "must be a whole number")
+        if column in rules['ranges']:
+            low, high = rules['ranges'][column]
+            mask = present & ~not_integer & ~numbers.between(low, high)
+            errors += _errors_for(sheet, frame, mask, column, f"must be between {low} and {high}")
+
+    for column in ['id'] + UNIQUE_COLUMNS.get(table, []):
+        if column in frame:
+            mask = frame[column].notna() & frame[column].duplicated(keep=False)
+            errors += _errors_for(sheet, frame, mask, column, "must be unique")
+
+    for column, (parent, parent_sheet) in FOREIGN_KEYS.get(table, {}).items():
+        if column in frame:
+            known = (parent_ids or {}).get(parent, set())
+            numbers = pd.to_numeric(frame[column], errors='coerce')
+            mask = numbers.notna() & ~numbers.isin(known)
+            errors += _errors_for(sheet, frame, mask, column,
+                                  f"does not match an id on the {parent_sheet} sheet")
+    return errors
+
+
+def _to_sql_value(value: Any, declared: str) -> Any:
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat() if declared == 'DATE' else value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if 'INT' in declared and isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def read_workbook(path: str, usecols: Optional[Dict[str, Any]] = None,
+                  progress: ProgressCallback = None) -> Dict[str, pd.DataFrame]:
+    """Read the known sheets of a workbook as object columns (no float coercion).
+
+    The workbook is parsed once; ``usecols`` maps sheet names to the columns
+    to keep, which are selected while the rows are read.
+    """
+    with WorkbookReader(path, dtype=object) as reader:
+        names = [sheet for sheet, _ in SHEET_TABLES if sheet in reader.sheet_names]
+        sheets = {}
+        for sheet, frame in reader.sheets(names, usecols=usecols):
+            sheets[sheet] = frame
+            if progress:
+                progress(len(sheets), len(names), f"read {sheet}")
+        return sheets
+
+
+def _sheet_columns(db) -> Dict[str, List[str]]:
+    """Real table columns per sheet, to skip joined and unknown columns while reading"""
+    with db.connection() as conn:
+        return {sheet: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                for sheet, table in SHEET_TABLES}
+
+
+def _prepare_frames(conn: sqlite3.Connection, sheets: Dict[str, pd.DataFrame]):
+    """Return the rules of every table and the sheets reduced to real table columns"""
+    rules = {table: table_rules(conn, table) for _, table in SHEET_TABLES}
+    # Dropping unknown columns also drops joined ones such as asset_name
+    frames = {}
+    for sheet, table in SHEET_TABLES:
+        if sheet in sheets:
+            frame = sheets[sheet]
+            frames[table] = frame[[c for c in frame.columns if c in rules[table]['columns']]]
+    return rules, frames
+
+
+def import_workbook(db, path: str, sheets: Optional[Dict[str, pd.DataFrame]] = None,
+                    chunk_size: int = CHUNK_SIZE,
+                    progress: ProgressCallback = None) -> Dict[str, int]:
+    """Validate the workbook at ``path`` and replace the database contents with it.
+
+    ``sheets`` may pass already-read sheets instead of reading ``path``.
+    Raises ImportValidationError (without touching the database) if any row
+    is invalid. Tables without a sheet end up empty, as before, except that
+    without a Risk Controls sheet (older exports) risk-control mappings are
+    kept when both of their rows are still present. Incidents are linked to
+    the assets their affected_assets text names. Returns the number of rows
+    loaded per table. ``progress(done, total, step)`` is called
+    as sheets are read and rows staged, before anything live is replaced.
+    """
+    if sheets is None:
+        sheets = read_workbook(path, usecols=_sheet_columns(db), progress=progress)
+
+    with db.connection() as conn:
+        rules, frames = _prepare_frames(conn, sheets)
+        parent_ids = {
+            table: set(pd.to_numeric(frame['id'], errors='coerce').dropna())
+            for table, frame in frames.items() if 'id' in frame
+        }
+        errors = []
+        for sheet, table in SHEET_TABLES:
+            if table in frames:
+                errors += validate_sheet(sheet, table, frames[table], rules[table], parent_ids)
+        if errors:
+            raise ImportValidationError(errors)
+
+        rows_total = sum(len(frame) for frame in frames.values())
+        rows_staged = 0
+        if progress:
+            progress(0, rows_total, "validated")
+        loaded = {table: 0 for _, table in SHEET_TABLES}
+        staged = []
+        try:
+            # Stage every sheet before touching the live tables
+            for _, table in SHEET_TABLES:
+                staging = f"staging_{table}"
+                conn.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+                conn.execute(f"CREATE TEMP TABLE {staging} AS SELECT * FROM main.{table} WHERE 0")
+                staged.append(staging)
+                frame = frames.get(table)
+                if frame is None or frame.empty:
+                    continue
+                types = [rules[table]['types'][column] for column in frame.columns]
+                sql = (f"INSERT INTO temp.{staging} ({', '.join(frame.columns)}) "
+                       f"VALUES ({', '.join('?' for _ in frame.columns)})")
+                for start in range(0, len(frame), chunk_size):
+                    chunk = frame.iloc[start:start + chunk_size]
+                    conn.executemany(sql, [
+                        [_to_sql_value(value, declared) for value, declared in zip(row, types)]
+                        for row in chunk.itertuples(index=False, name=None)
+                    ])
+                    rows_staged += len(chunk)
+                    if progress:
+                        progress(rows_staged, rows_total, table)
+                loaded[table] = len(frame)
+            conn.commit()
+            if progress:
+                progress(rows_total, rows_total, "replacing data")
+
+            # Swap staged rows into place in one transaction
+            with db.triggers_suspended(conn):
+                # Kept mappings point at rows that are deleted and re-inserted
+                # below; check their foreign keys at commit instead
+                conn.execute("PRAGMA defer_foreign_keys = ON")
+                conn.execute(
+                    "DELETE FROM risk_controls "
+                    "WHERE risk_id NOT IN (SELECT id FROM temp.staging_risks WHERE id IS NOT NULL) "
+                    "OR control_id NOT IN (SELECT id FROM temp.staging_controls WHERE id IS NOT NULL)"
+                )
+                conn.execute(
+                    "DELETE FROM incident_assets "
+                    "WHERE incident_id NOT IN (SELECT id FROM temp.staging_incidents WHERE id IS NOT NULL) "
+                    "OR asset_id NOT IN (SELECT id FROM temp.staging_ai_assets WHERE id IS NOT NULL)"
+                )
+                for _, table in reversed(SHEET_TABLES):
+                    if table == 'risk_controls' and table not in frames:
+                        continue
+                    conn.execute(f"DELETE FROM main.{table}")
+                for _, table in SHEET_TABLES:
+                    frame = frames.get(table)
+                    if frame is None or frame.empty:
+                        continue
+                    columns = ', '.join(frame.columns)
+                    conn.execute(f"INSERT INTO main.{table} ({columns}) "
+                                 f"SELECT {columns} FROM temp.staging_{table}")
+                db._relink_incident_assets(conn)
+            conn.commit()
+        finally:
+            conn.rollback()
+            for staging in staged:
+                conn.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+    return loaded
+
+
+# Merge (delta) import
+
+# Bookkeeping columns that never make a row count as changed
+MERGE_IGNORED_COLUMNS = {'id', 'created_date', 'updated_date'}
+
+
+def _normalized(frame: pd.DataFrame, types: Dict[str, str]) -> pd.DataFrame:
+    """Sheet values converted the way they are stored in SQLite"""
+    columns = {}
+    for column in frame.columns:
+        series = frame[column].astype(object)
+        series = series.where(series.notna(), None)
+        # Only dates and floats need converting; leave strings and ints alone
+        convert = series.map(type).isin([datetime, pd.Timestamp, date, float])
+        if convert.any():
+            series[convert] = [_to_sql_value(value, types[column]) for value in series[convert]]
+        columns[column] = series
+    return pd.DataFrame(columns, index=frame.index, dtype=object)
+
+
+def _as_text(frame: pd.DataFrame) -> pd.DataFrame:
+    """Values as text with NULL and empty strings treated alike"""
+    return frame.astype(object).fillna('').astype(str)
+
+
+def row_hashes(frame: pd.DataFrame) -> pd.Series:
+    """Hash every row of ``frame`` so rows can be compared in one vectorized pass.
+
+    Values are compared as text with NULL and empty strings treated alike,
+    since Excel cannot tell the two apart.
+    """
+    if frame.empty or not len(frame.columns):
+        return pd.Series(0, index=frame.index, dtype='uint64')
+    return pd.util.hash_pandas_object(_as_text(frame), index=False)
+
+
+def _key_tuples(frame: pd.DataFrame, key: List[str]) -> List[tuple]:
+    return list(_as_text(frame[key]).itertuples(index=False, name=None))
+
+
+def merge_workbook(db, path: str, sheets: Optional[Dict[str, pd.DataFrame]] = None,
+                   delete_missing: bool = False,
+                   progress: ProgressCallback = None) -> Dict[str, Dict[str, int]]:
+    """Apply only the differences between the workbook and the database.
+
+    Rows are matched on ``id`` when the sheet has that column, otherwise on
+    the table's natural key (see ``database.NATURAL_KEYS``). New rows are
+    inserted and rows whose hashed values differ are updated; with
+    ``delete_missing`` rows absent from a sheet are deleted as well. Sheets
+    may contain only some columns; tables without a sheet are left alone.
+    Everything is validated first and applied in one transaction; inserted
+    incidents and incidents whose affected_assets changed are relinked to the
+    assets that text names. Returns inserted/updated/deleted/unchanged counts
+    per table. ``progress(sheets_done,
+    sheets_total, step)`` is called as sheets are read and compared, before any write.
+    """
+    from .database import NATURAL_KEYS
+
+    if sheets is None:
+        sheets = read_workbook(path, usecols=_sheet_columns(db), progress=progress)
+
+    with db.connection() as conn:
+        rules, frames = _prepare_frames(conn, sheets)
+        sheet_names = {table: sheet for sheet, table in SHEET_TABLES}
+
+        # References may point at existing rows as well as rows on the sheets
+        parent_ids = {}
+        for _, table in SHEET_TABLES:
+            ids = {row[0] for row in conn.execute(f"SELECT id FROM {table}")}
+            if table in frames and 'id' in frames[table]:
+                ids |= set(pd.to_numeric(frames[table]['id'], errors='coerce').dropna())
+            parent_ids[table] = ids
+
+        errors = []
+        plans = {}
+        for sheet, table in SHEET_TABLES:
+            if table not in frames:
+                continue
+            if progress:
+                progress(len(plans), len(frames), sheet)
+            frame = frames[table]
+            errors += validate_sheet(sheet, table, frame, rules[table], parent_ids, partial=True)
+
+            key = ['id'] if 'id' in frame else list(NATURAL_KEYS[table])
+            missing_key = [column for column in key if column not in frame]
+            if missing_key:
+                errors.append({'sheet': sheet, 'row': None, 'column': ', '.join(missing_key),
+                               'value': None, 'error': "key column is missing"})
+                continue
+            if key != ['id']:
+                mask = frame[key].notna().all(axis=1) & frame.duplicated(subset=key, keep=False)
+                errors += _errors_for(sheet, frame, mask, key[0], "key must be unique")
+
+            values = _normalized(frame, rules[table]['types'])
+            compared = [column for column in values.columns
+                        if column not in MERGE_IGNORED_COLUMNS and column not in key]
+            # Plain cursor rows keep SQLite's types (pandas would turn nullable ints into floats)
+            cursor = conn.execute(
+                f"SELECT {', '.join(dict.fromkeys(['id'] + key + compared))} FROM {table}")
+            existing = pd.DataFrame(cursor.fetchall(), dtype=object,
+                                    columns=[column[0] for column in cursor.description])
+            existing_ids = dict(zip(_key_tuples(existing, key), existing['id']))
+            existing_hashes = dict(zip(existing['id'], row_hashes(existing[compared])))
+
+            incoming_keys = _key_tuples(values, key)
+            incoming_hashes = row_hashes(values[compared])
+            inserts, updates, unchanged = [], [], 0
+            for position, (row_key, row_hash) in enumerate(zip(incoming_keys, incoming_hashes)):
+                row_id = existing_ids.get(row_key)
+                if row_id is None:
+                    inserts.append(position)
+                elif existing_hashes[row_id] != row_hash:
+                    updates.append((position, row_id))
+                else:
+                    unchanged += 1
+
+            # New rows need every required column
+            for column in rules[table]['required']:
+                if column not in frame and inserts:
+                    errors.append({'sheet': sheet, 'row': int(frame.index[inserts[0]]) + 2,
+                                   'column': column, 'value': None,
+                                   'error': f"required for new rows ({len(inserts)} new)"})
+
+            deletes = []
+            if delete_missing:
+                seen = set(incoming_keys)
+                deletes = [row_id for row_key, row_id in existing_ids.items() if row_key not in seen]
+            plans[table] = {'values': values, 'compared': compared, 'inserts': inserts,
+                            'updates': updates, 'deletes': deletes, 'unchanged': unchanged}
+
+        if errors:
+            raise ImportValidationError(errors)
+        if progress:
+            progress(len(frames), len(frames), "applying changes")
+
+        # Apply the changes in one transaction (rolled back by connection() on error)
+        now = datetime.now()
+        counts = {}
+        relink: List[int] = []
+        # Ids above this one are inserted below (AUTOINCREMENT never reuses ids)
+        first_new_incident = conn.execute("SELECT coalesce(max(id), 0) FROM incidents").fetchone()[0]
+        for table, plan in plans.items():
+            values, compared = plan['values'], plan['compared']
+            if table == 'incidents':
+                if 'id' in values:
+                    relink += [row_id for row_id in values['id'].iloc[plan['inserts']]
+                               if row_id is not None]
+                if 'affected_assets' in compared:
+                    relink += [row_id for _, row_id in plan['updates']]
+            if plan['inserts']:
+                columns = list(values.columns)
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [list(values.iloc[position]) for position in plan['inserts']]
+                )
+            if plan['updates'] and compared:
+                assignments = ", ".join(f"{column} = ?" for column in compared)
+                conn.executemany(
+                    f"UPDATE {table} SET {assignments}, updated_date = ? WHERE id = ?",
+                    [list(values.iloc[position][compared]) + [now, row_id]
+                     for position, row_id in plan['updates']]
+                )
+            counts[table] = {'inserted': len(plan['inserts']), 'updated': len(plan['updates']),
+                             'deleted': len(plan['deletes']), 'unchanged': plan['unchanged']}
+
+        # Children first, so references are removed before their targets
+        for table in reversed(list(plans)):
+            deletes = [(row_id,) for row_id in plans[table]['deletes']]
+            if not deletes:
+                continue
+            if table in ('risks', 'controls'):
+                column = 'risk_id' if table == 'risks' else 'control_id'
+                conn.executemany(f"DELETE FROM risk_controls WHERE {column} = ?", deletes)
+            if table in ('ai_assets', 'incidents'):
+                column = 'asset_id' if table == 'ai_assets' else 'incident_id'
+                conn.executemany(f"DELETE FROM incident_assets WHERE {column} = ?", deletes)
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", deletes)
+        if 'incidents' in plans:
+            db._relink_incident_assets(conn, relink, after_id=first_new_incident)
+        conn.commit()
+    return counts
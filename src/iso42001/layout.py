@@ -4,13 +4,15 @@ Layout components and UI elements for the ISO 42001 Bookkeeping System
 
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
+import plotly.express as px
 from datetime import date
+import math
 
-from .database import ISO42001Database
+from .database import LazyDatabase, SEARCH_HIGHLIGHT
 from . import __version__
 
-# Initialize the database
-db = ISO42001Database()
+# Database handle; created on first use so importing the layout does no DB work
+db = LazyDatabase()
 
 # Version utilities
 def get_version_major_minor():
@@ -77,9 +79,10 @@ def create_header():
         className="mb-4"
     )
 
-def create_stats_cards():
+def create_stats_cards(stats=None):
     """Create dashboard statistics cards"""
-    stats = db.get_dashboard_stats()
+    if stats is None:
+        stats = db.get_dashboard_stats()
     
     cards = [
         dbc.Card([
@@ -122,32 +125,117 @@ def create_stats_cards():
         dbc.Col(card, width=12, md=6, lg=2, className="mb-3") for card in cards
     ])
 
-def create_data_table(df, table_id):
-    """Create a standard data table with Carbon styling"""
-    if df.empty:
+# Global search: label and tab of the hits from each searchable table
+SEARCH_TARGETS = {
+    'ai_assets': ("Asset", "assets"),
+    'risks': ("Risk", "risks"),
+    'controls': ("Control", "controls"),
+    'incidents': ("Incident", "incidents"),
+    'audits': ("Audit", "compliance"),
+}
+SEARCH_PAGE_SIZE = 10
+
+def create_search_bar():
+    """Create the global full-text search box with its result list and pager"""
+    return html.Div([
+        dbc.Input(id="global-search", type="search", debounce=True,
+                  placeholder="Search assets, risks, controls, incidents and audits"),
+        html.Div(id="search-results", className="mt-2"),
+        dbc.Pagination(id="search-pagination", max_value=1, active_page=1, fully_expanded=False,
+                       previous_next=True, className="mt-2", style={'display': 'none'}),
+    ], className="mb-4")
+
+def highlight_matches(text):
+    """Split a search title or snippet at the SEARCH_HIGHLIGHT markers into text and html.Mark parts"""
+    start, end = SEARCH_HIGHLIGHT
+    before, *marked = (text or "").split(start)
+    parts = [before] if before else []
+    for chunk in marked:
+        match, _, rest = chunk.partition(end)
+        parts.append(html.Mark(match))
+        if rest:
+            parts.append(rest)
+    return parts
+
+def render_search_results(hits, total, page=0):
+    """Render one page of search hits; each hit opens the tab of its table when clicked"""
+    if not total:
+        return html.P("No matches", className="text-muted")
+    
+    items = []
+    for hit in hits:
+        label = SEARCH_TARGETS[hit['table']][0]
+        items.append(dbc.ListGroupItem([
+            html.Div([
+                dbc.Badge(label, color="secondary", className="me-2"),
+                html.Strong(highlight_matches(hit['title'])),
+            ]),
+            html.Small(highlight_matches(hit['snippet']), className="text-muted")
+            if hit['snippet'].strip() else None,
+        ], id={'type': 'search-hit', 'table': hit['table'], 'index': hit['id']},
+           action=True, n_clicks=0))
+    
+    first = page * SEARCH_PAGE_SIZE + 1
+    return html.Div([
+        html.Small(f"{first}-{first + len(hits) - 1} of {total} matches", className="text-muted"),
+        dbc.ListGroup(items, className="mt-1"),
+    ])
+
+# Tables that get an "Edit" action column
+EDITABLE_TABLES = ["assets-table", "risks-table", "controls-table", "incidents-table", "audits-table"]
+
+def table_record(row, table_id):
+    """Convert one row dict to a DataTable record, adding the Edit action for editable tables"""
+    record = dict(row)
+    if table_id in EDITABLE_TABLES:
+        record['edit'] = "Edit"  # Simple text for now, will be handled by callback
+    return record
+
+def table_records(df, table_id):
+    """Convert a DataFrame to DataTable records, adding the Edit action for editable tables"""
+    return [table_record(row, table_id) for row in df.to_dict('records')]
+
+def create_data_table(df, table_id, server_side=False, total_rows=None, page_size=10):
+    """Create a standard data table with Carbon styling
+    
+    With ``server_side=True`` ``df`` holds only the first page; paging, sorting
+    and filtering are then done by callbacks backed by ``db.query_page``. Such
+    tables are rendered even when empty so rows can be patched in later.
+    """
+    if df.empty and not server_side:
         return html.Div("No data available", className="text-center text-muted p-4")
     
-    # Add edit column for editable tables
-    columns = []
-    if table_id in ["assets-table", "risks-table", "controls-table", "incidents-table", "audits-table"] and not df.empty:
-        # Add edit buttons to data
-        df_copy = df.copy()
-        df_copy['edit'] = "Edit"  # Simple text for now, will be handled by callback
-        df = df_copy
-        
+    columns = [{"name": col, "id": col} for col in df.columns]
+    if table_id in EDITABLE_TABLES:
         # Add Edit button column at the end
-        columns = [{"name": col, "id": col} for col in df.columns if col != 'edit']
         columns.append({
             "name": "Action", 
             "id": "edit"
         })
+    
+    if server_side:
+        total_rows = len(df) if total_rows is None else total_rows
+        paging = dict(
+            page_current=0,
+            page_size=page_size,
+            page_count=max(math.ceil(total_rows / page_size), 1),
+            page_action="custom",
+            sort_action="custom",
+            sort_mode="single",
+            sort_by=[],
+            filter_action="custom",
+            filter_query=""
+        )
     else:
-        # Add regular columns for non-editable tables
-        columns = [{"name": col, "id": col} for col in df.columns]
+        paging = dict(
+            page_size=page_size,
+            sort_action="native",
+            filter_action="native"
+        )
     
     return dash_table.DataTable(
         id=table_id,
-        data=df.to_dict('records'),
+        data=table_records(df, table_id),
         columns=columns,
         style_table={'overflowX': 'auto'},
         style_cell={
@@ -171,11 +259,15 @@ def create_data_table(df, table_id):
                 'backgroundColor': CARBON_COLORS['background']
             }
         ],
-        page_size=10,
-        sort_action="native",
-        filter_action="native"
+        **paging
     )
 
+def create_paged_table(table, table_id, page_size=10):
+    """Create a server-side paged data table showing the first page of ``table``"""
+    df, total_rows = db.query_page(table, page_size=page_size)
+    return create_data_table(df, table_id, server_side=True, total_rows=total_rows,
+                             page_size=page_size)
+
 def create_form_input(label, input_id, input_type="text", options=None, value=""):
     """Create standardized form input"""
     if input_type == "dropdown":
@@ -185,6 +277,15 @@ def create_form_input(label, input_id, input_type="text", options=None, value=""
             value=value,
             style={'marginBottom': '10px'}
         )
+    elif input_type == "multiselect":
+        # Options are (value, label) pairs here
+        input_component = dcc.Dropdown(
+            id=input_id,
+            options=[{'label': label, 'value': opt} for opt, label in options] if options else [],
+            value=value or [],
+            multi=True,
+            style={'marginBottom': '10px'}
+        )
     elif input_type == "textarea":
         input_component = dcc.Textarea(
             id=input_id,
@@ -214,8 +315,6 @@ def create_form_input(label, input_id, input_type="text", options=None, value=""
 
 def render_assets_tab():
     """Render AI Assets tab"""
-    assets_df = db.get_assets()
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -251,14 +350,49 @@ def render_assets_tab():
         
         # Assets table
         html.Div(id="assets-table-container", children=[
-            create_data_table(assets_df, "assets-table")
+            create_paged_table("ai_assets", "assets-table")
         ])
     ])
 
+def render_risk_coverage(coverage, limit=None):
+    """Summarize control coverage (see get_risk_coverage) and list the worst covered Critical and High risks"""
+    if not coverage or not coverage['risks']:
+        return html.P("No open risks to cover", className="text-muted")
+    
+    uncovered = coverage['uncovered_risks'][:limit]
+    figures = [
+        (f"{coverage['avg_coverage']}%", "Average Coverage", CARBON_COLORS['primary']),
+        (coverage['covered'], "Covered", CARBON_COLORS['success']),
+        (coverage['partially_covered'], "Partially Covered", CARBON_COLORS['warning']),
+        (coverage['uncovered'], "Uncovered", CARBON_COLORS['danger']),
+    ]
+    return html.Div([
+        dbc.Row([
+            dbc.Col([
+                html.H5(f"{value}", className="mb-0", style={'color': color}),
+                html.Small(label, className="text-muted")
+            ], width=3, className="text-center")
+            for value, label, color in figures
+        ], className="mb-3"),
+        html.H6(f"Critical and High risks without an effective control: {coverage['uncovered_total']}"),
+        dbc.Table([
+            html.Thead(html.Tr([html.Th("Risk"), html.Th("Level"), html.Th("Status"),
+                                html.Th("Controls"), html.Th("Coverage")])),
+            html.Tbody([
+                html.Tr([html.Td(risk['risk_title']), html.Td(risk['risk_level']), html.Td(risk['status']),
+                         html.Td(risk['controls']), html.Td(f"{risk['coverage']:.0%}")])
+                for risk in uncovered
+            ])
+        ], size="sm", bordered=False, className="mb-0") if uncovered
+        else html.P("Every Critical and High risk has an effective control", className="text-success"),
+        html.Small(f"Showing {len(uncovered)} of {coverage['uncovered_total']}", className="text-muted")
+        if len(uncovered) < coverage['uncovered_total'] else None,
+    ])
+
 def render_risks_tab():
     """Render Risk Management tab"""
-    risks_df = db.get_risks()
-    assets_df = db.get_assets()
+    asset_options = db.get_asset_options()
+    control_options = db.get_control_options()
     
     return dbc.Container([
         dbc.Row([
@@ -278,7 +412,7 @@ def render_risks_tab():
                 # Hidden field to store risk ID for editing
                 dcc.Store(id="edit-risk-id", data=None),
                 create_form_input("Associated Asset", "risk-asset", "dropdown",
-                                [f"{row['id']} - {row['name']}" for _, row in assets_df.iterrows()] if not assets_df.empty else []),
+                                [f"{asset_id} - {name}" for asset_id, name in asset_options]),
                 create_form_input("Risk Title", "risk-title"),
                 create_form_input("Risk Description", "risk-description", "textarea"),
                 create_form_input("Risk Category", "risk-category"),
@@ -289,6 +423,7 @@ def render_risks_tab():
                 create_form_input("Risk Level", "risk-level", "dropdown",
                                 ["Low", "Medium", "High", "Critical"]),
                 create_form_input("Mitigation Strategy", "risk-mitigation", "textarea"),
+                create_form_input("Mitigating Controls", "risk-controls", "multiselect", control_options),
                 create_form_input("Owner", "risk-owner"),
                 create_form_input("Status", "risk-status", "dropdown",
                                 ["Open", "In Progress", "Mitigated", "Accepted", "Closed"])
@@ -299,16 +434,21 @@ def render_risks_tab():
             ])
         ], id="risk-modal", is_open=False),
         
+        # Control coverage of the open risks
+        dbc.Card([
+            dbc.CardHeader(html.H6("Control Coverage", className="mb-0")),
+            dbc.CardBody(html.Div(id="risk-coverage",
+                                  children=render_risk_coverage(db.get_risk_coverage(), limit=5)))
+        ], className="mb-4"),
+        
         # Risks table
         html.Div(id="risks-table-container", children=[
-            create_data_table(risks_df, "risks-table")
+            create_paged_table("risks", "risks-table")
         ])
     ])
 
 def render_controls_tab():
     """Render Controls tab"""
-    controls_df = db.get_controls()
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -345,13 +485,13 @@ def render_controls_tab():
         
         # Controls table
         html.Div(id="controls-table-container", children=[
-            create_data_table(controls_df, "controls-table")
+            create_paged_table("controls", "controls-table")
         ])
     ])
 
 def render_incidents_tab():
     """Render Incidents tab"""
-    incidents_df = db.get_incidents()
+    asset_options = db.get_asset_options()
     
     return dbc.Container([
         dbc.Row([
@@ -374,7 +514,7 @@ def render_incidents_tab():
                 create_form_input("Incident Description", "incident-description", "textarea"),
                 create_form_input("Severity", "incident-severity", "dropdown",
                                 ["Low", "Medium", "High", "Critical"]),
-                create_form_input("Affected Assets", "incident-assets"),
+                create_form_input("Affected Assets", "incident-assets", "multiselect", asset_options),
                 create_form_input("Root Cause", "incident-root-cause", "textarea"),
                 create_form_input("Corrective Actions", "incident-actions", "textarea"),
                 create_form_input("Status", "incident-status", "dropdown",
@@ -390,14 +530,12 @@ def render_incidents_tab():
         
         # Incidents table
         html.Div(id="incidents-table-container", children=[
-            create_data_table(incidents_df, "incidents-table")
+            create_paged_table("incidents", "incidents-table")
         ])
     ])
 
 def render_compliance_tab():
     """Render Compliance/Audits tab"""
-    audits_df = db.get_audits()
-    
     return dbc.Container([
         dbc.Row([
             dbc.Col([
@@ -434,7 +572,7 @@ def render_compliance_tab():
         
         # Audits table
         html.Div(id="audits-table-container", children=[
-            create_data_table(audits_df, "audits-table")
+            create_paged_table("audits", "audits-table")
         ])
     ])
 
@@ -455,6 +593,10 @@ def render_admin_tab():
                     dbc.CardBody([
                         html.P("Export all data to Excel file for backup or analysis"),
                         dbc.Button("Export Database", id="export-btn", color="success", className="me-2"),
+                        dbc.Button("Cancel", id="cancel-export-btn", color="secondary", outline=True,
+                                   disabled=True),
+                        dbc.Progress(id="export-progress", value=0, label="", className="mt-2",
+                                     style={'display': 'none'}),
                         html.Div(id="export-status", className="mt-2")
                     ])
                 ])
@@ -464,7 +606,16 @@ def render_admin_tab():
                 dbc.Card([
                     dbc.CardHeader("Database Import"),
                     dbc.CardBody([
-                        html.P("Import data from Excel file (WARNING: This will replace existing data)"),
+                        html.P("Import data from Excel file (WARNING: Replace overwrites all existing data)"),
+                        dbc.RadioItems(
+                            id="import-mode",
+                            options=[
+                                {'label': "Replace all data", 'value': "replace"},
+                                {'label': "Merge changed rows", 'value': "merge"},
+                            ],
+                            value="replace",
+                            inline=True
+                        ),
                         dcc.Upload(
                             id='upload-data',
                             children=html.Div([
@@ -483,6 +634,11 @@ def render_admin_tab():
                             },
                             multiple=False
                         ),
+                        dcc.Store(id="import-upload"),
+                        dbc.Button("Cancel Import", id="cancel-import-btn", color="secondary", outline=True,
+                                   disabled=True),
+                        dbc.Progress(id="import-progress", value=0, label="", className="mt-2",
+                                     style={'display': 'none'}),
                         html.Div(id="import-status", className="mt-2")
                     ])
                 ])
@@ -536,43 +692,71 @@ def render_admin_tab():
     ])
 
 def render_regulatory_report_tab():
-    """Render the Regulatory Audit Report tab"""
+    """Render the Regulatory Audit Report tab
+    
+    Only a placeholder is returned; the report itself is generated by a
+    background callback (see app.py) once the placeholder is shown.
+    """
+    return html.Div([
+        dcc.Store(id="regulatory-report-request"),
+        html.Div([
+            dbc.Spinner(size="sm", className="me-2"),
+            "Generating regulatory report..."
+        ], id="regulatory-report-loading", className="text-muted my-4"),
+        html.Div(id="regulatory-report-content")
+    ])
+
+def render_report_trends(history):
+    """Line chart of the key report metrics over the stored snapshots"""
+    if history is None or len(history) < 2:
+        return html.P("Trends appear once more than one report snapshot has been taken.",
+                      className="text-muted")
+    figure = px.line(
+        history, x='created_date',
+        y=['avg_compliance_score', 'total_risks', 'high_risks', 'open_incidents'],
+        labels={'created_date': "Snapshot (UTC)", 'value': "", 'variable': ""},
+        markers=True
+    )
+    figure.update_layout(margin=dict(l=20, r=20, t=20, b=20), height=300)
+    return dcc.Graph(id="report-trends", figure=figure, config={'displayModeBar': False})
+
+def render_regulatory_report(snapshot=None, history=None):
+    """Build the Regulatory Audit Report from a report snapshot (a fresh summary if None)"""
     try:
-        # Get data from database
-        assets_df = db.get_assets()
-        risks_df = db.get_risks()  
-        controls_df = db.get_controls()
-        incidents_df = db.get_incidents()
-        audits_df = db.get_audits()
+        # Metrics come from a stored report snapshot (see create_report_snapshot);
+        # only the five most recent audits are part of it
+        if snapshot is None:
+            snapshot = {'summary': db.get_report_summary(), 'created_date': None}
+        summary = snapshot['summary']
+        audits_df = summary['recent_audits']
         
-        # Calculate key metrics
-        total_assets = len(assets_df)
-        critical_assets = len(assets_df[assets_df['criticality'] == 'High']) if not assets_df.empty else 0
+        total_assets = summary['total_assets']
+        critical_assets = summary['critical_assets']
         
-        total_risks = len(risks_df)
-        high_risks = len(risks_df[risks_df['risk_level'] == 'High']) if not risks_df.empty else 0
+        total_risks = summary['total_risks']
+        high_risks = summary['high_risks']
         
-        total_controls = len(controls_df)
-        effective_controls = len(controls_df[controls_df['effectiveness'] == 'Effective']) if not controls_df.empty else 0
+        total_controls = summary['total_controls']
+        effective_controls = summary['effective_controls']
         
-        total_incidents = len(incidents_df)
-        open_incidents = len(incidents_df[incidents_df['status'] == 'Open']) if not incidents_df.empty else 0
+        total_incidents = summary['total_incidents']
+        open_incidents = summary['open_incidents']
         
-        total_audits = len(audits_df)
-        completed_audits = len(audits_df[audits_df['status'] == 'Completed']) if not audits_df.empty else 0
+        total_audits = summary['total_audits']
+        completed_audits = summary['completed_audits']
         
-        # Calculate compliance score (average of completed audits)
-        if not audits_df.empty and completed_audits > 0:
-            completed_audit_data = audits_df[audits_df['status'] == 'Completed']
-            avg_compliance_score = round(completed_audit_data['compliance_score'].mean(), 1)
-        else:
-            avg_compliance_score = 0
+        # Average compliance score of completed audits
+        avg_compliance_score = summary['avg_compliance_score']
         
         # Risk distribution
-        risk_distribution = risks_df['risk_level'].value_counts().to_dict() if not risks_df.empty else {}
+        risk_distribution = summary['risk_distribution']
         
         # Control effectiveness distribution
-        control_effectiveness = controls_df['effectiveness'].value_counts().to_dict() if not controls_df.empty else {}
+        control_effectiveness = summary['control_effectiveness']
+        
+        # Assets with the most incidents (not in snapshots taken before the
+        # incident-asset links existed)
+        incidents_by_asset = summary.get('incidents_by_asset', [])
         
         return dbc.Container([
             # Header
@@ -581,6 +765,9 @@ def render_regulatory_report_tab():
                     html.H3("Regulatory Audit Report", style={'color': CARBON_COLORS['primary']}),
                     html.P("Comprehensive summary for regulatory compliance assessment", 
                           style={'color': CARBON_COLORS['text_secondary']}),
+                    html.Small(f"Computed {snapshot['created_date']} UTC" if snapshot['created_date']
+                               else "Computed just now", 
+                               id="report-computed", className="text-muted"),
                     html.Hr()
                 ])
             ], className="mb-4"),
@@ -670,6 +857,39 @@ def render_regulatory_report_tab():
                 ], width=6)
             ], className="mb-4"),
             
+            # Control coverage of the open risks
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H6("Risk Coverage", className="mb-0")),
+                        dbc.CardBody(render_risk_coverage(summary.get('risk_coverage'), limit=10))
+                    ])
+                ])
+            ], className="mb-4"),
+            
+            # Incidents per affected asset
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H6("Most Affected Assets", className="mb-0")),
+                        dbc.CardBody([
+                            dbc.Table([
+                                html.Thead(html.Tr([html.Th("Asset"), html.Th("Incidents"),
+                                                    html.Th("Open"), html.Th("Last Incident")])),
+                                html.Tbody([
+                                    html.Tr([html.Td(item['asset_name']), html.Td(item['incidents']),
+                                             html.Td(item['open_incidents']),
+                                             html.Td(item['last_incident_date'] or "")])
+                                    for item in incidents_by_asset
+                                ])
+                            ], id="incidents-by-asset", size="sm", bordered=False, className="mb-0")
+                            if incidents_by_asset
+                            else html.P("No incidents linked to assets", className="text-muted")
+                        ])
+                    ])
+                ])
+            ], className="mb-4"),
+            
             # Audit History
             dbc.Row([
                 dbc.Col([
@@ -682,13 +902,23 @@ def render_regulatory_report_tab():
                             
                             # Recent audits table if any exist
                             html.H6("Recent Audits:", className="mt-3") if not audits_df.empty else "",
-                            create_data_table(audits_df.head(5), "recent-audits-table") if not audits_df.empty 
+                            create_data_table(audits_df, "recent-audits-table") if not audits_df.empty 
                             else html.P("No audits recorded", className="text-muted")
                         ])
                     ])
                 ])
             ], className="mb-4"),
             
+            # Trends over the report snapshots
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H6("Compliance Trends", className="mb-0")),
+                        dbc.CardBody(render_report_trends(history))
+                    ])
+                ])
+            ], className="mb-4"),
+            
             # Recommendations
             dbc.Row([
                 dbc.Col([
@@ -715,12 +945,22 @@ def render_regulatory_report_tab():
         ])
 
 def create_app_layout():
-    """Create the main application layout"""
+    """Create the main application layout
+    
+    Assigned as a function to ``app.layout`` so it is evaluated per page load
+    rather than once at import time.
+    """
+    stats_version, stats = db.get_versioned_dashboard_stats()
+    
     return dbc.Container([
         create_header(),
         
-        # Statistics cards
-        create_stats_cards(),
+        # Statistics cards, refreshed by the interval component when data changes
+        html.Div(id="stats-cards", children=create_stats_cards(stats)),
+        dcc.Store(id="stats-version", data=stats_version),
+        
+        # Full-text search across all records
+        create_search_bar(),
         
         # Main tabs
         dcc.Tabs(id="main-tabs", value="assets", children=[
@@ -756,6 +996,7 @@ def create_app_layout():
             
             # Risk placeholders
             html.Div(id="risks-table-container", style={'display': 'none'}),
+            html.Div(id="risk-coverage", style={'display': 'none'}),
             dbc.Input(id="risk-asset", style={'display': 'none'}),
             dbc.Input(id="risk-title", style={'display': 'none'}),
             dbc.Input(id="risk-description", style={'display': 'none'}),
@@ -764,6 +1005,7 @@ def create_app_layout():
             dbc.Input(id="risk-impact", style={'display': 'none'}),
             dbc.Input(id="risk-level", style={'display': 'none'}),
             dbc.Input(id="risk-mitigation", style={'display': 'none'}),
+            dcc.Dropdown(id="risk-controls", multi=True, style={'display': 'none'}),
             dbc.Input(id="risk-owner", style={'display': 'none'}),
             dbc.Input(id="risk-status", style={'display': 'none'}),
             dbc.Modal(id="risk-modal", is_open=False, style={'display': 'none'}),
@@ -794,7 +1036,7 @@ def create_app_layout():
             dbc.Input(id="incident-title", style={'display': 'none'}),
             dbc.Input(id="incident-description", style={'display': 'none'}),
             dbc.Input(id="incident-severity", style={'display': 'none'}),
-            dbc.Input(id="incident-assets", style={'display': 'none'}),
+            dcc.Dropdown(id="incident-assets", multi=True, style={'display': 'none'}),
             dbc.Input(id="incident-root-cause", style={'display': 'none'}),
             dbc.Input(id="incident-actions", style={'display': 'none'}),
             dbc.Input(id="incident-status", style={'display': 'none'}),
@@ -826,9 +1068,15 @@ def create_app_layout():
             
             # Admin placeholders
             html.Div(id="export-status", style={'display': 'none'}),
+            dbc.Progress(id="export-progress", style={'display': 'none'}),
             html.Div(id="import-status", style={'display': 'none'}),
+            dbc.RadioItems(id="import-mode", value="replace", style={'display': 'none'}),
             dbc.Button(id="export-btn", style={'display': 'none'}),
-            dcc.Upload(id="upload-data", style={'display': 'none'})
+            dbc.Button(id="cancel-export-btn", style={'display': 'none'}),
+            dbc.Button(id="cancel-import-btn", style={'display': 'none'}),
+            dbc.Progress(id="import-progress", style={'display': 'none'}),
+            dcc.Upload(id="upload-data", style={'display': 'none'}),
+            dcc.Store(id="import-upload")
         ], style={'display': 'none'}),
         
         # Interval component for auto-refresh
@@ -0,0 +1,208 @@
+"""
+Versioned schema migrations
+
+Every migration upgrades the schema by one version and ``PRAGMA
+user_version`` of the database file records the last one applied, so
+opening a current file costs one PRAGMA read. Migrations are registered
+in order with the ``migration`` decorator; a migration is never edited
+once released, later changes get a new one.
+
+A migration runs in one IMMEDIATE transaction together with its version
+bump. Migrations marked ``online`` instead manage their own transactions,
+typically a short DDL step followed by a ``backfill`` that commits every
+batch, so other connections can keep writing while existing rows are
+converted. Their steps must be safe to repeat, as an interrupted online
+migration runs again from the start.
+
+The index set, write-version triggers and summary counters are derived
+objects with their own versions in ``schema_meta``; ``migrate`` brings
+them up to date after the last migration (see ISO42001Database).
+"""
+
+import sqlite3
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Rows converted per backfill transaction
+BACKFILL_BATCH_SIZE = 1000
+
+Progress = Optional[Callable[[int, int, str], None]]
+
+
+class Migration:
+    """One schema upgrade step: ``apply(db, conn, progress)`` brings the schema to ``version``"""
+
+    def __init__(self, version: int, description: str, apply: Callable, online: bool = False):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.online = online
+
+    def __repr__(self):
+        return f"<Migration {self.version}: {self.description}>"
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str, online: bool = False):
+    """Register the decorated ``apply(db, conn, progress)`` function as migration ``version``"""
+    def register(apply):
+        expected = len(MIGRATIONS) + 1
+        if version != expected:
+            raise ValueError(f"Migration {version} registered out of order (expected {expected})")
+        MIGRATIONS.append(Migration(version, description, apply, online))
+        return apply
+    return register
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Version of the last migration applied to the database of ``conn``"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(conn: sqlite3.Connection, target: Optional[int] = None) -> List[Migration]:
+    """Migrations not yet applied to ``conn``'s database, up to ``target`` (default: all)"""
+    current = schema_version(conn)
+    target = latest_version() if target is None else target
+    return [m for m in MIGRATIONS if current < m.version <= target]
+
+
+def _begin_immediate(conn: sqlite3.Connection):
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def migrate(db, target: Optional[int] = None, dry_run: bool = False,
+            progress: Progress = None) -> List[Tuple[Migration, float]]:
+    """Apply the pending migrations of ``db`` up to ``target`` (default: the latest).
+
+    Returns ``(migration, seconds)`` for every migration applied, or with
+    ``dry_run`` the pending ones (with 0 seconds) without changing anything.
+    ``progress(done, total, message)`` is passed on to the migrations.
+    Downgrades are not supported. A failing migration is rolled back and
+    leaves the version at the previous migration.
+    """
+    latest = latest_version()
+    target = latest if target is None else target
+    if not 0 <= target <= latest:
+        raise ValueError(f"Unknown schema version {target} (latest is {latest})")
+
+    results = []
+    with db.connection() as conn:
+        current = schema_version(conn)
+        if target < current:
+            raise ValueError(f"Database is at schema version {current}; "
+                             f"downgrading to {target} is not supported")
+        pending = pending_migrations(conn, target)
+        if dry_run:
+            return [(m, 0.0) for m in pending]
+
+        for m in pending:
+            started = time.perf_counter()
+            if not m.online:
+                _begin_immediate(conn)
+                # Another process may have applied it while we waited for the lock
+                if schema_version(conn) >= m.version:
+                    conn.commit()
+                    continue
+            m.apply(db, conn, progress)
+            _begin_immediate(conn)
+            conn.execute(f"PRAGMA user_version = {int(m.version)}")
+            conn.commit()
+            results.append((m, time.perf_counter() - started))
+
+        if target == latest:
+            _begin_immediate(conn)
+            db._ensure_schema_objects(conn.cursor())
+            conn.commit()
+    return results
+
+
+def backfill(conn: sqlite3.Connection, table: str, step: Callable[[sqlite3.Connection, int, int], None],
+             batch_size: int = BACKFILL_BATCH_SIZE, pause: float = 0.0,
+             progress: Progress = None) -> int:
+    """Run ``step(conn, first_id, last_id)`` over ``table`` in id ranges of ``batch_size`` rows.
+
+    Each range is converted and committed in its own short IMMEDIATE
+    transaction, so the write lock is held for one batch at a time rather
+    than for the whole table; ``pause`` seconds between batches give other
+    writers room. Returns the number of rows covered.
+    """
+    total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    done = 0
+    last_id = -1
+    if progress:
+        progress(0, total, table)
+    while True:
+        ids = [row[0] for row in conn.execute(
+            f"SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        )]
+        if not ids:
+            break
+        _begin_immediate(conn)
+        try:
+            step(conn, ids[0], ids[-1])
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        done += len(ids)
+        last_id = ids[-1]
+        if progress:
+            progress(done, max(total, done), table)
+        if pause:
+            time.sleep(pause)
+    return done
+
+
+@migration(1, "Base tables for assets, risks, controls, incidents, audits and bookkeeping")
+def _create_base_tables(db, conn, progress):
+    db._create_tables(conn.cursor())
+
+
+@migration(2, "Full-text search index over titles and free-text columns", online=True)
+def _create_search_index(db, conn, progress):
+    from .database import SEARCH_SOURCES
+    # Triggers first, so rows written during the backfill are indexed by them
+    _begin_immediate(conn)
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+                 "title, body, tokenize = 'unicode61 remove_diacritics 2')")
+    # Title matches weigh more than text matches in ``ORDER BY rank``
+    conn.execute("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(5.0, 1.0)')")
+    db._ensure_search_triggers(conn.cursor())
+    conn.commit()
+    for table in SEARCH_SOURCES:
+        backfill(conn, table,
+                 lambda conn, first, last, table=table: db._index_search_rows(conn, table, first, last),
+                 progress=progress)
+
+
+@migration(3, "Incident-asset links parsed from incidents.affected_assets", online=True)
+def _create_incident_assets(db, conn, progress):
+    # No ON DELETE CASCADE, like risk_controls: deletes remove the links first,
+    # and a replacing import keeps the links whose incident and asset survive
+    _begin_immediate(conn)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS incident_assets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            incident_id INTEGER NOT NULL,
+            asset_id INTEGER NOT NULL,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (incident_id, asset_id),
+            FOREIGN KEY (incident_id) REFERENCES incidents (id),
+            FOREIGN KEY (asset_id) REFERENCES ai_assets (id)
+        )
+    ''')
+    conn.commit()
+    # The free text is left as it is; names are resolved against the assets
+    # as they are now, so later asset writes do not change the links made
+    lookup = db._asset_reference_lookup(conn)
+    backfill(conn, "incidents",
+             lambda conn, first, last: db._link_incident_assets(conn, lookup, first, last),
+             progress=progress)
@@ -0,0 +1,148 @@
+"""
+SQLite connection pooling for the ISO 42001 Bookkeeping System
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+class ConnectionPool:
+    """Thread-aware pool keeping one long-lived SQLite connection per worker thread.
+
+    Connections are created lazily the first time a thread asks for one and are
+    reused for every later call from that thread. When more than ``max_size``
+    threads hold a connection, connections of threads that have exited are
+    reclaimed first; if the pool is still full, the caller gets a transient
+    connection that is closed again after use.
+
+    A child process (background callbacks run in forked processes when
+    diskcache is installed) never uses connections inherited from its parent;
+    it opens its own.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 8,
+                 health_check_interval: float = 30.0,
+                 on_connect: Optional[Callable[[sqlite3.Connection], None]] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.on_connect = on_connect
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._last_checked: Dict[int, float] = {}
+        self._closed = False
+        self._pid = os.getpid()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new connection and apply the per-connection setup"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Run a trivial query to make sure the connection is still usable"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _after_fork(self):
+        """Forget the parent's connections and lock in a forked child process.
+
+        The inherited connections are dropped without closing them, as they
+        still belong to the parent process.
+        """
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._last_checked = {}
+        self._pid = os.getpid()
+
+    def _reap_dead_threads(self):
+        """Close connections owned by threads that are no longer alive (lock held)"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            conn = self._connections.pop(ident)
+            self._last_checked.pop(ident, None)
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _acquire(self):
+        """Return ``(connection, pooled)`` for the calling thread"""
+        if self._pid != os.getpid():
+            self._after_fork()
+        ident = threading.get_ident()
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool has been closed")
+
+            conn = self._connections.get(ident)
+            if conn is not None:
+                now = time.monotonic()
+                if now - self._last_checked.get(ident, 0.0) >= self.health_check_interval:
+                    if not self._is_healthy(conn):
+                        try:
+                            conn.close()
+                        except sqlite3.Error:
+                            pass
+                        conn = self._open()
+                        self._connections[ident] = conn
+                    self._last_checked[ident] = now
+                return conn, True
+
+            if len(self._connections) >= self.max_size:
+                self._reap_dead_threads()
+            if len(self._connections) >= self.max_size:
+                return self._open(), False
+
+            conn = self._open()
+            self._connections[ident] = conn
+            self._last_checked[ident] = time.monotonic()
+            return conn, True
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield the calling thread's connection, rolling back on errors and interrupts"""
+        conn, pooled = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            # Includes KeyboardInterrupt and SystemExit, so an interrupted
+            # caller never leaves the pooled connection holding a write transaction
+            conn.rollback()
+            raise
+        finally:
+            if not pooled:
+                conn.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def size(self) -> int:
+        """Number of pooled connections currently open"""
+        with self._lock:
+            return len(self._connections)
+
+    def close(self):
+        """Close every pooled connection; the pool cannot be used afterwards"""
+        with self._lock:
+            self._closed = True
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._last_checked.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
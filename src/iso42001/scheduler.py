@@ -0,0 +1,63 @@
+"""
+Scheduled refresh of the regulatory report snapshots
+
+ReportScheduler keeps the latest row of ``report_snapshots`` current from a
+daemon thread: every ``poll_interval`` seconds it compares the data version
+(one primary-key lookup) and stores a new snapshot when data has changed, or
+when the latest one is older than ``refresh_interval`` seconds, so the
+history also has regular points for trend charts. Frequent writes do not grow
+the history: snapshots are downsampled to one per ``snapshot_interval`` seconds
+and only the ``keep`` most recent are kept.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from .database import REPORT_SNAPSHOT_INTERVAL, REPORT_SNAPSHOT_RETENTION
+
+
+class ReportScheduler:
+    """Refreshes report snapshots of ``db`` in a background thread"""
+
+    def __init__(self, db, poll_interval: float = 5.0, refresh_interval: float = 24 * 3600,
+                 snapshot_interval: Optional[float] = REPORT_SNAPSHOT_INTERVAL,
+                 keep: Optional[int] = REPORT_SNAPSHOT_RETENTION):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self.snapshot_interval = snapshot_interval
+        self.keep = keep
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_once(self) -> Optional[Dict[str, Any]]:
+        """Store a snapshot if one is due; returns it, or None if the latest is current"""
+        return self.db.create_report_snapshot(max_age=self.refresh_interval or None,
+                                              interval=self.snapshot_interval, keep=self.keep)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Report snapshot error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> "ReportScheduler":
+        """Start the refresh thread (no-op if it is already running)"""
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="report-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the refresh thread and wait up to ``timeout`` seconds for it to end"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
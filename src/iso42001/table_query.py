@@ -0,0 +1,189 @@
+"""
+Translation of Dash DataTable filter/sort state into parameterized SQL
+
+Used by ``ISO42001Database.query_page`` for DataTables running with
+``page_action``, ``sort_action`` and ``filter_action`` set to ``"custom"``,
+and (``build_match_clause``) by the ``where=`` argument of the get_* methods.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# One "{column} operator value" term of a DataTable filter query.
+# Operators follow the DataTable query syntax: an optional case prefix
+# (s = sensitive, i = insensitive) followed by a symbol or keyword.
+_TERM_RE = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s+'
+    r'(?:(?P<unary>is (?:not )?(?:blank|nil))'
+    r'|(?P<case>[si])?(?P<op><=|>=|!=|=|<|>|eq|ne|lt|le|gt|ge|contains|datestartswith)'
+    r'(?:\s+(?P<value>.*))?)$',
+    re.IGNORECASE
+)
+
+# Conjunctions only count when another term follows, so bare values such as
+# "Research and Development" stay intact
+_CONJUNCTION_RE = re.compile(r'\s+(?:&&|and)\s+(?=[{(])', re.IGNORECASE)
+_DISJUNCTION_RE = re.compile(r'\|\||\s+or\s+(?=[{(])', re.IGNORECASE)
+_QUOTED_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`(?:\\.|[^`\\])*`')
+
+_COMPARISONS = {
+    '=': '=', 'eq': '=',
+    '!=': '!=', 'ne': '!=',
+    '<': '<', 'lt': '<',
+    '<=': '<=', 'le': '<=',
+    '>': '>', 'gt': '>',
+    '>=': '>=', 'ge': '>=',
+}
+
+
+def _split_terms(filter_query: str) -> List[str]:
+    """Split a filter query on ``&&``/``and`` outside of quoted values"""
+    placeholders: List[str] = []
+
+    def stash(match):
+        placeholders.append(match.group(0))
+        return f"\x00{len(placeholders) - 1}\x00"
+
+    masked = _QUOTED_RE.sub(stash, filter_query)
+    terms = _CONJUNCTION_RE.split(masked)
+    return [re.sub(r'\x00(\d+)\x00', lambda m: placeholders[int(m.group(1))], term)
+            for term in terms]
+
+
+def _parse_value(raw: Optional[str]) -> Any:
+    """Strip DataTable quoting and coerce bare numeric literals"""
+    if raw is None:
+        return None
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in '"\'`':
+        return raw[1:-1].replace('\\' + raw[0], raw[0])
+    try:
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def quote_identifier(name: str) -> str:
+    """Quote an (already whitelisted) column name for SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build_where_clause(filter_query: Optional[str],
+                       columns: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Translate a DataTable ``filter_query`` into a SQL WHERE clause.
+
+    Returns ``(clause, params)`` where ``clause`` is either empty or starts
+    with ``WHERE``. Terms referring to columns outside ``columns`` are
+    ignored; malformed terms or ``||`` expressions raise ``ValueError``.
+    """
+    if not filter_query or not filter_query.strip():
+        return "", []
+    unquoted = _QUOTED_RE.sub('""', filter_query)
+    if _DISJUNCTION_RE.search(unquoted):
+        raise ValueError("OR expressions are not supported in table filters")
+
+    allowed = set(columns)
+    conditions = []
+    params: List[Any] = []
+    for term in _split_terms(filter_query.strip()):
+        term = term.strip()
+        if term.startswith('(') and term.endswith(')'):
+            term = term[1:-1].strip()
+        match = _TERM_RE.match(term)
+        if not match:
+            raise ValueError(f"Unsupported filter expression: {term}")
+
+        column = match.group('column')
+        if column not in allowed:
+            continue
+        col = quote_identifier(column)
+
+        unary = match.group('unary')
+        if unary:
+            negate = ' not ' in unary.lower()
+            if unary.lower().endswith('blank'):
+                condition = f"({col} IS NULL OR {col} = '')"
+            else:
+                condition = f"{col} IS NULL"
+            conditions.append(f"NOT {condition}" if negate else condition)
+            continue
+
+        op = match.group('op').lower()
+        case = (match.group('case') or '').lower()
+        value = _parse_value(match.group('value'))
+        if value is None:
+            continue
+
+        if op == 'contains':
+            if case == 'i':
+                conditions.append(f"{col} LIKE ? ESCAPE '\\'")
+                params.append(f"%{_escape_like(str(value))}%")
+            else:
+                conditions.append(f"instr({col}, ?) > 0")
+                params.append(str(value))
+        elif op == 'datestartswith':
+            conditions.append(f"{col} LIKE ? ESCAPE '\\'")
+            params.append(f"{_escape_like(str(value))}%")
+        else:
+            collate = " COLLATE NOCASE" if case == 'i' else ""
+            conditions.append(f"{col} {_COMPARISONS[op]} ?{collate}")
+            params.append(value)
+
+    if not conditions:
+        return "", []
+    return "WHERE " + " AND ".join(conditions), params
+
+
+def build_match_clause(where: Optional[Dict[str, Any]],
+                       columns: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Translate a ``{column: value}`` mapping into a SQL WHERE clause.
+
+    A list, tuple or set value matches any of its items (``IN``) and None
+    matches NULL; all conditions must hold. Unknown columns raise
+    ``ValueError``. Returns ``(clause, params)`` like build_where_clause.
+    """
+    if not where:
+        return "", []
+    allowed = set(columns)
+    conditions = []
+    params: List[Any] = []
+    for column, value in where.items():
+        if column not in allowed:
+            raise ValueError(f"Unknown column '{column}'")
+        col = quote_identifier(column)
+        if value is None:
+            conditions.append(f"{col} IS NULL")
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            values = list(value)
+            if not values:
+                conditions.append("0")
+                continue
+            conditions.append(f"{col} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            conditions.append(f"{col} = ?")
+            params.append(value)
+    return "WHERE " + " AND ".join(conditions), params
+
+
+def build_order_by(sort_by: Optional[List[Dict[str, str]]], columns: Sequence[str],
+                   default: str = "created_date DESC") -> str:
+    """Translate a DataTable ``sort_by`` list into a SQL ORDER BY clause"""
+    allowed = set(columns)
+    terms = []
+    for item in sort_by or []:
+        column = item.get('column_id')
+        if column not in allowed:
+            continue
+        direction = "DESC" if item.get('direction') == 'desc' else "ASC"
+        terms.append(f"{quote_identifier(column)} {direction}")
+    return "ORDER BY " + (", ".join(terms) if terms else default)
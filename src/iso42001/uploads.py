@@ -0,0 +1,106 @@
+"""
+Managed spool directory for uploaded import workbooks
+
+The browser streams a workbook to ``/api/import/upload`` (see app.py), which
+copies the request body to disk in fixed-size chunks, so the server never
+holds the whole file in memory. The import callback then only receives the
+upload id. Spooled files are removed after the import, and any that were
+never imported are purged once they are older than ``STALE_AFTER`` seconds.
+"""
+
+import os
+import re
+import tempfile
+import time
+import uuid
+from typing import BinaryIO, Dict
+
+# Spool directory; ISO42001_UPLOAD_DIR or a folder in the temp directory
+UPLOAD_DIR = os.environ.get('ISO42001_UPLOAD_DIR',
+                            os.path.join(tempfile.gettempdir(), 'iso42001-uploads'))
+
+MAX_UPLOAD_BYTES = int(os.environ.get('ISO42001_MAX_UPLOAD_MB', '200')) * 1024 * 1024
+
+UPLOAD_SUFFIXES = ('.xlsx', '.xls')
+
+CHUNK_SIZE = 64 * 1024
+
+STALE_AFTER = 3600
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeds MAX_UPLOAD_BYTES"""
+
+
+def upload_dir() -> str:
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    return UPLOAD_DIR
+
+
+def save_upload(stream: BinaryIO, filename: str,
+                max_bytes: int = MAX_UPLOAD_BYTES) -> Dict[str, object]:
+    """Copy ``stream`` into the spool directory; returns upload_id, filename and size.
+
+    Raises ValueError for a file that is not an Excel workbook and
+    UploadTooLarge once more than ``max_bytes`` have been read. Nothing is
+    left behind when the copy fails.
+    """
+    suffix = os.path.splitext(filename or '')[1].lower()
+    if suffix not in UPLOAD_SUFFIXES:
+        raise ValueError(f"'{filename}' is not an Excel workbook ({', '.join(UPLOAD_SUFFIXES)})")
+    purge_stale()
+
+    upload_id = uuid.uuid4().hex
+    path = os.path.join(upload_dir(), upload_id + suffix)
+    size = 0
+    try:
+        with open(path, 'wb') as handle:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes // (1024 * 1024)} MB")
+                handle.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return {'upload_id': upload_id, 'filename': os.path.basename(filename), 'size': size}
+
+
+def upload_path(upload_id: str) -> str:
+    """Path of a spooled upload; raises FileNotFoundError for unknown or malformed ids"""
+    if not isinstance(upload_id, str) or not _UPLOAD_ID.match(upload_id):
+        raise FileNotFoundError(f"Unknown upload '{upload_id}'")
+    for suffix in UPLOAD_SUFFIXES:
+        path = os.path.join(UPLOAD_DIR, upload_id + suffix)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Unknown upload '{upload_id}'")
+
+
+def discard(upload_id: str):
+    """Remove a spooled upload if it still exists"""
+    try:
+        os.remove(upload_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def purge_stale(max_age: float = STALE_AFTER) -> int:
+    """Remove spooled uploads older than ``max_age`` seconds; returns how many"""
+    if not os.path.isdir(UPLOAD_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(UPLOAD_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
@@ -0,0 +1,115 @@
+"""
+Single-pass reading of Excel workbooks
+
+``pd.read_excel`` parses the workbook archive again for every call, so
+reading five sheets one by one parses it five times. WorkbookReader opens the
+workbook once in openpyxl's read-only (streaming) mode and turns sheets into
+DataFrames on demand, selecting columns while the rows are read.
+"""
+
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from openpyxl import load_workbook
+
+UseCols = Optional[Union[Collection[str], Callable[[str], bool]]]
+
+
+def _column_names(header: Tuple[Any, ...]) -> List[Any]:
+    """Header cells as column names, named and de-duplicated the way pandas does"""
+    names, seen = [], {}
+    for position, name in enumerate(header):
+        if name is None or name == "":
+            name = f"Unnamed: {position}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _cell_value(value: Any) -> Any:
+    # Excel stores every number as a float; whole numbers come back as int like in pandas
+    if type(value) is float and value.is_integer():
+        return int(value)
+    return value
+
+
+class WorkbookReader:
+    """Read sheets of one Excel workbook lazily from a single read-only parse.
+
+    ``source`` is a path or a binary file object. ``dtype`` and ``usecols``
+    are defaults for ``read``: ``dtype=object`` keeps the cell values as
+    read, ``None`` lets pandas infer column types. Use it as a context
+    manager, or call ``close``, to release the file.
+    """
+
+    def __init__(self, source, dtype: Any = None, usecols: UseCols = None):
+        self.dtype = dtype
+        self.usecols = usecols
+        self._workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+
+    def __enter__(self) -> "WorkbookReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._workbook.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._workbook.sheetnames)
+
+    def read(self, sheet: str, dtype: Any = None, usecols: UseCols = None) -> pd.DataFrame:
+        """Read ``sheet`` (first row as header), keeping only the selected columns"""
+        dtype = self.dtype if dtype is None else dtype
+        usecols = self.usecols if usecols is None else usecols
+
+        worksheet = self._workbook[sheet]
+        # Stored dimensions can be wrong; read every row that is actually there
+        worksheet.reset_dimensions()
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        names = _column_names(header)
+        if usecols is None:
+            keep = list(range(len(names)))
+        elif callable(usecols):
+            keep = [i for i, name in enumerate(names) if usecols(name)]
+        else:
+            keep = [i for i, name in enumerate(names) if name in usecols]
+        width = len(names)
+
+        data = []
+        for row in rows:
+            # Blank rows are skipped, as pandas does
+            if all(value is None for value in row):
+                continue
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            data.append([_cell_value(row[i]) for i in keep])
+
+        frame = pd.DataFrame(data, columns=[names[i] for i in keep], dtype=object)
+        if dtype is None:
+            return frame.infer_objects()
+        if dtype is object:
+            return frame
+        if isinstance(dtype, dict):
+            dtype = {column: kind for column, kind in dtype.items() if column in frame}
+        return frame.astype(dtype)
+
+    def sheets(self, names: Optional[Collection[str]] = None, dtype: Any = None,
+               usecols: Optional[Dict[str, UseCols]] = None) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yield ``(sheet, frame)`` one sheet at a time, for all or the given sheet names.
+
+        ``usecols`` maps sheet names to their column selection.
+        """
+        for sheet in self.sheet_names:
+            if names is None or sheet in names:
+                yield sheet, self.read(sheet, dtype=dtype, usecols=(usecols or {}).get(sheet))
@@ -44,11 +44,14 @@ def create_sample_data():
         ("Product Quality Measurements", "Dataset", "Historical quality control measurements and test results", "Medium", "QC Lab", "Active")
     ]
     
-    asset_ids = []
-    for name, asset_type, desc, criticality, owner, status in assets:
-        asset_id = db.add_asset(name, asset_type, desc, criticality, owner, status)
-        asset_ids.append(asset_id)
-        print(f"✓ Added asset: {name}")
+    db.bulk_add_assets(
+        [dict(zip(("name", "type", "description", "criticality", "owner", "status"), asset))
+         for asset in assets],
+        upsert=True
+    )
+    ids_by_name = dict(zip(*(db.get_assets()[column] for column in ("name", "id"))))
+    asset_ids = [ids_by_name[asset[0]] for asset in assets]
+    print(f"✓ Added {len(assets)} assets")
     
     # Sample Risks for Chemical Company
     risks = [
@@ -64,9 +67,13 @@ def create_sample_data():
         (asset_ids[4], "Quality Control System Failure", "Vision system failure could allow defective products to reach customers", "Product Quality", "Low", "Very High", "Critical", "Implement redundant quality checks and human oversight", "James Miller", "Mitigated")
     ]
     
-    for asset_id, title, desc, category, likelihood, impact, level, mitigation, owner, status in risks:
-        db.add_risk(asset_id, title, desc, category, likelihood, impact, level, mitigation, owner, status)
-        print(f"✓ Added risk: {title}")
+    db.bulk_add_risks(
+        [dict(zip(("asset_id", "risk_title", "risk_description", "risk_category", "likelihood",
+                   "impact", "risk_level", "mitigation_strategy", "owner", "status"), risk))
+         for risk in risks],
+        upsert=True
+    )
+    print(f"✓ Added {len(risks)} risks")
     
     # Sample Controls for Chemical Company
     controls = [
@@ -84,9 +91,13 @@ def create_sample_data():
         ("CHM-012", "Third-Party AI Vendor Assessment", "Due diligence process for external AI service providers", "Preventive", "Not Started", "Not Assessed", "Procurement Team")
     ]
     
-    for control_id, name, desc, control_type, status, effectiveness, owner in controls:
-        db.add_control(control_id, name, desc, control_type, status, effectiveness, owner)
-        print(f"✓ Added control: {name}")
+    db.bulk_add_controls(
+        [dict(zip(("control_id", "control_name", "control_description", "control_type",
+                   "implementation_status", "effectiveness", "owner"), control))
+         for control in controls],
+        upsert=True
+    )
+    print(f"✓ Added {len(controls)} controls")
     
     # Sample Incidents for Chemical Company
     incidents = [
@@ -99,9 +110,14 @@ def create_sample_data():
         ("Invoice Processing Error Cascade", "AI invoice system misclassified 200+ chemical supplier invoices", "Medium", "Invoice Processing AI", "Training data lacked sufficient examples of specialty chemical supplier formats", "Enhanced training data and implemented human review for unusual invoice formats", "Resolved", "Accounts Payable Manager", "Finance Team")
     ]
     
-    for title, desc, severity, assets, root_cause, actions, status, reported_by, assigned_to in incidents:
-        db.add_incident(title, desc, severity, assets, root_cause, actions, status, reported_by, assigned_to)
-        print(f"✓ Added incident: {title}")
+    db.bulk_add_incidents(
+        [dict(zip(("incident_title", "incident_description", "severity", "affected_assets",
+                   "root_cause", "corrective_actions", "status", "reported_by", "assigned_to"),
+                  incident))
+         for incident in incidents],
+        upsert=True
+    )
+    print(f"✓ Added {len(incidents)} incidents")
     
     # Sample Audits for Chemical Company
     audits = [
@@ -115,9 +131,13 @@ def create_sample_data():
         ("R&D AI Intellectual Property Audit", "Internal", "Review of IP protection measures for AI systems in research and development", "Legal & IP Team", "Strong protection for core systems, need better controls for collaborative research data", "Implement enhanced data classification and access controls for research partnerships", 82, "Complete")
     ]
     
-    for title, audit_type, scope, auditor, findings, recommendations, score, status in audits:
-        db.add_audit(title, audit_type, scope, auditor, findings, recommendations, score, status)
-        print(f"✓ Added audit: {title}")
+    db.bulk_add_audits(
+        [dict(zip(("audit_title", "audit_type", "audit_scope", "auditor", "findings",
+                   "recommendations", "compliance_score", "status"), audit))
+         for audit in audits],
+        upsert=True
+    )
+    print(f"✓ Added {len(audits)} audits")
     
     print(f"\n✓ SME Chemical Company sample data creation completed successfully!")
     print(f"✓ Application populated with realistic chemical industry AI use cases")
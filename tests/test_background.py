@@ -0,0 +1,93 @@
+"""
+Tests for the background callbacks of export, import and the regulatory report
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001.background import LazyBackgroundManager, create_background_manager
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client of the app, with the page's signed end id, on a fresh database"""
+    from iso42001 import callbacks, layout
+    from iso42001.database import ISO42001Database
+    app_module = sys.modules['iso42001.app']
+    database = ISO42001Database(str(tmp_path / "background.db"))
+    for module in (callbacks, layout, app_module):
+        monkeypatch.setattr(module, "db", database)
+    monkeypatch.chdir(tmp_path)
+
+    test_client = app_module.app.server.test_client()
+    page = test_client.get('/').get_data(as_text=True)
+    config = re.search(r'<script id="_dash-config" type="application/json">(.*?)</script>',
+                       page, re.S).group(1)
+    test_client.end_id = json.loads(config)['end_id']
+    test_client.database = database
+    yield test_client
+    database.close()
+
+
+def run_background(client, output, inputs, timeout=10):
+    """Start a background callback and poll it like the renderer; returns (response, progress)"""
+    component, prop = output.split('.')
+    body = {'output': output, 'outputs': {'id': component, 'property': prop},
+            'inputs': inputs, 'changedPropIds': [f"{i['id']}.{i['property']}" for i in inputs],
+            'state': []}
+    handles = client.post(f'/_dash-update-component?endId={client.end_id}', json=body).get_json()
+    progress = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        reply = client.post(f"/_dash-update-component?endId={client.end_id}"
+                            f"&cacheKey={handles['cacheKey']}&job={handles['job']}", json=body)
+        data = reply.get_json() if reply.status_code == 200 else {}
+        if 'progress' in data:
+            progress.append(data['progress'])
+        if 'response' in data:
+            return data['response'][component][prop], progress
+        time.sleep(0.02)
+    raise AssertionError(f"{output} did not finish")
+
+
+def test_export_runs_as_background_callback(client, tmp_path):
+    client.database.bulk_add_assets([{'name': f"Model {i}", 'asset_type': "ML Model"}
+                                     for i in range(2500)])
+    status, progress = run_background(
+        client, "export-status.children",
+        [{'id': "export-btn", 'property': "n_clicks", 'value': 1}])
+
+    assert "exported successfully" in str(status)
+    assert progress[-1] == {'export-progress.value': 100, 'export-progress.label': "100% Assets"}
+    assert list(tmp_path.glob("iso42001_export_*.xlsx"))
+
+
+def test_regulatory_report_is_generated_in_background(client):
+    client.database.add_asset("Model", "ML Model", criticality="High")
+    report, _ = run_background(
+        client, "regulatory-report-content.children",
+        [{'id': "regulatory-report-request", 'property': "data", 'value': None}])
+    assert "Regulatory Audit Report" in json.dumps(report)
+
+
+def test_background_manager_keeps_jobs_in_the_cache_dir(tmp_path):
+    from dash import DiskcacheManager
+    manager = create_background_manager(str(tmp_path / "jobs"))
+    assert isinstance(manager, DiskcacheManager)
+    assert manager.handle.directory == str(tmp_path / "jobs")
+
+
+def test_lazy_background_manager_opens_its_cache_on_first_use(tmp_path):
+    manager = LazyBackgroundManager(str(tmp_path / "jobs"))
+    assert not manager.initialized and not (tmp_path / "jobs").exists()
+    assert manager.handle.directory == str(tmp_path / "jobs")
+    assert manager.initialized
+
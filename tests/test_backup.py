@@ -0,0 +1,150 @@
+"""
+Tests for the CSV, Parquet and SQLite snapshot backup formats
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001 import backup
+from iso42001.database import ISO42001Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ISO42001Database(str(tmp_path / "source.db"))
+    asset_id = database.add_asset("Model", "ML Model", description="")
+    risk_id = database.add_risk(asset_id, "Drift", owner="Data team")
+    database.add_risk(None, "Unassigned")
+    control_id = database.add_control("CTL-1", "Monitoring, weekly", control_description='Says "hi"\nTwice')
+    database.add_incident("Outage")
+    database.add_audit("Audit", compliance_score=80, status="Complete")
+    with database.connection() as conn:
+        conn.execute("INSERT INTO risk_controls (risk_id, control_id) VALUES (?, ?)",
+                     (risk_id, control_id))
+        conn.commit()
+    yield database
+    database.close()
+
+
+def snapshot(database):
+    with database.connection() as conn:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+                for table in backup.BACKUP_TABLES}
+
+
+@pytest.mark.parametrize("backup_format, name", [
+    ("csv", "backup_csv"),
+    ("sqlite", "backup.db"),
+    ("parquet", "backup_parquet"),
+])
+def test_backup_round_trip(db, tmp_path, backup_format, name):
+    if backup_format == "parquet":
+        pytest.importorskip("pyarrow")
+    path = str(tmp_path / name)
+    expected = snapshot(db)
+
+    assert db.export_database(path, format=backup_format)
+    target = ISO42001Database(str(tmp_path / "target.db"))
+    target.add_asset("Replaced", "Dataset")
+    assert target.import_database(path)  # format detected from the path
+    assert snapshot(target) == expected
+    assert target.get_dashboard_stats()['total_assets'] == 1
+    target.close()
+
+
+@pytest.mark.parametrize("backup_format", ["csv", "parquet"])
+def test_restore_progress_reports_the_backup_row_total(db, tmp_path, backup_format):
+    if backup_format == "parquet":
+        pytest.importorskip("pyarrow")
+    folder = str(tmp_path / f"backup_{backup_format}")
+    rows = getattr(backup, f"export_{backup_format}")(db, folder)
+
+    reports = []
+    getattr(backup, f"import_{backup_format}")(db, folder,
+                                              progress=lambda *report: reports.append(report))
+    assert {total for _, total, _ in reports} == {rows}
+    assert reports[-1] == (rows, rows, backup.BACKUP_TABLES[-1])
+
+
+def test_csv_keeps_null_distinct_from_empty(db, tmp_path):
+    db.export_database(str(tmp_path / "csv"), format="csv")
+    db.import_database(str(tmp_path / "csv"))
+    with db.connection() as conn:
+        assert conn.execute(
+            "SELECT asset_id FROM risks WHERE risk_title = 'Unassigned'").fetchone() == (None,)
+        assert conn.execute("SELECT description FROM ai_assets").fetchone() == ("",)
+
+
+def test_sqlite_restore_invalidates_version_caches(db, tmp_path):
+    path = str(tmp_path / "snapshot.db")
+    db.export_database(path)
+    before = db.get_data_versions()
+    db.add_asset("Added after the snapshot", "Dataset")
+    assert db.get_dashboard_stats()['total_assets'] == 2
+
+    db.import_database(path)
+    after = db.get_data_versions()
+    assert all(after[table] > version for table, version in before.items())
+    assert db.get_dashboard_stats()['total_assets'] == 1
+
+
+def test_sqlite_restore_rejects_foreign_database(db, tmp_path):
+    import sqlite3
+    other = tmp_path / "other.db"
+    sqlite3.connect(other).execute("CREATE TABLE t (x)").connection.close()
+    assert db.import_database(str(other)) is False
+    assert db.count_rows("ai_assets") == 1
+
+
+def test_detect_format(tmp_path):
+    assert backup.detect_format("export.xlsx") == "excel"
+    assert backup.detect_format("snapshot.sqlite3") == "sqlite"
+    folder = tmp_path / "dump"
+    folder.mkdir()
+    (folder / "risks.csv.gz").write_bytes(b"")
+    assert backup.detect_format(str(folder)) == "csv"
+    with pytest.raises(ValueError):
+        backup.detect_format(str(tmp_path / "unknown"))
+
+
+def test_failed_restore_keeps_data_and_triggers(db, tmp_path):
+    import gzip
+    folder = tmp_path / "broken"
+    folder.mkdir()
+    with gzip.open(folder / "controls.csv.gz", "wt") as handle:
+        handle.write("id,control_id,control_name\n1,CTL-9,\\N\n")  # control_name is NOT NULL
+    version = db.get_data_version()
+
+    assert db.import_database(str(folder), format="csv") is False
+    assert db.count_rows("controls") == 1
+    assert db.get_data_version() == version
+    db.add_asset("Still counted", "Dataset")
+    assert db.get_dashboard_stats()['total_assets'] == 2
+
+
+def test_interrupted_restore_releases_the_write_lock(db, tmp_path):
+    import sqlite3
+    folder = str(tmp_path / "backup_csv")
+    backup.export_csv(db, folder)
+    expected = snapshot(db)
+
+    def interrupt_after_first_table(done, total, table):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        backup.import_csv(db, folder, progress=interrupt_after_first_table)
+    with db.connection() as conn:
+        assert not conn.in_transaction
+    assert snapshot(db) == expected
+
+    # Other writers are not locked out, and the triggers are still in place
+    other = sqlite3.connect(db.db_path, timeout=0)
+    other.execute("INSERT INTO audits (audit_title) VALUES ('Follow-up')")
+    other.commit()
+    other.close()
+    assert db.get_counters()['audits']['total'] == 2
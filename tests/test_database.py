@@ -0,0 +1,645 @@
+"""
+Tests for the ISO 42001 database layer
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001.database import ISO42001Database, LazyDatabase, get_database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ISO42001Database(str(tmp_path / "test_iso42001.db"))
+    yield database
+    database.close()
+
+
+def test_pool_reuses_connection_per_thread(db):
+    with db.connection() as first:
+        pass
+    db.add_asset("Model A", "ML Model")
+    with db.connection() as second:
+        pass
+    assert first is second
+    assert db.pool.size() == 1
+
+
+def test_pool_gives_each_thread_its_own_connection(db):
+    seen = []
+
+    def worker():
+        with db.connection() as conn:
+            seen.append(conn)
+        db.add_asset("Threaded", "AI System")
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(conn) for conn in seen}) == 3
+    assert len(db.get_assets()) == 3
+
+
+def test_pool_overflow_uses_transient_connection(tmp_path):
+    database = ISO42001Database(str(tmp_path / "small.db"), pool_size=1)
+    seen = []
+
+    def worker():
+        with database.connection() as conn:
+            seen.append(conn.execute("PRAGMA foreign_keys").fetchone()[0])
+
+    holder = threading.Event()
+    release = threading.Event()
+
+    def long_lived():
+        with database.connection():
+            holder.set()
+            release.wait()
+
+    blocker = threading.Thread(target=long_lived)
+    blocker.start()
+    holder.wait()
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    release.set()
+    blocker.join()
+
+    assert seen == [1]
+    assert database.pool.size() <= 1
+    database.close()
+
+
+def test_pool_replaces_unhealthy_connection(tmp_path):
+    database = ISO42001Database(str(tmp_path / "health.db"), health_check_interval=0)
+    with database.connection() as conn:
+        conn.close()
+    database.add_asset("After reconnect", "Dataset")
+    assert len(database.get_assets()) == 1
+    database.close()
+
+
+def test_close_and_context_manager(tmp_path):
+    with ISO42001Database(str(tmp_path / "ctx.db")) as database:
+        database.add_asset("Scoped", "Algorithm")
+        assert database.get_dashboard_stats()['total_assets'] == 1
+    assert database.pool.size() == 0
+    with pytest.raises(Exception):
+        database.get_assets()
+
+
+def test_init_database_skips_ddl_when_schema_is_current(db):
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        db.init_database()
+        conn.set_trace_callback(None)
+    assert not [sql for sql in statements if "CREATE" in sql.upper()]
+
+    with db.connection() as conn:
+        conn.execute("PRAGMA user_version = 0")
+        conn.set_trace_callback(statements.append)
+        db.init_database()
+        conn.set_trace_callback(None)
+    assert [sql for sql in statements if "CREATE TABLE" in sql.upper()]
+    with db.connection() as conn:
+        assert db._schema_is_current(conn)
+
+
+def test_get_database_shares_one_handle_per_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shared = get_database("shared.db")
+    assert get_database(str(tmp_path / "shared.db")) is shared
+    lazy = LazyDatabase(str(tmp_path / "shared.db"))
+    lazy.add_asset("Model", "ML Model")
+    assert lazy._db is shared
+
+    shared.close()
+    replacement = get_database("shared.db")
+    assert replacement is not shared
+    assert len(lazy.get_assets()) == 1
+    assert lazy._db is replacement
+    replacement.close()
+
+
+def test_performance_profile_enables_wal(tmp_path):
+    database = ISO42001Database(str(tmp_path / "wal.db"), profile="performance")
+    settings = database.get_pragma_settings()
+    assert settings['journal_mode'] == 'wal'
+    assert settings['synchronous'] == 1  # NORMAL
+    assert settings['temp_store'] == 2  # MEMORY
+    assert settings['busy_timeout'] == 5000
+    database.close()
+
+
+def test_init_database_switches_profile(db):
+    db.init_database(profile="performance")
+    assert db.get_pragma_settings()['journal_mode'] == 'wal'
+
+
+def test_unknown_profile_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ISO42001Database(str(tmp_path / "bad.db"), profile="turbo")
+
+
+def test_query_page_filters_sorts_and_pages(db):
+    asset_id = db.add_asset("Vision model", "ML Model")
+    for i in range(25):
+        db.add_risk(asset_id, f"Risk {i:02d}", status="Open" if i % 2 else "Closed")
+
+    df, total = db.query_page("risks", page_current=1, page_size=5,
+                              sort_by=[{'column_id': 'risk_title', 'direction': 'asc'}],
+                              filter_query='{status} = Open && {asset_name} contains "Vision"')
+    assert total == 12
+    assert list(df['risk_title']) == ["Risk 11", "Risk 13", "Risk 15", "Risk 17", "Risk 19"]
+
+
+def test_query_page_parameterizes_filter_values(db):
+    db.add_asset("Robert'); DROP TABLE ai_assets;--", "Dataset")
+    df, total = db.query_page("ai_assets", filter_query="{name} icontains \"drop table\"")
+    assert total == 1
+    assert db.count_rows("ai_assets") == 1
+
+
+def test_query_page_rejects_unknown_table(db):
+    with pytest.raises(ValueError):
+        db.query_page("sqlite_master")
+
+
+def test_getters_project_filter_and_limit(db):
+    asset_id = db.add_asset("Vision model", "ML Model")
+    for i in range(6):
+        db.add_risk(asset_id, f"Risk {i}", status="Open" if i % 2 else "Closed")
+
+    df = db.get_risks(columns=['id', 'risk_title', 'asset_name'],
+                      where={'status': "Open", 'asset_id': [asset_id, 999]}, limit=2)
+    assert list(df.columns) == ['id', 'risk_title', 'asset_name']
+    assert len(df) == 2
+    assert set(df['asset_name']) == {"Vision model"}
+    db.add_risk(None, "Unassigned")
+    assert list(db.get_risks(columns=['risk_title'], where={'asset_id': None})['risk_title']) == ["Unassigned"]
+    assert db.get_risks(where={'status': []}).empty
+    with pytest.raises(ValueError):
+        db.get_assets(columns=['name; DROP TABLE ai_assets'])
+    with pytest.raises(ValueError):
+        db.get_assets(where={'1=1 OR name': "x"})
+
+
+def test_option_lists_are_plain_tuples(db):
+    first = db.add_asset("Model A", "ML Model")
+    second = db.add_asset("Model B", "Dataset")
+    db.add_control("CTL-1", "Review")
+    assert sorted(db.get_asset_options()) == [(first, "Model A"), (second, "Model B")]
+    assert [label for _, label in db.get_control_options()] == ["CTL-1 Review"]
+    assert db.get_risk_options() == []
+
+
+def test_search_index_follows_writes(db):
+    asset_id = db.add_asset("Credit scoring model", "ML Model", description="Gradient boosting on loan data")
+    risk_id = db.add_risk(asset_id, "Bias in loan decisions",
+                          risk_description="Model may discriminate against protected groups",
+                          mitigation_strategy="Fairness testing before each release")
+    db.add_control("CTL-7", "Fairness review", control_description="Quarterly review of loan model bias")
+
+    hits, total = db.search("loan")
+    assert total == 3
+    # Title matches rank above matches in the text
+    assert hits[0]['table'] == 'risks' and hits[0]['id'] == risk_id
+    assert hits[0]['title'] == "Bias in <mark>loan</mark> decisions"
+
+    hits, total = db.search("discrim protect")
+    assert [(hit['table'], hit['id']) for hit in hits] == [('risks', risk_id)]
+    assert "<mark>discriminate</mark>" in hits[0]['snippet']
+
+    assert db.search("fairness", tables=['controls'])[1] == 1
+    assert db.search("loan", page=1, page_size=2)[0][0]['table'] in ('ai_assets', 'controls')
+    assert db.search('loan" OR "x') == db.search("loan x")
+    assert db.search("  ") == ([], 0)
+    with pytest.raises(ValueError):
+        db.search("loan", tables=['sqlite_master'])
+
+    db.update_risk(risk_id, risk_title="Unequal outcomes")
+    assert db.search("bias")[1] == 1
+    assert db.search("unequal")[0][0]['id'] == risk_id
+    db.delete_risk(risk_id)
+    assert db.search("unequal")[1] == 0
+
+
+def test_search_index_rebuilt_after_bulk_load(db):
+    db.add_asset("Legacy model", "ML Model")
+    with db.connection() as conn:
+        with db.triggers_suspended(conn):
+            conn.execute("DELETE FROM ai_assets")
+            conn.execute("INSERT INTO ai_assets (name, type) VALUES ('Imported model', 'Dataset')")
+        conn.commit()
+    assert db.search("legacy")[1] == 0
+    assert db.search("imported")[1] == 1
+    with db.connection() as conn:
+        triggers = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_search_%'"
+        ).fetchone()[0]
+    assert triggers == 15
+
+
+def test_risk_control_mappings_and_coverage(db):
+    import sqlite3
+    critical = db.add_risk(None, "Model inversion", risk_level="Critical")
+    high = db.add_risk(None, "Bias", risk_level="High")
+    low = db.add_risk(None, "Latency", risk_level="Low")
+    db.add_risk(None, "Vendor lock-in", risk_level="High", status="Accepted")
+    effective = db.add_control("CTL-1", "Fairness review", implementation_status="Implemented",
+                               effectiveness="Effective")
+    partial = db.add_control("CTL-2", "Output filter", implementation_status="Implemented",
+                             effectiveness="Partially Effective")
+    planned = db.add_control("CTL-3", "Differential privacy", implementation_status="In Progress",
+                             effectiveness="Effective")
+
+    pairs = [(critical, partial), (critical, planned), (high, effective), (high, effective)]
+    assert db.link_risk_controls(pairs) == 3
+    assert db.link_risk_controls(pairs) == 0
+    assert db.get_risk_control_ids(critical) == sorted([partial, planned])
+    assert db.get_control_risk_ids(effective) == [high]
+    with pytest.raises(sqlite3.IntegrityError):
+        db.link_risk_controls([(low, effective), (low, 999)])
+    assert db.get_risk_control_ids(low) == []
+
+    coverage = db.get_risk_coverage()
+    assert (coverage['risks'], coverage['covered'], coverage['partially_covered'],
+            coverage['uncovered']) == (3, 1, 1, 1)
+    assert coverage['avg_coverage'] == 50.0
+    assert coverage['by_level']['Critical'] == {'risks': 1, 'covered': 0,
+                                                'partially_covered': 1, 'uncovered': 0}
+    assert coverage['uncovered_total'] == 1
+    assert [(r['risk_id'], r['controls'], r['coverage']) for r in coverage['uncovered_risks']] == [
+        (critical, 2, 0.5)]
+
+    # Cached until risks, controls or mappings change
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        assert db.get_risk_coverage() == coverage
+        conn.set_trace_callback(None)
+    assert not any("risk_controls" in sql for sql in statements)
+    db.add_audit("Unrelated")
+    assert db.get_risk_coverage() == coverage
+
+    db.update_control(planned, implementation_status="Implemented")
+    assert db.get_risk_coverage()['uncovered_total'] == 0
+    assert db.unlink_risk_controls([(high, effective), (low, effective)]) == 1
+    uncovered = db.query_risk_coverage(uncovered_only=True)
+    assert uncovered[['risk_id', 'residual']].values.tolist() == [[high, 1.0], [low, 1.0]]
+
+    assert db.update_risk(high, control_ids=[partial, effective])['id'] == high
+    assert db.get_risk_control_ids(high) == sorted([effective, partial])
+    db.delete_control(effective)
+    db.delete_risk(critical)
+    assert db.get_risk_control_ids(high) == [partial]
+    assert db.get_report_summary()['risk_coverage']['covered'] == 0
+
+
+def test_incident_asset_links_and_rollup(db):
+    chatbot = db.add_asset("Chatbot", "ML Model")
+    scoring = db.add_asset("Scoring model", "ML Model")
+    outage = db.add_incident("Outage", asset_ids=[scoring, chatbot, chatbot], return_row=True)
+    assert outage['affected_assets'] == "Chatbot, Scoring model"
+    assert db.get_incident_asset_ids(int(outage['id'])) == sorted([chatbot, scoring])
+
+    assert db.update_incident(outage['id'], asset_ids=[scoring])['affected_assets'] == "Scoring model"
+    db.update_asset(scoring, name="Credit model")
+    assert db.get_row('incidents', outage['id'])['affected_assets'] == "Credit model"
+
+    db.add_incident("Drift", status="Resolved", asset_ids=[scoring])
+    db.add_incident("Prompt leak", asset_ids=[chatbot])
+    summary = db.get_asset_incident_summary()
+    assert summary[['asset_name', 'incidents', 'open_incidents']].values.tolist() == [
+        ["Credit model", 2, 1], ["Chatbot", 1, 1]]
+    assert db.get_asset_incidents(scoring)['incident_title'].tolist() == ["Drift", "Outage"]
+    assert db.get_report_summary(top_assets=1)['incidents_by_asset'][0]['asset_id'] == scoring
+
+    db.delete_asset(scoring)
+    assert db.get_row('incidents', outage['id'])['affected_assets'] == ""
+    assert db.get_asset_incident_summary()['asset_id'].tolist() == [chatbot]
+    with pytest.raises(Exception):
+        db.update_incident(outage['id'], asset_ids=[scoring])
+
+
+def test_bulk_added_incidents_are_linked_to_the_assets_they_name(db):
+    chatbot = db.add_asset("Chatbot", "ML Model")
+    scoring = db.add_asset("Scoring model", "ML Model")
+    db.bulk_add_incidents([
+        {'incident_title': "Outage", 'affected_assets': "Chatbot, Scoring model"},
+        {'incident_title': "Drift", 'affected_assets': f"{scoring} - Scoring model; manual"},
+    ])
+    outage, drift = (db.get_incidents(where={'incident_title': title}).iloc[0]
+                     for title in ("Outage", "Drift"))
+    assert db.get_incident_asset_ids(int(outage['id'])) == [chatbot, scoring]
+    assert db.get_incident_asset_ids(int(drift['id'])) == [scoring]
+    assert drift['affected_assets'] == f"{scoring} - Scoring model; manual"
+
+    db.bulk_add_incidents([{'incident_title': "Outage", 'affected_assets': "Chatbot"}], upsert=True)
+    assert db.get_incident_asset_ids(int(outage['id'])) == [chatbot]
+    assert db.get_incident_asset_ids(int(drift['id'])) == [scoring]
+
+
+def test_dashboard_stats_single_query_and_cache(db):
+    db.add_asset("Model", "ML Model")
+    db.add_risk(None, "Open risk")
+    db.add_risk(None, "Closed risk", status="Closed")
+    db.add_control("CTL-1", "Review", implementation_status="Implemented")
+    db.add_incident("Outage", status="Investigating")
+    db.add_audit("Audit", status="Complete")
+
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        stats = db.get_dashboard_stats()
+        computed = len(statements)
+        assert db.get_dashboard_stats() == stats
+        cached = len(statements) - computed
+        conn.set_trace_callback(None)
+
+    assert stats == {'total_assets': 1, 'active_risks': 1, 'implemented_controls': 1,
+                     'open_incidents': 1, 'completed_audits': 1}
+    assert computed == 2  # version lookup + one summary counter read
+    assert cached == 1  # version lookup only
+
+
+def test_dashboard_stats_cache_invalidated_by_other_handles(db):
+    assert db.get_dashboard_stats()['total_assets'] == 0
+    other = ISO42001Database(db.db_path)
+    other.add_asset("Written elsewhere", "Dataset")
+    other.close()
+    assert db.get_dashboard_stats()['total_assets'] == 1
+
+
+def test_data_versions_bump_per_table(db):
+    before = db.get_data_versions()
+    asset_id = db.add_asset("Model", "ML Model")
+    db.update_asset(asset_id, status="Inactive")
+    after = db.get_data_versions()
+    assert after['ai_assets'] == before['ai_assets'] + 2
+    assert after['risks'] == before['risks']
+
+
+def test_summary_counters_follow_writes(db):
+    first = db.add_risk(None, "First", risk_level="High")
+    second = db.add_risk(None, "Second", risk_level="Low", status="Closed")
+    db.update_risk(first, risk_level="Critical", status="Mitigated")
+    db.update_risk(second, risk_title="Renamed")
+    db.delete_risk(second)
+
+    risks = db.get_counters()['risks']
+    assert risks['total'] == 1
+    assert risks['risk_level'] == {'Critical': 1}
+    assert risks['status'] == {'Mitigated': 1}
+    assert db.rebuild_counters()['risks'] == risks
+
+
+def test_summary_counters_built_for_existing_data(db):
+    db.add_control("CTL-1", "Review", effectiveness="Effective")
+    with db.connection() as conn:
+        conn.execute("DELETE FROM summary_counters")
+        conn.execute("DELETE FROM schema_meta WHERE key = 'counters_version'")
+        conn.commit()
+    db.init_database()
+    controls = db.get_counters()['controls']
+    assert controls['total'] == 1
+    assert controls['effectiveness'] == {'Effective': 1}
+
+
+def test_report_summary_uses_aggregates(db):
+    for i, (score, status) in enumerate([(80, "Complete"), (91, "Complete"), (40, "Planned")] * 3):
+        db.add_audit(f"Audit {i}", compliance_score=score, status=status)
+    db.add_risk(None, "Bias", risk_level="High")
+
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        summary = db.get_report_summary()
+        conn.set_trace_callback(None)
+
+    assert summary['total_audits'] == 9
+    assert summary['completed_audits'] == 6
+    assert summary['avg_compliance_score'] == 85.5
+    assert summary['high_risks'] == 1
+    assert summary['risk_distribution'] == {'High': 1}
+    assert len(summary['recent_audits']) == 5
+    assert not any("SELECT * FROM" in sql and "LIMIT" not in sql for sql in statements)
+
+
+def test_report_snapshots_follow_data_changes(db):
+    db.add_audit("Audit", compliance_score=70, status="Complete")
+    first = db.create_report_snapshot(interval=None)
+    assert first['summary']['avg_compliance_score'] == 70
+    assert first['summary']['recent_audits']['audit_title'].tolist() == ["Audit"]
+    assert db.create_report_snapshot(interval=None) is None          # nothing changed
+    assert db.create_report_snapshot(max_age=0, interval=None) is not None   # too old
+
+    db.add_audit("Follow-up", compliance_score=90, status="Complete")
+    latest = db.create_report_snapshot(interval=None)
+    assert latest['data_version'] > first['data_version']
+    assert db.get_report_snapshot()['id'] == latest['id']
+
+    history = db.get_report_history()
+    assert history['avg_compliance_score'].tolist() == [70, 70, 80]
+    assert history['completed_audits'].tolist() == [1, 1, 2]
+
+
+def test_report_snapshots_are_downsampled_and_pruned(db):
+    first = db.create_report_snapshot()
+    db.add_asset("Model", "ML Model")
+    latest = db.create_report_snapshot()
+    # Same hour: the new snapshot replaces the latest one
+    assert latest['id'] == first['id']
+    assert latest['summary']['total_assets'] == 1
+    assert len(db.get_report_history()) == 1
+
+    for i in range(5):
+        db.add_asset(f"Model {i}", "ML Model")
+        db.create_report_snapshot(interval=None, keep=3)
+    history = db.get_report_history()
+    assert len(history) == 3
+    assert history['total_assets'].tolist() == [4, 5, 6]
+
+
+def test_racing_report_snapshots_store_one_per_interval(db):
+    # A second handle on the same file, as the background report process has
+    other = ISO42001Database(db.db_path)
+    db.add_asset("Model", "ML Model")
+    compute = db.get_report_summary
+
+    def summary_while_the_other_handle_snapshots():
+        assert other.create_report_snapshot() is not None
+        return compute()
+
+    db.get_report_summary = summary_while_the_other_handle_snapshots
+    try:
+        assert db.create_report_snapshot() is None
+    finally:
+        db.get_report_summary = compute
+        other.close()
+    # Forced, it replaces the other handle's snapshot of the same hour
+    forced = db.create_report_snapshot(force=True)
+    assert len(db.get_report_history()) == 1
+    assert db.get_report_snapshot()['id'] == forced['id']
+
+
+def test_report_scheduler_keeps_history_bounded_under_writes(db):
+    import time
+    from iso42001.scheduler import ReportScheduler
+
+    def wait_for_snapshot_of_current_version():
+        version = db.get_data_version()
+        for _ in range(200):
+            snapshot = db.get_report_snapshot()
+            if snapshot and snapshot['data_version'] == version:
+                return snapshot
+            time.sleep(0.01)
+        raise AssertionError("scheduler did not take a snapshot")
+
+    scheduler = ReportScheduler(db, poll_interval=0.01).start()
+    try:
+        for i in range(10):
+            db.add_asset(f"Model {i}", "ML Model")
+            wait_for_snapshot_of_current_version()
+    finally:
+        scheduler.stop(timeout=5)
+    # Ten change-driven snapshots in one hour collapse into one (two if the hour turned)
+    assert len(db.get_report_history()) <= 2
+    assert db.get_report_snapshot()['summary']['total_assets'] == 10
+
+    scheduler = ReportScheduler(db, poll_interval=0.01, snapshot_interval=None, keep=4).start()
+    try:
+        for i in range(10):
+            db.add_asset(f"Extra {i}", "ML Model")
+            wait_for_snapshot_of_current_version()
+    finally:
+        scheduler.stop(timeout=5)
+    history = db.get_report_history()
+    assert len(history) == 4
+    assert history['total_assets'].iloc[-1] == 20
+
+
+def test_report_scheduler_refreshes_in_background(db):
+    import time
+    from iso42001.scheduler import ReportScheduler
+    scheduler = ReportScheduler(db, poll_interval=0.01).start()
+    try:
+        db.add_asset("Model", "ML Model")
+        version = db.get_data_version()
+        for _ in range(200):
+            snapshot = db.get_report_snapshot()
+            if snapshot and snapshot['data_version'] == version:
+                break
+            time.sleep(0.01)
+        assert snapshot['summary']['total_assets'] == 1
+    finally:
+        scheduler.stop(timeout=5)
+    assert not scheduler.running
+
+
+def test_writes_can_return_the_stored_row(db):
+    asset = db.add_asset("Model", "ML Model", return_row=True)
+    assert asset['name'] == "Model" and asset['status'] == "Active"
+    risk = db.add_risk(asset['id'], "Drift", return_row=True)
+    assert risk['asset_name'] == "Model"
+
+    updated = db.update_risk(risk['id'], status="Closed")
+    assert updated['status'] == "Closed"
+    assert db.update_risk(9999, status="Closed") is None
+
+
+def test_bulk_add_inserts_in_chunks_with_defaults(db):
+    counts = db.bulk_add_assets(
+        ({'name': f"Model {i}", 'asset_type': "ML Model", 'unknown': "ignored"} for i in range(7)),
+        chunk_size=3
+    )
+    assert counts == {'inserted': 7, 'updated': 0}
+    assets = db.get_assets()
+    assert len(assets) == 7
+    assert set(assets['criticality']) == {"Medium"}
+    assert assets['last_reviewed'].notna().all()
+    assert db.get_counters()['ai_assets']['type'] == {"ML Model": 7}
+
+
+def test_bulk_add_accepts_dataframes(db):
+    import pandas as pd
+    frame = pd.DataFrame({'incident_title': ["Outage", "Leak"], 'severity': ["High", None]})
+    assert db.bulk_add_incidents(frame)['inserted'] == 2
+    assert sorted(db.get_incidents()['severity']) == ["High", "Medium"]
+
+
+def test_bulk_upsert_on_natural_key(db):
+    db.add_control("CTL-1", "Review", effectiveness="Effective")
+    counts = db.bulk_add_controls([
+        {'control_id': "CTL-1", 'control_name': "Quarterly review"},
+        {'control_id': "CTL-2", 'control_name': "Monitoring"},
+        {'control_id': "CTL-2", 'control_name': "Drift monitoring"},
+    ], upsert=True, chunk_size=2)
+    assert counts == {'inserted': 1, 'updated': 2}
+    controls = db.get_controls().set_index('control_id')
+    assert controls.loc["CTL-1", 'control_name'] == "Quarterly review"
+    assert controls.loc["CTL-1", 'effectiveness'] == "Effective"
+    assert controls.loc["CTL-2", 'control_name'] == "Drift monitoring"
+    assert len(controls) == 2
+
+
+def test_bulk_add_is_atomic(db):
+    rows = [{'control_id': "CTL-1", 'control_name': "Review"},
+            {'control_id': "CTL-2"}]  # control_name is NOT NULL
+    with pytest.raises(Exception):
+        db.bulk_add_controls(rows, chunk_size=1)
+    assert db.count_rows("controls") == 0
+
+
+def test_large_bulk_add_suspends_triggers_and_rebuilds_once(db, monkeypatch):
+    from iso42001 import database
+    monkeypatch.setattr(database, "BULK_SUSPEND_TRIGGERS_ROWS", 10)
+    version = db.get_data_version('risks')
+    counts = db.bulk_add_risks(({'risk_title': f"Drift {i}", 'status': "Closed" if i % 2 else "Open"}
+                                for i in range(25)), chunk_size=5)
+    assert counts == {'inserted': 25, 'updated': 0}
+    # Only the first two chunks ran the per-row triggers; the rest was rebuilt in one pass
+    assert db.get_data_version('risks') == version + 10 + 1
+    assert db.get_counters()['risks']['status'] == {'Open': 13, 'Closed': 12}
+    assert db.search("drift", page_size=1)[1] == 25
+
+    # A failed large write rolls back and leaves the triggers in place
+    rows = [{'control_id': f"CTL-{i}", 'control_name': "Review"} for i in range(20)]
+    rows.append({'control_id': "CTL-X"})  # control_name is NOT NULL
+    with pytest.raises(Exception):
+        db.bulk_add_controls(rows)
+    assert db.count_rows("controls") == 0
+    db.add_risk(None, "Bias")
+    assert db.get_counters()['risks']['total'] == 26
+    assert db.search("bias")[1] == 1
+
+
+def test_export_streams_all_tables_with_progress(db, tmp_path):
+    import pandas as pd
+    asset_id = db.add_asset("Model", "ML Model")
+    db.bulk_add_risks({'asset_id': asset_id, 'risk_title': f"Risk {i}"} for i in range(25))
+    db.add_control("CTL-1", "Review")
+
+    calls = []
+    path = str(tmp_path / "export.xlsx")
+    assert db.export_database(path, chunk_size=10,
+                              progress=lambda done, total, sheet: calls.append((done, total, sheet)))
+    assert calls[0] == (0, 27, "")
+    assert calls[-1] == (27, 27, "Controls")
+    assert [c[0] for c in calls if c[2] == "Risks"] == [11, 21, 26]
+
+    risks = pd.read_excel(path, sheet_name='Risks')
+    assert len(risks) == 25
+    assert set(risks['asset_name']) == {"Model"}
+    assert pd.ExcelFile(path).sheet_names == ['Assets', 'Risks', 'Controls', 'Incidents', 'Audits',
+                                              'Risk Controls']
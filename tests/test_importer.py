@@ -0,0 +1,272 @@
+"""
+Tests for the validated, staged Excel import
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001.database import ISO42001Database
+from iso42001.importer import ImportValidationError, import_workbook
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ISO42001Database(str(tmp_path / "import.db"))
+    asset_id = database.add_asset("Model", "ML Model")
+    risk_id = database.add_risk(asset_id, "Drift")
+    control_id = database.add_control("CTL-1", "Monitoring")
+    database.add_audit("Audit", compliance_score=75, status="Complete")
+    with database.connection() as conn:
+        conn.execute("INSERT INTO risk_controls (risk_id, control_id) VALUES (?, ?)",
+                     (risk_id, control_id))
+        conn.commit()
+    yield database
+    database.close()
+
+
+def test_excel_round_trip_keeps_rows_and_mappings(db, tmp_path):
+    path = str(tmp_path / "export.xlsx")
+    assert db.export_database(path)
+    tables = ['ai_assets', 'risks', 'controls', 'audits', 'risk_controls']
+
+    def rows():
+        # Excel has no empty strings: blank cells come back as NULL
+        with db.connection() as conn:
+            return {table: [tuple(None if value == "" else value for value in row)
+                            for row in conn.execute(f"SELECT * FROM {table} ORDER BY id")]
+                    for table in tables}
+
+    before = rows()
+    assert db.import_database(path)
+    assert rows() == before
+    assert db.get_counters()['audits']['status'] == {'Complete': 1}
+
+
+def test_excel_restore_into_a_fresh_database_keeps_risk_control_mappings(db, tmp_path):
+    risk_id = int(db.get_risks()['id'].iloc[0])
+    control_id = int(db.get_controls()['id'].iloc[0])
+    db.update_control(control_id, implementation_status="Implemented", effectiveness="Effective")
+    path = str(tmp_path / "export.xlsx")
+    assert db.export_database(path)
+
+    target = ISO42001Database(str(tmp_path / "fresh.db"))
+    assert target.import_database(path)
+    assert target.get_risk_control_ids(risk_id) == [control_id]
+    assert target.get_risk_coverage()['covered'] == 1
+
+    # A merge adds mappings from the sheet; older workbooks without it keep them
+    other_id = target.add_control("CTL-2", "Review")
+    mappings = pd.DataFrame({'risk_id': [risk_id, risk_id], 'control_id': [control_id, other_id]})
+    with pd.ExcelWriter(path) as writer:
+        mappings.to_excel(writer, sheet_name='Risk Controls', index=False)
+    assert target.import_database(path, mode="merge")
+    assert target.get_risk_control_ids(risk_id) == [control_id, other_id]
+
+    assert target.export_database(path)
+    sheets = pd.read_excel(path, sheet_name=None, dtype=object)
+    with pd.ExcelWriter(path) as writer:
+        for name, frame in sheets.items():
+            if name != 'Risk Controls':
+                frame.to_excel(writer, sheet_name=name, index=False)
+    assert target.import_database(path)
+    assert target.get_risk_control_ids(risk_id) == [control_id, other_id]
+    target.close()
+
+
+def test_excel_restore_into_a_fresh_database_links_incidents_to_assets(db, tmp_path):
+    asset_id = int(db.get_assets()['id'].iloc[0])
+    other_id = db.add_asset("Chatbot", "ML Model")
+    incident_id = db.add_incident("Outage", asset_ids=[asset_id, other_id])
+    db.add_incident("Drift", affected_assets="Model; vendor feed")
+    path = str(tmp_path / "export.xlsx")
+    assert db.export_database(path)
+
+    target = ISO42001Database(str(tmp_path / "fresh.db"))
+    assert target.import_database(path)
+    assert target.get_incident_asset_ids(incident_id) == sorted([asset_id, other_id])
+    assert target.get_asset_incident_summary()['incidents'].tolist() == [2, 1]
+    # Text naming no asset is kept as written
+    drift = target.get_incidents(where={'incident_title': "Drift"}).iloc[0]
+    assert drift['affected_assets'] == "Model; vendor feed"
+    assert target.get_incident_asset_ids(int(drift['id'])) == [asset_id]
+
+    # A merge that changes the text replaces the links and keeps the new text
+    sheets = pd.read_excel(path, sheet_name=None, dtype=object)
+    incidents = sheets['Incidents']
+    incidents.loc[incidents['id'] == incident_id, 'affected_assets'] = "Chatbot"
+    incidents = pd.concat([incidents, pd.DataFrame([{'incident_title': "Leak",
+                                                     'affected_assets': "Model, Chatbot"}])],
+                          ignore_index=True)
+    with pd.ExcelWriter(path) as writer:
+        incidents.to_excel(writer, sheet_name='Incidents', index=False)
+    assert target.import_database(path, mode="merge")
+    assert target.get_incident_asset_ids(incident_id) == [other_id]
+    assert target.get_row('incidents', incident_id)['affected_assets'] == "Chatbot"
+    leak = target.get_incidents(where={'incident_title': "Leak"}).iloc[0]
+    assert target.get_incident_asset_ids(int(leak['id'])) == sorted([asset_id, other_id])
+    target.close()
+
+
+def test_invalid_rows_are_reported_and_nothing_changes(db, tmp_path):
+    path = str(tmp_path / "bad.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'id': [1, 2], 'name': ["Model", None], 'type': ["ML Model", "Dataset"],
+                      'criticality': ["High", "Extreme"]}).to_excel(writer, sheet_name='Assets', index=False)
+        pd.DataFrame({'id': [1], 'asset_id': [7], 'risk_title': ["Drift"]}).to_excel(
+            writer, sheet_name='Risks', index=False)
+        pd.DataFrame({'control_id': ["C-1", "C-1"], 'control_name': ["A", "B"]}).to_excel(
+            writer, sheet_name='Controls', index=False)
+        pd.DataFrame({'audit_title': ["Audit"], 'compliance_score': [120]}).to_excel(
+            writer, sheet_name='Audits', index=False)
+    version = db.get_data_version()
+
+    with pytest.raises(ImportValidationError) as raised:
+        import_workbook(db, path)
+    problems = {(e['sheet'], e['row'], e['column']) for e in raised.value.errors}
+    assert problems == {
+        ('Assets', 3, 'name'),
+        ('Assets', 3, 'criticality'),
+        ('Risks', 2, 'asset_id'),
+        ('Controls', 2, 'control_id'),
+        ('Controls', 3, 'control_id'),
+        ('Audits', 2, 'compliance_score'),
+    }
+
+    assert db.import_database(path) is False
+    assert db.get_data_version() == version
+    assert db.count_rows("ai_assets") == 1
+    assert db.count_rows("risks") == 1
+
+
+def test_upload_is_spooled_and_removed_after_import(tmp_path, monkeypatch):
+    from iso42001 import callbacks, uploads
+    app_module = sys.modules['iso42001.app']
+    database = ISO42001Database(str(tmp_path / "ui.db"))
+    monkeypatch.setattr(callbacks, "db", database)
+    spool = tmp_path / "spool"
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(spool))
+
+    path = tmp_path / "upload.xlsx"
+    pd.DataFrame({'name': ["Model"], 'type': ["ML Model"], 'status': ["Retired"]}).to_excel(
+        path, sheet_name='Assets', index=False)
+    client = app_module.app.server.test_client()
+    reply = client.post("/api/import/upload?filename=upload.xlsx", data=path.read_bytes(),
+                        content_type="application/octet-stream")
+    assert reply.status_code == 201
+    upload = reply.get_json()
+    assert upload['filename'] == "upload.xlsx" and upload['size'] == path.stat().st_size
+    assert os.listdir(spool) == [upload['upload_id'] + ".xlsx"]
+
+    alert = callbacks.import_database(lambda progress: None, upload)
+    assert alert.color == "danger"
+    assert "Assets row 2, status" in str(alert.children)
+    assert not os.listdir(spool)
+
+    reply = client.post("/api/import/upload?filename=notes.txt", data=b"hello")
+    assert reply.status_code == 400
+    # The upload callback passes the endpoint's error on to the import panel
+    alert = callbacks.import_database(lambda progress: None,
+                                      dict(reply.get_json(), filename="notes.txt"))
+    assert alert.color == "danger"
+    assert reply.get_json()['error'] in str(alert.children)
+    database.close()
+
+
+def test_oversized_upload_leaves_nothing_behind(tmp_path, monkeypatch):
+    import io
+    from iso42001 import uploads
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path))
+    with pytest.raises(uploads.UploadTooLarge):
+        uploads.save_upload(io.BytesIO(b"x" * 200_000), "big.xlsx", max_bytes=100_000)
+    assert not os.listdir(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        uploads.upload_path("../../etc/passwd")
+
+
+def test_merge_applies_only_changed_rows(db, tmp_path):
+    path = str(tmp_path / "export.xlsx")
+    db.add_asset("Second model", "Dataset", description="")
+    db.export_database(path)
+
+    sheets = pd.read_excel(path, sheet_name=None, dtype=object)
+    assets = sheets['Assets']
+    assets.loc[assets['name'] == "Model", 'status'] = "Under Review"
+    sheets['Assets'] = pd.concat([assets, pd.DataFrame([{'name': "New model", 'type': "AI System"}])],
+                                 ignore_index=True)
+    with pd.ExcelWriter(path) as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+
+    versions = db.get_data_versions()
+    counts = db.import_database(path, mode="merge")
+    assert counts['ai_assets'] == {'inserted': 1, 'updated': 1, 'deleted': 0, 'unchanged': 1}
+
+    # Every written row bumps its table's version once: one insert and one update
+    after = db.get_data_versions()
+    assert after['ai_assets'] == versions['ai_assets'] + 2
+    assert all(after[table] == versions[table] for table in after if table != 'ai_assets')
+    assets = db.get_assets().set_index('name')
+    assert assets.loc["Model", 'status'] == "Under Review"
+    assert assets.loc["Second model", 'description'] == ""
+    assert "New model" in assets.index
+    assert db.count_rows("risks") == 1
+
+
+def test_merge_on_natural_key_with_partial_columns_and_deletes(db, tmp_path):
+    db.add_control("CTL-2", "Review")
+    path = str(tmp_path / "controls.xlsx")
+    pd.DataFrame({'control_id': ["CTL-1", "CTL-3"],
+                  'implementation_status': ["Implemented", None],
+                  'control_name': ["Monitoring", "Logging"]}).to_excel(
+        path, sheet_name='Controls', index=False)
+
+    from iso42001.importer import merge_workbook
+    counts = merge_workbook(db, path, delete_missing=True)
+    assert counts == {'controls': {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 0}}
+    controls = db.get_controls().set_index('control_id')
+    assert sorted(controls.index) == ["CTL-1", "CTL-3"]
+    assert controls.loc["CTL-1", 'implementation_status'] == "Implemented"
+    # Mapping of the kept control survives
+    assert db.count_rows("ai_assets") == 1
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM risk_controls").fetchone()[0] == 1
+
+
+def test_merge_rejects_new_rows_without_required_columns(db, tmp_path):
+    path = str(tmp_path / "partial.xlsx")
+    pd.DataFrame({'control_id': ["CTL-1", "CTL-9"], 'owner': ["Ops", "Ops"]}).to_excel(
+        path, sheet_name='Controls', index=False)
+    from iso42001.importer import merge_workbook
+    with pytest.raises(ImportValidationError) as raised:
+        merge_workbook(db, path)
+    assert [(e['column'], e['row']) for e in raised.value.errors] == [('control_name', 3)]
+    assert db.get_controls()['owner'][0] == ""
+
+
+def test_workbook_reader_parses_once_with_column_pushdown(tmp_path, monkeypatch):
+    import openpyxl
+    from iso42001 import workbook
+    path = str(tmp_path / "book.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'id': [1, 2], 'name': ["A", None], 'score': [1.0, 2.5]}).to_excel(
+            writer, sheet_name='Assets', index=False)
+        pd.DataFrame({'x': [1]}).to_excel(writer, sheet_name='Other', index=False)
+
+    loads = []
+    monkeypatch.setattr(workbook, "load_workbook",
+                        lambda *args, **kwargs: loads.append(kwargs) or openpyxl.load_workbook(*args, **kwargs))
+    with workbook.WorkbookReader(path, dtype=object) as reader:
+        sheets = dict(reader.sheets(usecols={'Assets': ['id', 'name']}))
+        inferred = reader.read('Assets', dtype={'score': float}, usecols=lambda name: name != 'name')
+
+    assert len(loads) == 1 and loads[0]['read_only']
+    assert list(sheets) == ['Assets', 'Other']
+    assert sheets['Assets'].to_dict('list') == {'id': [1, 2], 'name': ["A", None]}
+    assert list(inferred.columns) == ['id', 'score']
+    assert inferred['score'].dtype == float
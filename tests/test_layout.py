@@ -0,0 +1,213 @@
+"""
+Tests for the Dash layout and callbacks of the ISO 42001 application
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+sys.path.insert(0, SRC)
+
+from dash.exceptions import PreventUpdate
+
+
+def test_importing_app_does_no_database_work():
+    code = (
+        "import sqlite3\n"
+        "def refuse(*args, **kwargs):\n"
+        "    raise AssertionError('database opened during import')\n"
+        "sqlite3.connect = refuse\n"
+        "import sys, iso42001.callbacks, iso42001.layout\n"
+        "assert callable(sys.modules['iso42001.app'].app.layout)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run([sys.executable, "-c", code], env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch):
+    from iso42001 import callbacks, layout
+    from iso42001.database import ISO42001Database
+    app_module = sys.modules['iso42001.app']
+    database = ISO42001Database(str(tmp_path / "layout.db"))
+    monkeypatch.setattr(callbacks, "db", database)
+    monkeypatch.setattr(layout, "db", database)
+    monkeypatch.setattr(app_module, "db", database)
+    app_module.tab_cache.clear()
+    yield database
+    database.close()
+
+
+def in_callback_context(triggered, func, *args):
+    """Call a callback function as if ``triggered`` inputs had fired it"""
+    from contextvars import copy_context
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict
+
+    def run():
+        context_value.set(AttributeDict(triggered_inputs=triggered))
+        return func(*args)
+    return copy_context().run(run)
+
+
+def test_stats_refresh_not_modified_without_writes(app_db):
+    from iso42001.callbacks import refresh_stats_cards
+    from iso42001.layout import create_app_layout
+
+    layout = create_app_layout()
+    version = layout.children[2].data
+    with pytest.raises(PreventUpdate):
+        refresh_stats_cards(1, version)
+
+    app_db.add_asset("New model", "ML Model")
+    cards, new_version = refresh_stats_cards(2, version)
+    assert new_version > version
+    assert "1" in str(cards)
+
+
+def test_tab_render_cached_until_data_changes(app_db):
+    app_module = sys.modules['iso42001.app']
+    app_db.add_asset("Model", "ML Model")
+
+    first = app_module.render_tab_content('assets')
+    assert app_module.render_tab_content('assets') is first
+
+    # Writes to unrelated tables keep the cached render
+    app_db.add_audit("Audit")
+    assert app_module.render_tab_content('assets') is first
+
+    app_db.add_asset("Second model", "ML Model")
+    assert app_module.render_tab_content('assets') is not first
+
+
+def test_versioned_cache_ttl_and_size():
+    from iso42001.cache import VersionedCache
+    cache = VersionedCache(maxsize=2, ttl=None)
+    cache.set('a', 1, 'A')
+    cache.set('b', 1, 'B')
+    cache.set('c', 1, 'C')
+    assert cache.get('a', 1) is None
+    assert cache.get('c', 1) == 'C'
+    assert cache.get('c', 2) is None
+
+    cache.configure(maxsize=2, ttl=0.001)
+    cache.set('d', 1, 'D')
+    import time
+    time.sleep(0.01)
+    assert cache.get('d', 1) is None
+
+
+def test_save_asset_patches_only_the_changed_row(app_db):
+    from dash import no_update
+    from iso42001.callbacks import save_asset
+
+    asset_id = app_db.add_asset("Model", "ML Model")
+    patch, page_count, *_ = save_asset(1, "Renamed", "ML Model", "", "High", "", "Active",
+                                       asset_id, [asset_id], 10, 0, [], "")
+    operations = patch.to_plotly_json()['operations']
+    assert operations == [{'operation': 'Assign', 'location': [0],
+                           'params': {'value': app_db.get_row("ai_assets", asset_id) | {'edit': "Edit"}}}]
+    assert page_count is no_update
+
+    # Editing a row that is not on the current page sends nothing
+    patch, *_ = save_asset(1, "Renamed", "ML Model", "", "High", "", "Active", asset_id, [], 10,
+                           0, [], "")
+    assert patch is no_update
+
+
+def test_save_asset_prepends_and_keeps_page_size(app_db):
+    from iso42001.callbacks import save_asset
+
+    shown = [app_db.add_asset(f"Model {i}", "ML Model") for i in range(3)]
+    patch, page_count, *_ = save_asset(1, "New", "Dataset", "", "Low", "", "Active", None,
+                                       shown, 3, 0, [], "")
+    operations = patch.to_plotly_json()['operations']
+    assert [op['operation'] for op in operations] == ['Prepend', 'Delete']
+    assert operations[0]['params']['value']['name'] == "New"
+    assert operations[1]['location'] == [3]
+    assert page_count == 2
+
+
+def test_save_asset_reloads_sorted_filtered_or_later_pages(app_db):
+    from iso42001.callbacks import save_asset
+
+    for name in ("Beta", "Delta", "Gamma"):
+        app_db.add_asset(name, "ML Model")
+
+    # Sorted by name the new asset belongs in the middle of the page, not on top
+    data, page_count, *_ = save_asset(1, "Charlie", "Dataset", "", "Low", "", "Active", None,
+                                      [], 10, 0, [{'column_id': 'name', 'direction': 'asc'}], "")
+    assert [row['name'] for row in data] == ["Beta", "Charlie", "Delta", "Gamma"]
+    assert page_count == 1
+
+    # A new asset that does not match the filter stays out of the table
+    data, page_count, *_ = save_asset(1, "Alpha", "Dataset", "", "Low", "", "Active", None,
+                                      [], 10, 0, [], '{type} = "ML Model"')
+    assert {row['name'] for row in data} == {"Beta", "Delta", "Gamma"}
+
+    # On a later page the new asset is not shown, but the page count grows
+    data, page_count, *_ = save_asset(1, "Epsilon", "Dataset", "", "Low", "", "Active", None,
+                                      [], 2, 1, [], "")
+    assert "Epsilon" not in {row['name'] for row in data}
+    assert len(data) == 2 and page_count == 3
+
+
+def test_export_reports_progress(app_db, tmp_path, monkeypatch):
+    from iso42001.callbacks import export_database
+    monkeypatch.chdir(tmp_path)
+    app_db.add_asset("Model", "ML Model")
+
+    reported = []
+    status = export_database(reported.append, 1)
+    assert reported[-1] == (100, "100% Assets")
+    assert "exported successfully" in str(status)
+    assert list(tmp_path.glob("iso42001_export_*.xlsx"))
+
+
+def test_global_search_api_and_callbacks(app_db):
+    from iso42001.callbacks import open_search_hit, run_search
+    from iso42001.layout import SEARCH_PAGE_SIZE
+    app_module = sys.modules['iso42001.app']
+    app_db.bulk_add_risks({'risk_title': f"Drift risk {i}"} for i in range(SEARCH_PAGE_SIZE + 3))
+    app_db.add_audit("Annual audit", findings="Model drift not monitored")
+
+    client = app_module.app.server.test_client()
+    reply = client.get("/api/search?q=drift&table=audits")
+    assert reply.status_code == 200
+    assert reply.get_json()['total'] == 1
+    assert reply.get_json()['hits'][0]['table'] == 'audits'
+    assert client.get("/api/search?q=drift&table=users").status_code == 400
+
+    results, pages, page, style = in_callback_context(
+        [{'prop_id': "global-search.value", 'value': "drift"}], run_search, "drift", 2)
+    assert (pages, page, style) == (2, 1, {})
+    assert "1-10 of 14 matches" in str(results)
+    results, _, page, _ = in_callback_context(
+        [{'prop_id': "search-pagination.active_page", 'value': 2}], run_search, "drift", 2)
+    assert page == 2 and "11-14 of 14 matches" in str(results)
+
+    hit = '{"index":1,"table":"audits","type":"search-hit"}.n_clicks'
+    assert in_callback_context([{'prop_id': hit, 'value': 1}], open_search_hit, [1]) == "compliance"
+    with pytest.raises(PreventUpdate):
+        in_callback_context([{'prop_id': hit, 'value': 0}], open_search_hit, [0])
+
+
+def test_risk_coverage_follows_mapped_controls(app_db):
+    from iso42001.callbacks import refresh_risk_coverage, save_risk
+    from iso42001.layout import render_regulatory_report
+
+    risk = app_db.add_risk(None, "Bias", risk_level="Critical")
+    control = app_db.add_control("CTL-1", "Review", implementation_status="Implemented",
+                                 effectiveness="Effective")
+    assert "Bias" in str(refresh_risk_coverage([]))
+
+    save_risk(1, "", "Bias", "", "", "Medium", "Medium", "Critical", "", [control], "", "Open",
+              risk, [risk], 10, 0, [], "")
+    assert app_db.get_risk_control_ids(risk) == [control]
+    assert "Every Critical and High risk has an effective control" in str(refresh_risk_coverage([]))
+    assert "Risk Coverage" in str(render_regulatory_report())
@@ -0,0 +1,175 @@
+"""
+Tests for the versioned schema migrations
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001 import migrations
+from iso42001.database import ISO42001Database
+
+
+@pytest.fixture
+def extra_migration(monkeypatch):
+    """Register migrations after the real ones for the duration of a test"""
+    monkeypatch.setattr(migrations, "MIGRATIONS", list(migrations.MIGRATIONS))
+    return migrations.migration
+
+
+def user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_new_database_is_at_latest_version(tmp_path):
+    path = str(tmp_path / "new.db")
+    with ISO42001Database(path) as db:
+        db.add_asset("Model", "ML Model")
+    assert user_version(path) == migrations.latest_version()
+
+
+def test_unversioned_database_is_adopted_without_data_loss(tmp_path):
+    path = str(tmp_path / "old.db")
+    with ISO42001Database(path) as db:
+        db.add_asset("Model", "ML Model")
+        with db.connection() as conn:
+            conn.execute("PRAGMA user_version = 0")
+    with ISO42001Database(path) as db:
+        assert db.count_rows("ai_assets") == 1
+    assert user_version(path) == migrations.latest_version()
+
+
+def test_search_index_is_backfilled_for_existing_data(tmp_path):
+    path = str(tmp_path / "search.db")
+    with ISO42001Database(path) as db:
+        db.bulk_add_risks({'risk_title': f"Risk {i}", 'risk_description': "Data drift"}
+                          for i in range(30))
+        with db.connection() as conn:
+            conn.execute("DROP TABLE search_index")
+            conn.execute("PRAGMA user_version = 1")
+    with ISO42001Database(path) as db:
+        assert db.search("drift")[1] == 30
+    assert user_version(path) == migrations.latest_version()
+
+
+def test_incident_assets_are_parsed_from_the_affected_assets_text(tmp_path):
+    path = str(tmp_path / "links.db")
+    with ISO42001Database(path) as db:
+        chatbot = db.add_asset("Customer Service Chatbot", "ML Model")
+        scoring = db.add_asset("Credit Scoring", "ML Model")
+        db.add_asset("Twin", "Dataset")
+        db.add_asset("Twin", "Dataset")
+        texts = ["Customer service chatbot; credit scoring", f"{scoring} - Credit Scoring",
+                 f"{chatbot}, Twin, all customer-facing systems", ""]
+        incidents = [db.add_incident(f"Incident {i}", affected_assets=text)
+                     for i, text in enumerate(texts)]
+        with db.connection() as conn:
+            conn.execute("DROP TABLE incident_assets")
+            conn.execute("PRAGMA user_version = 2")
+    with ISO42001Database(path) as db:
+        assert [db.get_incident_asset_ids(i) for i in incidents] == [
+            sorted([chatbot, scoring]), [scoring], [chatbot], []]
+        # The original text is kept until the links of an incident change
+        assert db.get_row('incidents', incidents[2])['affected_assets'] == texts[2]
+        db.update_incident(incidents[2], asset_ids=[chatbot, scoring])
+        assert db.get_row('incidents', incidents[2])['affected_assets'] == \
+            "Credit Scoring, Customer Service Chatbot"
+    assert user_version(path) == migrations.latest_version()
+
+
+def test_dry_run_lists_pending_migrations_only(tmp_path, extra_migration):
+    @extra_migration(migrations.latest_version() + 1, "Add a notes table")
+    def add_notes(db, conn, progress):
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+
+    path = str(tmp_path / "dry.db")
+    with ISO42001Database(path, migrate=False) as db:
+        pending = migrations.migrate(db, dry_run=True)
+        assert [m.description for m, _ in pending][-1] == "Add a notes table"
+        with db.connection() as conn:
+            assert migrations.schema_version(conn) == 0
+            assert not conn.execute("SELECT name FROM sqlite_master WHERE name = 'notes'").fetchall()
+
+        applied = migrations.migrate(db)
+        assert [m.version for m, _ in applied] == [m.version for m, _ in pending]
+        assert migrations.migrate(db) == []
+    assert user_version(path) == migrations.latest_version()
+
+
+def test_failing_migration_is_rolled_back(tmp_path, extra_migration):
+    path = str(tmp_path / "fail.db")
+    ISO42001Database(path).close()
+    version = migrations.latest_version()
+
+    @extra_migration(version + 1, "Broken")
+    def broken(db, conn, progress):
+        conn.execute("CREATE TABLE half_done (id INTEGER PRIMARY KEY)")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        ISO42001Database(path)
+    assert user_version(path) == version
+    conn = sqlite3.connect(path)
+    assert not conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchall()
+    conn.close()
+
+
+def test_online_backfill_commits_each_batch(tmp_path, extra_migration):
+    path = str(tmp_path / "online.db")
+    with ISO42001Database(path) as db:
+        db.bulk_add_assets([{'name': f"Model {i}", 'asset_type': "ML Model"} for i in range(25)])
+    writes_between_batches = []
+
+    def write_from_other_connection(done, total, table):
+        # Fails immediately if the migration held the write lock between batches
+        other = sqlite3.connect(path, timeout=0)
+        other.execute("UPDATE schema_meta SET value = value WHERE key = 'index_version'")
+        other.commit()
+        other.close()
+        writes_between_batches.append(done)
+
+    @extra_migration(migrations.latest_version() + 1, "Add normalized asset names", online=True)
+    def add_name_key(db, conn, progress):
+        if 'name_key' not in db.get_page_columns('ai_assets'):
+            conn.execute("ALTER TABLE ai_assets ADD COLUMN name_key TEXT")
+        migrations.backfill(
+            conn, "ai_assets",
+            lambda conn, first, last: conn.execute(
+                "UPDATE ai_assets SET name_key = lower(name) WHERE id BETWEEN ? AND ?", (first, last)),
+            batch_size=10, progress=write_from_other_connection)
+
+    with ISO42001Database(path) as db:
+        assert writes_between_batches == [0, 10, 20, 25]
+        with db.connection() as conn:
+            keys = [row[0] for row in conn.execute("SELECT name_key FROM ai_assets ORDER BY id")]
+    assert keys == [f"model {i}" for i in range(25)]
+    assert user_version(path) == migrations.latest_version()
+
+
+def test_migrate_command_reports_timings(tmp_path, capsys):
+    from iso42001.cli import run_migrate_command
+    path = str(tmp_path / "cli.db")
+
+    args = argparse.Namespace(db=path, to=None, dry_run=True)
+    assert run_migrate_command(args) == 0
+    latest = migrations.latest_version()
+    assert f"Dry run: {latest} pending migration(s)" in capsys.readouterr().out
+    assert user_version(path) == 0
+
+    args.dry_run = False
+    assert run_migrate_command(args) == 0
+    out = capsys.readouterr().out
+    assert "applied 1:" in out and f"Migrated to version {latest}" in out
+
+    args.to = 0
+    assert run_migrate_command(args) == 2
@@ -0,0 +1,108 @@
+"""
+EXPLAIN QUERY PLAN regression tests: hot queries must not fall back to full scans
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from iso42001.database import ISO42001Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ISO42001Database(str(tmp_path / "plan.db"))
+    asset_id = database.add_asset("Model", "ML Model")
+    risk_id = database.add_risk(asset_id, "Drift")
+    control_id = database.add_control("CTL-1", "Monitoring")
+    database.add_incident("Outage")
+    database.add_audit("Annual audit")
+    with database.connection() as conn:
+        conn.execute("INSERT INTO risk_controls (risk_id, control_id) VALUES (?, ?)",
+                     (risk_id, control_id))
+        conn.commit()
+    yield database
+    database.close()
+
+
+def capture_queries(db, func, *args, **kwargs):
+    """Run ``func`` and return the SELECT statements it sent to SQLite"""
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            func(*args, **kwargs)
+        finally:
+            conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+# Bookkeeping tables whose size does not grow with the data may be scanned
+SMALL_TABLES = {"data_versions", "schema_meta", "summary_counters"}
+
+
+def plan_problems(db, sql):
+    """Return the plan steps of ``sql`` that scan a whole table or sort in a temp B-tree"""
+    with db.connection() as conn:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "USING" not in detail and "CONSTANT ROW" not in detail:
+            if detail.split()[1] not in SMALL_TABLES:
+                problems.append(detail)
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+HOT_PATHS = [
+    "get_assets",
+    "get_risks",
+    "get_controls",
+    "get_incidents",
+    "get_audits",
+    "get_dashboard_stats",
+]
+
+
+@pytest.mark.parametrize("method", HOT_PATHS)
+def test_hot_queries_use_indexes(db, method):
+    queries = capture_queries(db, getattr(db, method))
+    assert queries, f"{method} issued no SELECT statements"
+    for sql in queries:
+        assert plan_problems(db, sql) == [], f"{method} falls back to a full scan:\n{sql}"
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT control_id FROM risk_controls WHERE risk_id = 1",
+    "SELECT risk_id FROM risk_controls WHERE control_id = 1",
+    "SELECT id FROM risk_controls WHERE risk_id = 1 AND control_id = 1",
+])
+def test_risk_control_mapping_is_indexed(db, sql):
+    assert plan_problems(db, sql) == []
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT incident_id FROM incident_assets WHERE asset_id = 1",
+    "SELECT asset_id FROM incident_assets WHERE incident_id = 1",
+])
+def test_incident_asset_links_are_indexed(db, sql):
+    assert plan_problems(db, sql) == []
+
+
+def test_index_set_is_versioned(db):
+    with db.connection() as conn:
+        version = conn.execute(
+            "SELECT value FROM schema_meta WHERE key = 'index_version'"
+        ).fetchone()[0]
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+        )}
+    from iso42001.database import INDEX_SET_VERSION, INDEXES
+    assert int(version) == INDEX_SET_VERSION
+    assert {name for name, _, _ in INDEXES} <= indexes